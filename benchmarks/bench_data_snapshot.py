@@ -0,0 +1,90 @@
+"""Memory and update cost of GrowcubeData across a simulated fleet.
+
+Compares the immutable NamedTuple snapshot, with the per-channel booleans packed
+into ChannelFlags ints and updated through evolve(), with the former plain
+dataclass holding six per-channel lists, updated through list copies and
+dataclasses.replace.
+
+Run with: python -m benchmarks.bench_data_snapshot
+"""
+import random
+import time
+import tracemalloc
+from dataclasses import dataclass, field, replace
+from typing import List, Optional
+
+from custom_components.growcube.coordinator import GrowcubeData
+
+DEVICES = 1_000
+UPDATES_PER_DEVICE = 200
+
+
+@dataclass
+class LegacyGrowcubeData:
+    temperature: Optional[int] = None
+    humidity: Optional[int] = None
+    moisture: List[Optional[int]] = field(default_factory=lambda: [None] * 4)
+    pump_open: List[bool] = field(default_factory=lambda: [False] * 4)
+    sensor_fault: List[bool] = field(default_factory=lambda: [False] * 4)
+    sensor_disconnected: List[bool] = field(default_factory=lambda: [False] * 4)
+    outlet_blocked: List[bool] = field(default_factory=lambda: [False] * 4)
+    outlet_locked: List[bool] = field(default_factory=lambda: [False] * 4)
+    water_warning: bool = False
+    device_locked: bool = False
+    device_id: Optional[str] = None
+    version: Optional[str] = None
+    device_info: Optional[dict] = None
+
+
+def _legacy_set_list_index(data, attr, idx, value):
+    copied = list(getattr(data, attr))
+    copied[idx] = value
+    return replace(data, **{attr: copied})
+
+
+def _set_list_index(data, attr, idx, value):
+    values = getattr(data, attr)
+    if attr == "moisture":
+        return data.evolve(**{attr: values[:idx] + (value,) + values[idx + 1:]})
+    return data.evolve(**{attr: values.set(idx, value)})
+
+
+def _measure_memory(factory) -> int:
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    fleet = [factory() for _ in range(DEVICES)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del fleet
+    return after - before
+
+
+def _measure_updates(fleet, set_list_index, updates) -> float:
+    start = time.perf_counter()
+    for index, channel, moisture, pump in updates:
+        data = set_list_index(fleet[index], "moisture", channel, moisture)
+        fleet[index] = set_list_index(data, "pump_open", channel, pump)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    rng = random.Random(42)
+    updates = [
+        (rng.randrange(DEVICES), rng.randrange(4), rng.randint(20, 60), rng.random() < 0.1)
+        for _ in range(DEVICES * UPDATES_PER_DEVICE)
+    ]
+
+    legacy_memory = _measure_memory(LegacyGrowcubeData)
+    memory = _measure_memory(GrowcubeData)
+    legacy_time = _measure_updates([LegacyGrowcubeData() for _ in range(DEVICES)], _legacy_set_list_index, updates)
+    update_time = _measure_updates([GrowcubeData() for _ in range(DEVICES)], _set_list_index, updates)
+
+    print(f"{DEVICES} devices, {len(updates)} updates (moisture + pump state)")
+    print(f"  memory, list based dataclass: {legacy_memory / DEVICES:8.0f} bytes/device")
+    print(f"  memory, packed snapshot:      {memory / DEVICES:8.0f} bytes/device")
+    print(f"  update, list based dataclass: {legacy_time / len(updates) * 1e6:8.2f} us/update")
+    print(f"  update, packed snapshot:      {update_time / len(updates) * 1e6:8.2f} us/update")
+
+
+if __name__ == "__main__":
+    main()
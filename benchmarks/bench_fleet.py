@@ -0,0 +1,121 @@
+"""Fleet load test: N simulated cubes against N coordinators in one event loop.
+
+Every coordinator talks to its own GrowcubeSimulator over a local TCP socket,
+through the real GrowcubeClient. For each fleet size the benchmark reports the
+report throughput, the event loop lag observed while the fleet is busy, and the
+memory allocated per device during setup.
+
+Run with: python -m benchmarks.bench_fleet [devices ...] [--interval SECONDS] [--duration SECONDS]
+"""
+import argparse
+import asyncio
+import logging
+import resource
+import statistics
+import time
+import tracemalloc
+from typing import List, Tuple
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.growcube.coordinator import GrowcubeDataCoordinator
+from tests.simulator import GrowcubeSimulator
+
+from .common import async_create_hass
+
+LAG_PROBE_INTERVAL = 0.01
+
+
+class _CountingCoordinator(GrowcubeDataCoordinator):
+    """Coordinator counting the reports it handles."""
+
+    def __init__(self, host: str, hass: HomeAssistant) -> None:
+        super().__init__(host, hass)
+        self.reports = 0
+
+    def handle_report(self, report) -> None:
+        self.reports += 1
+        super().handle_report(report)
+
+
+async def _probe_loop_lag(samples: List[float]) -> None:
+    loop = asyncio.get_running_loop()
+    while True:
+        expected = loop.time() + LAG_PROBE_INTERVAL
+        await asyncio.sleep(LAG_PROBE_INTERVAL)
+        samples.append(loop.time() - expected)
+
+
+async def _setup_fleet(hass: HomeAssistant,
+                       devices: int,
+                       interval: float) -> Tuple[List[GrowcubeSimulator], List[_CountingCoordinator]]:
+    simulators = [GrowcubeSimulator(device_id=1000 + index, report_interval=interval, seed=index)
+                  for index in range(devices)]
+    await asyncio.gather(*(simulator.start() for simulator in simulators))
+
+    coordinators = []
+    for simulator in simulators:
+        coordinator = _CountingCoordinator(simulator.host, hass)
+        coordinator.client.port = simulator.port
+        coordinators.append(coordinator)
+    results = await asyncio.gather(*(coordinator.connect() for coordinator in coordinators))
+    failed = [error for result, error in results if not result]
+    if failed:
+        raise RuntimeError(f"{len(failed)} of {devices} devices failed to connect: {failed[0]}")
+    return simulators, coordinators
+
+
+async def _run(hass: HomeAssistant, devices: int, interval: float, duration: float) -> None:
+    tracemalloc.start()
+    setup_start = time.perf_counter()
+    simulators, coordinators = await _setup_fleet(hass, devices, interval)
+    setup_time = time.perf_counter() - setup_start
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    lag: List[float] = []
+    probe = asyncio.create_task(_probe_loop_lag(lag))
+    handled_before = sum(coordinator.reports for coordinator in coordinators)
+    start = time.perf_counter()
+    await asyncio.sleep(duration)
+    elapsed = time.perf_counter() - start
+    handled = sum(coordinator.reports for coordinator in coordinators) - handled_before
+    probe.cancel()
+
+    for coordinator in coordinators:
+        coordinator.disconnect()
+    await asyncio.gather(*(simulator.stop() for simulator in simulators))
+    await asyncio.sleep(0)
+
+    lag.sort()
+    print(f"{devices:5d} devices: setup {setup_time * 1000:7.1f} ms, "
+          f"{handled / elapsed:8.0f} reports/s, "
+          f"loop lag mean {statistics.mean(lag) * 1000:5.2f} ms "
+          f"p99 {lag[int(len(lag) * 0.99)] * 1000:5.2f} ms max {lag[-1] * 1000:6.2f} ms, "
+          f"{allocated / devices / 1024:6.1f} KiB/device")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("devices", nargs="*", type=int, default=[10, 50, 100, 250])
+    parser.add_argument("--interval", type=float, default=0.05,
+                        help="seconds between moisture reports of each cube")
+    parser.add_argument("--duration", type=float, default=3, help="seconds of load per fleet size")
+    args = parser.parse_args()
+
+    # Every device uses three sockets, a listener and both ends of the connection
+    _, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+    logging.basicConfig(level=logging.WARNING)
+    logging.getLogger("growcube_client").setLevel(logging.CRITICAL)
+
+    hass = await async_create_hass()
+    print(f"One report per cube every {args.interval * 1000:.0f} ms, {args.duration:.0f} s per fleet size")
+    for devices in args.devices:
+        await _run(hass, devices, args.interval, args.duration)
+    print(f"Peak RSS {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MiB")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
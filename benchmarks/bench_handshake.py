@@ -0,0 +1,68 @@
+"""Setup latency of the device id handshake in GrowcubeDataCoordinator.connect.
+
+Simulated cubes answer with their DeviceVersionGrowcubeReport after a random
+delay. The event driven handshake is compared with the former loop polling
+for the device id every 100 ms.
+
+Run with: python -m benchmarks.bench_handshake
+"""
+import asyncio
+import random
+import statistics
+from unittest.mock import AsyncMock
+
+from growcube_client import DeviceVersionGrowcubeReport
+
+from .common import async_create_hass, create_coordinator
+
+DEVICES = 50
+
+
+def _simulated_coordinator(hass, rng, index):
+    coordinator = create_coordinator(hass, f"10.0.0.{index}")
+    delay = rng.uniform(0.02, 0.3)
+
+    async def _connect():
+        hass.loop.call_later(delay, coordinator.handle_report,
+                             DeviceVersionGrowcubeReport(f"3.6@{1000 + index}"))
+        return True, ""
+
+    coordinator.client.connect = AsyncMock(side_effect=_connect)
+    return coordinator, delay
+
+
+async def _polling_connect(coordinator) -> None:
+    await coordinator.client.connect()
+    retries = 50
+    while not coordinator.data.device_id and retries > 0:
+        retries -= 1
+        await asyncio.sleep(0.1)
+
+
+async def _measure(hass, connect, seed) -> list[float]:
+    rng = random.Random(seed)
+    devices = [_simulated_coordinator(hass, rng, index) for index in range(DEVICES)]
+
+    async def _setup(coordinator, delay):
+        start = hass.loop.time()
+        await connect(coordinator)
+        return hass.loop.time() - start - delay
+
+    return await asyncio.gather(*(_setup(coordinator, delay) for coordinator, delay in devices))
+
+
+async def main() -> None:
+    hass = await async_create_hass()
+    polling = await _measure(hass, _polling_connect, 1)
+    event = await _measure(hass, lambda coordinator: coordinator.connect(), 1)
+
+    print(f"{DEVICES} devices, time from device id sent to setup done")
+    print(f"  polling every 100 ms: mean {statistics.mean(polling) * 1000:6.1f} ms, "
+          f"max {max(polling) * 1000:6.1f} ms")
+    print(f"  event driven:         mean {statistics.mean(event) * 1000:6.1f} ms, "
+          f"max {max(event) * 1000:6.1f} ms")
+    print(f"  saved per device:     {(statistics.mean(polling) - statistics.mean(event)) * 1000:6.1f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,87 @@
+"""Replay a report stream through GrowcubeDataCoordinator.handle_report.
+
+Compares the table driven, synchronous dispatch with the previous approach of an
+isinstance chain behind a coroutine that the client scheduled as a task per report.
+
+Run with: python -m benchmarks.bench_report_dispatch
+"""
+import asyncio
+import time
+
+from growcube_client import (
+    GrowcubeReport,
+    WaterStateGrowcubeReport,
+    DeviceVersionGrowcubeReport,
+    MoistureHumidityStateGrowcubeReport,
+    PumpOpenGrowcubeReport,
+    PumpCloseGrowcubeReport,
+    CheckSensorGrowcubeReport,
+    CheckOutletBlockedGrowcubeReport,
+    CheckSensorNotConnectedGrowcubeReport,
+    LockStateGrowcubeReport,
+    CheckOutletLockedGrowcubeReport,
+)
+
+from .common import async_create_hass, create_coordinator, make_report_stream
+
+REPORTS = 200_000
+
+# Order of the former isinstance chain in handle_report
+_LEGACY_CHAIN = [
+    (DeviceVersionGrowcubeReport, "_handle_device_version"),
+    (WaterStateGrowcubeReport, "_handle_water_state"),
+    (MoistureHumidityStateGrowcubeReport, "_handle_moisture_humidity_state"),
+    (PumpOpenGrowcubeReport, "_handle_pump_open"),
+    (PumpCloseGrowcubeReport, "_handle_pump_close"),
+    (CheckSensorGrowcubeReport, "_handle_check_sensor"),
+    (CheckOutletBlockedGrowcubeReport, "_handle_outlet_blocked"),
+    (CheckSensorNotConnectedGrowcubeReport, "_handle_sensor_not_connected"),
+    (LockStateGrowcubeReport, "_handle_lock_state"),
+    (CheckOutletLockedGrowcubeReport, "_handle_outlet_locked"),
+]
+
+
+def _legacy_handler(coordinator):
+    async def handle_report(report: GrowcubeReport) -> None:
+        for report_type, name in _LEGACY_CHAIN:
+            if isinstance(report, report_type):
+                new = getattr(coordinator, name)(report)
+                if new is not None and new is not coordinator.data:
+                    coordinator.data = new
+                    coordinator.async_set_updated_data(new)
+                return
+    return handle_report
+
+
+async def _run_legacy(coordinator, reports) -> float:
+    handle_report = _legacy_handler(coordinator)
+    loop = asyncio.get_running_loop()
+    start = time.perf_counter()
+    tasks = [loop.create_task(handle_report(report)) for report in reports]
+    await asyncio.gather(*tasks)
+    return time.perf_counter() - start
+
+
+async def _run_table(coordinator, reports) -> float:
+    handle_report = coordinator.handle_report
+    start = time.perf_counter()
+    for report in reports:
+        handle_report(report)
+    return time.perf_counter() - start
+
+
+async def main() -> None:
+    hass = await async_create_hass()
+    reports = make_report_stream(REPORTS)
+
+    legacy = await _run_legacy(create_coordinator(hass), reports)
+    table = await _run_table(create_coordinator(hass), reports)
+
+    print(f"Replayed {REPORTS} reports")
+    print(f"  isinstance chain + task per report: {REPORTS / legacy:12,.0f} reports/s")
+    print(f"  table dispatch, synchronous:        {REPORTS / table:12,.0f} reports/s")
+    print(f"  speedup: {legacy / table:.2f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
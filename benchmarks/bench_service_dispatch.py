@@ -0,0 +1,90 @@
+"""Cost of resolving the coordinator for a service call, as the fleet grows.
+
+Compares the device index with the former registry lookup followed by a scan
+of every coordinator in hass.data.
+
+Run with: python -m benchmarks.bench_service_dispatch
+"""
+import asyncio
+import random
+import time
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from homeassistant.helpers import device_registry as dr
+
+from custom_components.growcube.const import DOMAIN
+from custom_components.growcube.device_index import async_get_device_index
+
+from .common import async_create_hass
+
+ENTRIES = 500
+CALLS = 20_000
+
+
+class _DeviceRegistry:
+    """Stand-in for the device registry, with the same dict backed lookups."""
+
+    def __init__(self):
+        self.devices = {}
+
+    def add(self, device_id, identifiers):
+        self.devices[device_id] = SimpleNamespace(id=device_id, identifiers=identifiers)
+
+    def async_get(self, device_id):
+        return self.devices.get(device_id)
+
+    def async_get_device(self, identifiers):
+        return None
+
+
+class _Coordinator:
+    def __init__(self, growcube_id):
+        self.data = SimpleNamespace(device_id=growcube_id)
+
+
+def _scan_coordinators(hass, device_id):
+    device_entry = dr.async_get(hass).async_get(device_id)
+    device = list(device_entry.identifiers)[0][1]
+    for key in hass.data[DOMAIN]:
+        coordinator = hass.data[DOMAIN][key]
+        if coordinator.data.device_id == device:
+            return coordinator
+    return None
+
+
+async def main() -> None:
+    hass = await async_create_hass()
+    registry = _DeviceRegistry()
+    index = async_get_device_index(hass)
+    hass.data[DOMAIN] = {}
+
+    with patch.object(dr, "async_get", return_value=registry):
+        device_ids = []
+        for number in range(ENTRIES):
+            growcube_id = f"growcube_{number:x}"
+            coordinator = _Coordinator(growcube_id)
+            hass.data[DOMAIN][f"entry_{number}"] = coordinator
+            registry.add(f"device_{number}", {(DOMAIN, growcube_id)})
+            device_ids.append(f"device_{number}")
+            index.async_update(coordinator)
+
+        calls = [random.choice(device_ids) for _ in range(CALLS)]
+
+        start = time.perf_counter()
+        for device_id in calls:
+            _scan_coordinators(hass, device_id)
+        scan = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for device_id in calls:
+            index.async_get(device_id)
+        indexed = time.perf_counter() - start
+
+    print(f"{ENTRIES} entries, {CALLS} service calls")
+    print(f"  registry lookup + scan: {scan / CALLS * 1e6:8.2f} us/call")
+    print(f"  device index:           {indexed / CALLS * 1e6:8.2f} us/call")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,55 @@
+"""Shared helpers for the Growcube benchmarks."""
+import random
+import tempfile
+from typing import List
+from unittest.mock import patch
+
+from growcube_client import (
+    GrowcubeReport,
+    WaterStateGrowcubeReport,
+    MoistureHumidityStateGrowcubeReport,
+    PumpOpenGrowcubeReport,
+    PumpCloseGrowcubeReport,
+    LockStateGrowcubeReport,
+)
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import device_registry as dr
+
+from custom_components.growcube.coordinator import GrowcubeDataCoordinator
+
+
+def make_report_stream(count: int, seed: int = 42) -> List[GrowcubeReport]:
+    """Build a replayable report stream with the mix a real cube sends.
+
+    Moisture/humidity readings dominate, with the occasional pump, water and lock report.
+    """
+    rng = random.Random(seed)
+    reports: List[GrowcubeReport] = []
+    for _ in range(count):
+        roll = rng.random()
+        channel = rng.randrange(4)
+        if roll < 0.90:
+            reports.append(MoistureHumidityStateGrowcubeReport(
+                f"{channel}@{rng.randint(20, 60)}@{rng.randint(40, 60)}@{rng.randint(18, 25)}"))
+        elif roll < 0.94:
+            reports.append(PumpOpenGrowcubeReport(str(channel)))
+        elif roll < 0.98:
+            reports.append(PumpCloseGrowcubeReport(str(channel)))
+        elif roll < 0.99:
+            reports.append(WaterStateGrowcubeReport(str(rng.randint(0, 1))))
+        else:
+            reports.append(LockStateGrowcubeReport("0@0"))
+    return reports
+
+
+async def async_create_hass() -> HomeAssistant:
+    """Create a bare Home Assistant instance for benchmarking, with the device registry the coordinators use."""
+    hass = HomeAssistant(tempfile.mkdtemp())
+    await dr.async_load(hass)
+    return hass
+
+
+def create_coordinator(hass: HomeAssistant, host: str = "192.168.1.100") -> GrowcubeDataCoordinator:
+    """Create a coordinator with the network client patched out."""
+    with patch("custom_components.growcube.coordinator.GrowcubeClient"):
+        return GrowcubeDataCoordinator(host, hass)
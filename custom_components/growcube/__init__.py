@@ -1,18 +1,22 @@
 """The Growcube integration."""
 import asyncio
+from functools import partial
 import logging
 import voluptuous as vol
 import homeassistant.helpers.config_validation as cv
 from homeassistant.const import CONF_HOST, Platform
 from homeassistant import config_entries
-from .coordinator import GrowcubeDataCoordinator
+from .coordinator import GrowcubeDataCoordinator, snapshot_store
 from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.exceptions import ConfigEntryNotReady
 from homeassistant.helpers import device_registry
 
 _LOGGER = logging.getLogger(__name__)
 
-from .const import DOMAIN
+from .const import DOMAIN, CONF_WAIT_FOR_DEVICE
 from .services import async_setup_services
+from .device_index import async_get_device_index
+from .long_term_stats import async_get_statistics_importer
 
 PLATFORMS: list[Platform] = [Platform.SENSOR, Platform.BINARY_SENSOR, Platform.BUTTON]
 
@@ -22,42 +26,61 @@ async def async_setup_entry(hass: HomeAssistant, entry: config_entries.ConfigEnt
     hass.data.setdefault(DOMAIN, {})
 
     host_name = entry.data[CONF_HOST]
-    data_coordinator = GrowcubeDataCoordinator(host_name, hass)
-    try:
-        connected, error = await data_coordinator.connect()
-        if not connected:
-            _LOGGER.error(
-                "Unable to connect to %s: %s",
-                host_name,
-                error
-            )
-            return False
+    data_coordinator = GrowcubeDataCoordinator(host_name, hass, entry.options)
+    # Show the last known values until the device reports
+    await data_coordinator.async_restore_state(snapshot_store(hass, entry.entry_id))
 
+    if entry.unique_id is not None and not entry.options.get(CONF_WAIT_FOR_DEVICE, False):
+        # Create the entities from the stored device id and connect in the background,
+        # an offline device then no longer fails or delays the setup
+        data_coordinator.set_device_id(entry.unique_id)
         hass.data[DOMAIN][entry.entry_id] = data_coordinator
-
-    except asyncio.TimeoutError:
-        _LOGGER.error(
-            "Connection to %s timed out",
-            host_name
-        )
-        return False
-    except OSError:
-        _LOGGER.error(
-            "Unable to connect to host %s",
-            host_name
+        entry.async_create_background_task(
+            hass,
+            data_coordinator.async_connect_in_background(),
+            f"growcube connect {host_name}",
         )
-        return False
+    else:
+        try:
+            connected, error = await data_coordinator.connect()
+        except asyncio.TimeoutError:
+            connected, error = False, "Connection timed out"
+        except OSError as err:
+            connected, error = False, str(err)
+        if not connected:
+            # Close a connection left open by a failed handshake, a lost connection would
+            # otherwise be reconnected for an entry that isn't set up
+            data_coordinator.disconnect()
+            raise ConfigEntryNotReady(f"Unable to connect to {host_name}: {error}")
+        hass.data[DOMAIN][entry.entry_id] = data_coordinator
 
+    entry.async_on_unload(entry.add_update_listener(_async_update_listener))
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    # The device registry entry exists now that the entities are added
+    async_get_device_index(hass).async_update(data_coordinator)
+    statistics_importer = async_get_statistics_importer(hass)
+    statistics_importer.register(data_coordinator)
+    entry.async_on_unload(partial(statistics_importer.unregister, data_coordinator))
     await async_setup_services(hass)
     return True
 
 
+async def _async_update_listener(hass: HomeAssistant, entry: config_entries.ConfigEntry) -> None:
+    """Reload the entry when the options change."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: config_entries.ConfigEntry) -> bool:
     """Unload the Growcube entry."""
     client = hass.data[DOMAIN][entry.entry_id]
     client.disconnect()
+    await client.async_save_state()
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     if unload_ok:
         hass.data[DOMAIN].pop(entry.entry_id)
     return unload_ok
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: config_entries.ConfigEntry) -> None:
+    """Remove the stored state of a removed entry."""
+    await snapshot_store(hass, entry.entry_id).async_remove()
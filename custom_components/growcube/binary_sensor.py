@@ -1,9 +1,11 @@
+from typing import Any
+
 from homeassistant.const import EntityCategory, Platform
 from homeassistant.core import callback, HomeAssistant
 from homeassistant.helpers.device_registry import DeviceInfo
 from homeassistant import config_entries
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from .coordinator import GrowcubeDataCoordinator
+from .coordinator import GrowcubeDataCoordinator, field_mask
 from homeassistant.components.binary_sensor import BinarySensorEntity, BinarySensorDeviceClass
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from .const import DOMAIN, CHANNEL_NAME, CHANNEL_ID
@@ -47,7 +49,7 @@ class DeviceLockedSensor(CoordinatorEntity[GrowcubeDataCoordinator], BinarySenso
     _attr_entity_category = EntityCategory.DIAGNOSTIC
 
     def __init__(self, coordinator: GrowcubeDataCoordinator):
-        super().__init__(coordinator)
+        super().__init__(coordinator, field_mask("device_locked"))
         self._attr_unique_id = f"{coordinator.data.device_id}_device_locked"
         self._attr_device_info = coordinator.data.device_info
 
@@ -63,7 +65,7 @@ class WaterWarningSensor(CoordinatorEntity[GrowcubeDataCoordinator], BinarySenso
     _attr_entity_category = EntityCategory.DIAGNOSTIC
 
     def __init__(self, coordinator: GrowcubeDataCoordinator):
-        super().__init__(coordinator)
+        super().__init__(coordinator, field_mask("water_warning"))
         self._attr_unique_id = f"{coordinator.data.device_id}_water_warning"
         self._attr_device_info = coordinator.data.device_info
 
@@ -71,6 +73,10 @@ class WaterWarningSensor(CoordinatorEntity[GrowcubeDataCoordinator], BinarySenso
     def is_on(self) -> bool:
         return self.coordinator.data.water_warning
 
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        return {"stale": self.coordinator.is_stale("water_warning")}
+
     @property
     def icon(self) -> str:
         return "mdi:water-alert" if self.is_on else "mdi:water-check"
@@ -82,7 +88,7 @@ class PumpOpenStateSensor(CoordinatorEntity[GrowcubeDataCoordinator], BinarySens
     _attr_entity_registry_enabled_default = False
 
     def __init__(self, coordinator: GrowcubeDataCoordinator, channel: int) -> None:
-        super().__init__(coordinator)
+        super().__init__(coordinator, field_mask("pump_open", channel))
         self._channel = channel
         self._attr_name = f"Pump {CHANNEL_NAME[channel]} open"
         self._attr_unique_id = f"{coordinator.data.device_id}_pump_{CHANNEL_ID[channel]}_open"
@@ -103,7 +109,7 @@ class OutletLockedSensor(CoordinatorEntity[GrowcubeDataCoordinator], BinarySenso
     _attr_entity_category = EntityCategory.DIAGNOSTIC
 
     def __init__(self, coordinator: GrowcubeDataCoordinator, channel: int) -> None:
-        super().__init__(coordinator)
+        super().__init__(coordinator, field_mask("outlet_locked", channel))
         self._channel = channel
         self._attr_name = f"Outlet {CHANNEL_NAME[channel]} locked"
         self._attr_unique_id = f"{coordinator.data.device_id}_outlet_{CHANNEL_ID[channel]}_locked"
@@ -124,7 +130,7 @@ class OutletBlockedSensor(CoordinatorEntity[GrowcubeDataCoordinator], BinarySens
     _attr_entity_category = EntityCategory.DIAGNOSTIC
 
     def __init__(self, coordinator: GrowcubeDataCoordinator, channel: int) -> None:
-        super().__init__(coordinator)
+        super().__init__(coordinator, field_mask("outlet_blocked", channel))
         self._channel = channel
         self._attr_name = f"Outlet {CHANNEL_NAME[channel]} blocked"
         self._attr_unique_id = f"{coordinator.data.device_id}_outlet_{CHANNEL_ID[channel]}_blocked"
@@ -145,7 +151,7 @@ class SensorFaultSensor(CoordinatorEntity[GrowcubeDataCoordinator], BinarySensor
     _attr_entity_category = EntityCategory.DIAGNOSTIC
 
     def __init__(self, coordinator: GrowcubeDataCoordinator, channel: int) -> None:
-        super().__init__(coordinator)
+        super().__init__(coordinator, field_mask("sensor_fault", channel))
         self._channel = channel
         self._attr_name = f"Sensor {CHANNEL_NAME[channel]} fault"
         self._attr_unique_id = f"{coordinator.data.device_id}_sensor_{CHANNEL_ID[channel]}_fault"
@@ -166,7 +172,7 @@ class SensorDisconnectedSensor(CoordinatorEntity[GrowcubeDataCoordinator], Binar
     _attr_entity_category = EntityCategory.DIAGNOSTIC
 
     def __init__(self, coordinator: GrowcubeDataCoordinator, channel: int) -> None:
-        super().__init__(coordinator)
+        super().__init__(coordinator, field_mask("sensor_disconnected", channel))
         self._channel = channel
         self._attr_name = f"Sensor {CHANNEL_NAME[channel]} disconnected"
         self._attr_unique_id = f"{coordinator.data.device_id}_sensor_{CHANNEL_ID[channel]}_disconnected"
@@ -4,7 +4,7 @@ from homeassistant.core import HomeAssistant
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
-from .coordinator import GrowcubeDataCoordinator
+from .coordinator import GrowcubeDataCoordinator, FIELD_DEVICE
 from .const import DOMAIN
 
 
@@ -26,7 +26,7 @@ class WaterPlantButton(CoordinatorEntity[GrowcubeDataCoordinator], ButtonEntity)
     _channel_id = ['a', 'b', 'c', 'd']
 
     def __init__(self, coordinator: GrowcubeDataCoordinator, channel: int) -> None:
-        super().__init__(coordinator)
+        super().__init__(coordinator, FIELD_DEVICE)
         self._channel = channel
         self._attr_name = f"Water plant {self._channel_name[channel]}"
         self._attr_unique_id = f"{coordinator.data.device_id}_water_plant_{self._channel_id[channel]}"
@@ -0,0 +1,160 @@
+"""Outbound command queue of a Growcube device."""
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional, Tuple
+
+from growcube_client import (
+    GrowcubeCommand,
+    GrowcubeReport,
+    ClosePumpCommand,
+    WaterCommand,
+    PumpOpenGrowcubeReport,
+    PumpCloseGrowcubeReport,
+)
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+
+from .const import COMMAND_PACING, COMMAND_TIMEOUT
+from .stats import LatencyHistogram
+
+# Lower values are sent first
+PRIORITY_PUMP_CLOSE = 0
+PRIORITY_PUMP_OPEN = 1
+PRIORITY_CONFIG = 2
+
+
+def command_priority(command: GrowcubeCommand) -> int:
+    """Return the priority of a command, closing a pump beats everything else."""
+    if isinstance(command, WaterCommand):
+        return PRIORITY_PUMP_OPEN if command.state else PRIORITY_PUMP_CLOSE
+    if isinstance(command, ClosePumpCommand):
+        return PRIORITY_PUMP_CLOSE
+    return PRIORITY_CONFIG
+
+
+def command_ack(command: GrowcubeCommand) -> Optional[Tuple[type, int]]:
+    """Return the report type and channel acknowledging a command, None if the device doesn't answer it."""
+    if isinstance(command, WaterCommand):
+        return (PumpOpenGrowcubeReport if command.state else PumpCloseGrowcubeReport), command.channel.value
+    return None
+
+
+@dataclass(order=True)
+class _QueuedCommand:
+    priority: int
+    sequence: int
+    command: GrowcubeCommand = field(compare=False)
+    ack: Optional[Tuple[type, int]] = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+    queued_at: float = field(compare=False)
+
+
+class CommandQueue:
+    """Sends the commands of a single device one at a time, by priority.
+
+    Commands are paced so the firmware isn't sent a burst of messages, and a
+    command the device answers with a report is completed when that report
+    arrives. The worker task only runs while there are commands to send.
+    """
+
+    def __init__(self,
+                 hass: HomeAssistant,
+                 send: Callable[[GrowcubeCommand], bool],
+                 name: str,
+                 latency: LatencyHistogram,
+                 pacing: float = COMMAND_PACING) -> None:
+        self._hass = hass
+        self._send = send
+        self._name = name
+        self._latency = latency
+        self._pacing = pacing
+        self._queue: List[_QueuedCommand] = []
+        self._sequence = itertools.count()
+        self._awaiting_ack: List[_QueuedCommand] = []
+        self._next_send = 0.0
+        self._worker: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    async def async_send(self, command: GrowcubeCommand, timeout: float = COMMAND_TIMEOUT) -> float:
+        """Queue a command and wait until it has been acknowledged, or sent if the device doesn't answer it.
+
+        Returns the latency in seconds from queuing the command until it completed.
+        """
+        loop = self._hass.loop
+        queued = _QueuedCommand(
+            command_priority(command),
+            next(self._sequence),
+            command,
+            command_ack(command),
+            loop.create_future(),
+            loop.time(),
+        )
+        heapq.heappush(self._queue, queued)
+        if self._worker is None:
+            self._worker = self._hass.async_create_background_task(
+                self._async_run(), f"growcube commands {self._name}")
+        try:
+            latency = await asyncio.wait_for(queued.future, timeout)
+        except asyncio.TimeoutError:
+            if queued in self._awaiting_ack:
+                self._awaiting_ack.remove(queued)
+            raise HomeAssistantError(
+                f"Timed out waiting for {command.get_description()} to complete") from None
+        self._latency.record(latency)
+        return latency
+
+    @callback
+    def async_handle_report(self, report: GrowcubeReport) -> None:
+        """Complete the oldest command waiting for this report."""
+        if not self._awaiting_ack:
+            return
+        for queued in self._awaiting_ack:
+            report_type, channel = queued.ack
+            if not queued.future.done() and isinstance(report, report_type) and report.channel == channel:
+                queued.future.set_result(self._hass.loop.time() - queued.queued_at)
+                break
+        self._awaiting_ack = [queued for queued in self._awaiting_ack if not queued.future.done()]
+
+    @callback
+    def async_cancel(self) -> None:
+        """Stop the worker and fail all queued commands."""
+        if self._worker is not None:
+            self._worker.cancel()
+            self._worker = None
+        for queued in self._queue + self._awaiting_ack:
+            if not queued.future.done():
+                queued.future.set_exception(HomeAssistantError("Device was unloaded"))
+        self._queue.clear()
+        self._awaiting_ack.clear()
+
+    async def _async_run(self) -> None:
+        loop = self._hass.loop
+        try:
+            while self._queue:
+                delay = self._next_send - loop.time()
+                if delay > 0:
+                    # A more urgent command may be queued while waiting
+                    await asyncio.sleep(delay)
+                    continue
+                queued = heapq.heappop(self._queue)
+                if queued.future.done():
+                    # The caller timed out or was cancelled
+                    continue
+                if not self._send(queued.command):
+                    queued.future.set_exception(
+                        HomeAssistantError(f"Failed to send {queued.command.get_description()}"))
+                    continue
+                self._next_send = loop.time() + self._pacing
+                if queued.ack is None:
+                    queued.future.set_result(loop.time() - queued.queued_at)
+                else:
+                    self._awaiting_ack.append(queued)
+        finally:
+            if self._worker is asyncio.current_task():
+                self._worker = None
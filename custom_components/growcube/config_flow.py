@@ -3,39 +3,88 @@ from typing import Optional, Dict, Any
 
 import voluptuous as vol
 import asyncio
+from ipaddress import ip_network
 from homeassistant import config_entries
 from homeassistant.config_entries import ConfigFlowResult
 from homeassistant.helpers.service_info.dhcp import DhcpServiceInfo
 from homeassistant.core import callback
-from homeassistant.const import CONF_HOST
+from homeassistant.const import CONF_HOST, CONF_HOSTS
+import homeassistant.helpers.config_validation as cv
 from homeassistant.data_entry_flow import FlowResult
+from homeassistant.helpers.device_registry import format_mac
 
 from . import GrowcubeDataCoordinator
-from .const import DOMAIN
+from .discovery import async_get_discovery_prober, async_scan_network
+from .const import (
+    DOMAIN,
+    CONF_WAIT_FOR_DEVICE,
+    CONF_COALESCE_WINDOW,
+    DEFAULT_COALESCE_WINDOW,
+    CONF_DEBUG_LOGGING,
+    CONF_LIVENESS_TIMEOUT,
+    DEFAULT_LIVENESS_TIMEOUT,
+    CONF_MOISTURE_DEADBAND,
+    CONF_TEMPERATURE_DEADBAND,
+    CONF_HUMIDITY_DEADBAND,
+    CONF_MIN_PUBLISH_INTERVAL,
+    CONF_DEADBAND_OVERRIDE_INTERVAL,
+    CONF_PUMP_FLOW_RATE,
+    CONF_NETWORK,
+    SCAN_MAX_HOSTS,
+)
 
 DATA_SCHEMA = {
     vol.Required(CONF_HOST): str,
 }
 
 
+SCAN_SCHEMA = {
+    vol.Required(CONF_NETWORK): str,
+}
+
+
 class GrowcubeConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Growcube config flow."""
     VERSION = 1
 
+    def __init__(self) -> None:
+        # Address and device id of the new devices found by a network scan
+        self._found: Dict[str, str] = {}
+
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry: config_entries.ConfigEntry) -> config_entries.OptionsFlow:
+        """Get the options flow for this handler."""
+        return GrowcubeOptionsFlow(config_entry)
+
     async def async_step_dhcp(self, discovery_info: DhcpServiceInfo) -> ConfigFlowResult:
         """Handle DHCP discovery flow."""
         host = discovery_info.ip
-        # Validate device by connecting and getting device_id
-        result, device_id_or_error = await GrowcubeDataCoordinator.get_device_id(host)
-        if not result:
+        # A configured device only accepts the connection it already has, don't probe it
+        self._async_abort_entries_match({CONF_HOST: host})
+        # Validate device by connecting and getting device_id, the result is cached per MAC address
+        device_id = await async_get_discovery_prober(self.hass).async_probe(
+            format_mac(discovery_info.macaddress), host)
+        if device_id is None:
             return self.async_abort(reason="cannot_connect")
 
-        await self.async_set_unique_id(device_id_or_error)
+        await self.async_set_unique_id(device_id)
         self._abort_if_unique_id_configured(updates={CONF_HOST: host})
         return self.async_create_entry(title=host, data={CONF_HOST: host})
 
+    async def async_step_integration_discovery(self, discovery_info: dict[str, Any]) -> ConfigFlowResult:
+        """Add a device selected from a network scan, started by the flow that did the scan."""
+        await self.async_set_unique_id(discovery_info["device_id"])
+        self._abort_if_unique_id_configured(updates={CONF_HOST: discovery_info[CONF_HOST]})
+        return self.async_create_entry(title=discovery_info[CONF_HOST],
+                                       data={CONF_HOST: discovery_info[CONF_HOST]})
+
     async def async_step_user(self, user_input: dict[str, Any] | None = None) -> ConfigFlowResult:
         """Handle a flow initialized by the user."""
+        return self.async_show_menu(step_id="user", menu_options=["host", "scan"])
+
+    async def async_step_host(self, user_input: dict[str, Any] | None = None) -> ConfigFlowResult:
+        """Add a device by its address."""
 
         if not user_input:
             return await self._show_form()
@@ -52,6 +101,61 @@ class GrowcubeConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         return self.async_create_entry(title=user_input[CONF_HOST],
                                        data=user_input)
 
+    async def async_step_scan(self, user_input: dict[str, Any] | None = None) -> ConfigFlowResult:
+        """Scan a network for Growcube devices."""
+        errors = {}
+        if user_input is not None:
+            try:
+                network = ip_network(user_input[CONF_NETWORK].strip(), strict=False)
+            except ValueError:
+                errors[CONF_NETWORK] = "invalid_network"
+            else:
+                if network.num_addresses > SCAN_MAX_HOSTS:
+                    errors[CONF_NETWORK] = "network_too_large"
+                else:
+                    return await self._async_scan(network)
+
+        return self.async_show_form(
+            step_id="scan",
+            data_schema=self.add_suggested_values_to_schema(vol.Schema(SCAN_SCHEMA), user_input),
+            errors=errors
+        )
+
+    async def _async_scan(self, network) -> ConfigFlowResult:
+        """Find the devices in the network that aren't configured yet."""
+        entries = self._async_current_entries(include_ignore=False)
+        # Configured devices only accept the connection they already have, so aren't probed
+        found = await async_scan_network(network, skip={entry.data.get(CONF_HOST) for entry in entries})
+        configured = {entry.unique_id for entry in entries}
+        self._found = {host: device_id for host, device_id in found.items() if device_id not in configured}
+        if not self._found:
+            return self.async_abort(reason="no_devices_found")
+        return await self.async_step_scan_select()
+
+    async def async_step_scan_select(self, user_input: dict[str, Any] | None = None) -> ConfigFlowResult:
+        """Select the devices to add from the ones found by the scan."""
+        if user_input is not None and user_input[CONF_HOSTS]:
+            host, *others = user_input[CONF_HOSTS]
+            # A flow creates a single entry, the other devices are added by flows of their own
+            for other in others:
+                self.hass.async_create_task(self.hass.config_entries.flow.async_init(
+                    DOMAIN,
+                    context={"source": config_entries.SOURCE_INTEGRATION_DISCOVERY},
+                    data={CONF_HOST: other, "device_id": self._found[other]},
+                ))
+            await self.async_set_unique_id(self._found[host])
+            self._abort_if_unique_id_configured(updates={CONF_HOST: host})
+            return self.async_create_entry(title=host, data={CONF_HOST: host})
+
+        devices = {host: f"{host} (GrowCube {hex(int(device_id))[2:]})" for host, device_id in self._found.items()}
+        return self.async_show_form(
+            step_id="scan_select",
+            data_schema=vol.Schema({
+                vol.Required(CONF_HOSTS, default=list(devices)): cv.multi_select(devices),
+            }),
+            errors={CONF_HOSTS: "no_devices_selected"} if user_input is not None else {},
+        )
+
     async def _async_validate_user_input(self, user_input: dict[str, Any]) -> tuple[Dict[str, str], Optional[str]]:
         """Validate the user input."""
         errors = {}
@@ -67,7 +171,55 @@ class GrowcubeConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     async def _show_form(self, errors: dict[str, str] | None = None) -> ConfigFlowResult:
         """Show the form to the user."""
         return self.async_show_form(
-            step_id="user",
+            step_id="host",
             data_schema=vol.Schema(DATA_SCHEMA),
             errors=errors if errors else {}
         )
+
+
+class GrowcubeOptionsFlow(config_entries.OptionsFlow):
+    """Growcube options flow."""
+
+    def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
+        # Kept here, OptionsFlow only provides config_entry itself on recent cores
+        self._config_entry = config_entry
+
+    async def async_step_init(self, user_input: dict[str, Any] | None = None) -> ConfigFlowResult:
+        """Manage the options."""
+        if user_input is not None:
+            return self.async_create_entry(data=user_input)
+
+        options = self._config_entry.options
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema({
+                vol.Optional(CONF_WAIT_FOR_DEVICE,
+                             default=options.get(CONF_WAIT_FOR_DEVICE, False)): bool,
+                vol.Optional(CONF_COALESCE_WINDOW,
+                             default=options.get(CONF_COALESCE_WINDOW, DEFAULT_COALESCE_WINDOW)): vol.All(
+                    vol.Coerce(int), vol.Range(min=0, max=250)),
+                vol.Optional(CONF_LIVENESS_TIMEOUT,
+                             default=options.get(CONF_LIVENESS_TIMEOUT, DEFAULT_LIVENESS_TIMEOUT)): vol.All(
+                    vol.Coerce(int), vol.Range(min=0, max=3600)),
+                vol.Optional(CONF_MOISTURE_DEADBAND,
+                             default=options.get(CONF_MOISTURE_DEADBAND, 0)): vol.All(
+                    vol.Coerce(int), vol.Range(min=0, max=20)),
+                vol.Optional(CONF_TEMPERATURE_DEADBAND,
+                             default=options.get(CONF_TEMPERATURE_DEADBAND, 0)): vol.All(
+                    vol.Coerce(int), vol.Range(min=0, max=10)),
+                vol.Optional(CONF_HUMIDITY_DEADBAND,
+                             default=options.get(CONF_HUMIDITY_DEADBAND, 0)): vol.All(
+                    vol.Coerce(int), vol.Range(min=0, max=20)),
+                vol.Optional(CONF_MIN_PUBLISH_INTERVAL,
+                             default=options.get(CONF_MIN_PUBLISH_INTERVAL, 0)): vol.All(
+                    vol.Coerce(int), vol.Range(min=0, max=3600)),
+                vol.Optional(CONF_DEADBAND_OVERRIDE_INTERVAL,
+                             default=options.get(CONF_DEADBAND_OVERRIDE_INTERVAL, 0)): vol.All(
+                    vol.Coerce(int), vol.Range(min=0, max=86400)),
+                vol.Optional(CONF_PUMP_FLOW_RATE,
+                             default=options.get(CONF_PUMP_FLOW_RATE, 0)): vol.All(
+                    vol.Coerce(float), vol.Range(min=0, max=10000)),
+                vol.Optional(CONF_DEBUG_LOGGING,
+                             default=options.get(CONF_DEBUG_LOGGING, False)): bool,
+            }),
+        )
@@ -1,15 +1,87 @@
 """Constants for the Growcube integration."""
 
 DOMAIN = "growcube"
+CONF_WAIT_FOR_DEVICE = "wait_for_device"
+CONF_COALESCE_WINDOW = "coalesce_window"
+DEFAULT_COALESCE_WINDOW = 0
+CONF_DEBUG_LOGGING = "debug_logging"
+CONF_MOISTURE_DEADBAND = "moisture_deadband"
+CONF_TEMPERATURE_DEADBAND = "temperature_deadband"
+CONF_HUMIDITY_DEADBAND = "humidity_deadband"
+CONF_MIN_PUBLISH_INTERVAL = "min_publish_interval"
+CONF_DEADBAND_OVERRIDE_INTERVAL = "deadband_override_interval"
+CONF_LIVENESS_TIMEOUT = "liveness_timeout"
+DEFAULT_LIVENESS_TIMEOUT = 90
+# Flow rate of the pumps in millilitres per minute, 0 leaves out the water sensors
+CONF_PUMP_FLOW_RATE = "pump_flow_rate"
+GROWCUBE_PORT = 8800
 CHANNEL_NAME = ['A', 'B', 'C', 'D']
 CHANNEL_ID = ['a', 'b', 'c', 'd']
 SERVICE_WATER_PLANT = "water_plant"
 SERVICE_SET_SMART_WATERING = "set_smart_watering"
 SERVICE_SET_SCHEDULED_WATERING = "set_scheduled_watering"
 SERVICE_DELETE_WATERING = "delete_watering"
+SERVICE_WATER_PLANT_BATCH = "water_plant_batch"
+SERVICE_SET_SMART_WATERING_BATCH = "set_smart_watering_batch"
+SERVICE_SET_SCHEDULED_WATERING_BATCH = "set_scheduled_watering_batch"
+SERVICE_DELETE_WATERING_BATCH = "delete_watering_batch"
+SERVICE_GET_HISTORY = "get_history"
+SERVICE_SET_CONTROLLED_WATERING = "set_controlled_watering"
+SERVICE_DELETE_CONTROLLED_WATERING = "delete_controlled_watering"
+SERVICE_APPLY_WATERING_MODE = "apply_watering_mode"
 ARGS_CHANNEL = "channel"
 ARGS_DURATION = "duration"
 ARGS_MIN_MOISTURE = "min_moisture"
 ARGS_MAX_MOISTURE = "max_moisture"
 ARGS_ALL_DAY = "all_day"
 ARGS_INTERVAL = "interval"
+ARGS_CHANNELS = "channels"
+ARGS_MAX_PARALLEL = "max_parallel"
+ARGS_START = "start"
+ARGS_END = "end"
+ARGS_SERIES = "series"
+ARGS_MIN_INTERVAL = "min_interval"
+ARGS_MAX_DAILY = "max_daily"
+ARGS_ENABLED = "enabled"
+ARGS_MODE = "mode"
+ARGS_FORCE = "force"
+# Watering modes of the apply_watering_mode service, off deletes the watering of the channel
+WATERING_MODE_SMART = "smart"
+WATERING_MODE_SCHEDULED = "scheduled"
+WATERING_MODE_OFF = "off"
+DEFAULT_MAX_PARALLEL = 8
+DATA_RECONNECT_SCHEDULER = "growcube_reconnect_scheduler"
+RECONNECT_BASE_DELAY = 10
+RECONNECT_MAX_DELAY = 300
+RECONNECT_MAX_CONCURRENT = 4
+DATA_DEVICE_INDEX = "growcube_device_index"
+DATA_WATCHDOG = "growcube_watchdog"
+DATA_DISCOVERY_PROBER = "growcube_discovery_prober"
+DATA_STATISTICS_IMPORTER = "growcube_statistics_importer"
+# Hours of statistics kept per series while they can't be imported
+STATISTICS_MAX_PENDING_HOURS = 168
+# Seconds between two checks of the liveness watchdog
+WATCHDOG_INTERVAL = 10
+
+# Seconds between two commands sent to a device, and the default time to wait for a command to complete
+COMMAND_PACING = 0.25
+COMMAND_TIMEOUT = 10
+ARGS_TIMEOUT = "timeout"
+
+# Version of the stored last known state, and the minimum seconds between writing it
+STORAGE_VERSION = 1
+SNAPSHOT_SAVE_DELAY = 60
+
+# Seconds to remember whether a DHCP discovered host is a Growcube, the seconds to
+# wait for its port to accept a connection, and the number of hosts probed at once
+DISCOVERY_POSITIVE_TTL = 86400
+DISCOVERY_NEGATIVE_TTL = 21600
+DISCOVERY_PORT_TIMEOUT = 1
+DISCOVERY_MAX_CONCURRENT = 2
+
+# Largest network the config flow scans, the number of hosts checked at once and the
+# seconds to wait for each host to accept a connection
+CONF_NETWORK = "network"
+SCAN_MAX_HOSTS = 1024
+SCAN_MAX_PARALLEL = 64
+SCAN_PORT_TIMEOUT = 0.5
@@ -0,0 +1,139 @@
+"""Watering controller running on the moisture reports of a Growcube."""
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, NamedTuple, Optional, TYPE_CHECKING
+
+from growcube_client import Channel
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.util import dt as dt_util
+
+from .const import CHANNEL_NAME
+
+if TYPE_CHECKING:
+    from .coordinator import GrowcubeData
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class ControllerSettings(NamedTuple):
+    """Controlled watering of a channel."""
+    min_moisture: int
+    max_moisture: int
+    # Seconds of watering per dose
+    duration: int
+    # Seconds from the start of a dose to the start of the next one
+    min_interval: int
+    # Seconds of watering per day
+    max_daily: int
+    enabled: bool = True
+
+
+def _day(timestamp: float) -> int:
+    return dt_util.as_local(dt_util.utc_from_timestamp(timestamp)).date().toordinal()
+
+
+class WateringController:
+    """Waters the channels of a device from its moisture reports.
+
+    A channel is watered once its moisture drops below the minimum, and then
+    again on later reports until it reaches the maximum, with at least the
+    minimum interval between doses and at most the daily maximum of watering.
+    Unlike the smart watering of the device itself, the settings can be changed
+    from automations, for example to pause watering when rain is expected.
+    """
+
+    def __init__(self, hass: HomeAssistant, water: Callable[[Channel, int], Awaitable[Any]]) -> None:
+        self._hass = hass
+        self._water = water
+        self.settings: Dict[int, ControllerSettings] = {}
+        # Whether a channel is between dropping below its minimum and reaching its maximum
+        self._watering = [False] * 4
+        self.last_watered: List[float] = [0.0] * 4
+        # Seconds watered today, the day is the ordinal of the local date
+        self.dosed: List[int] = [0] * 4
+        self._day = 0
+        self._tasks: Dict[int, asyncio.Task] = {}
+
+    @callback
+    def async_set(self, channel: int, settings: Optional[ControllerSettings]) -> None:
+        """Set the controlled watering of a channel, None removes it."""
+        if settings is None:
+            self.settings.pop(channel, None)
+        else:
+            self.settings[channel] = settings
+        self._watering[channel] = False
+
+    @callback
+    def async_handle_moisture(self, data: GrowcubeData, channel: int, moisture: int, now: float) -> None:
+        """Start a dose when a moisture reading calls for it."""
+        settings = self.settings.get(channel)
+        if settings is None or not settings.enabled:
+            return
+        if moisture >= settings.max_moisture:
+            self._watering[channel] = False
+            return
+        if moisture < settings.min_moisture:
+            self._watering[channel] = True
+        if not self._watering[channel] or channel in self._tasks:
+            return
+        if data.pump_open[channel] or data.outlet_blocked[channel] \
+                or data.sensor_fault[channel] or data.sensor_disconnected[channel]:
+            # Watering already, or the reading or outlet can't be trusted
+            return
+        if now - self.last_watered[channel] < settings.min_interval:
+            return
+        day = _day(now)
+        if day != self._day:
+            self._day = day
+            self.dosed = [0] * 4
+        duration = min(settings.duration, settings.max_daily - self.dosed[channel])
+        if duration <= 0:
+            return
+
+        self.last_watered[channel] = now
+        self.dosed[channel] += duration
+        _LOGGER.debug("Channel %s: Moisture %s, watering for %s seconds to reach %s",
+                      CHANNEL_NAME[channel], moisture, duration, settings.max_moisture)
+        self._tasks[channel] = self._hass.async_create_background_task(
+            self._async_water(channel, duration),
+            f"growcube controlled watering {CHANNEL_NAME[channel]}",
+        )
+
+    async def _async_water(self, channel: int, duration: int) -> None:
+        try:
+            await self._water(Channel(channel), duration)
+        except HomeAssistantError as err:
+            _LOGGER.warning("Channel %s: Controlled watering failed: %s", CHANNEL_NAME[channel], err)
+        finally:
+            self._tasks.pop(channel, None)
+
+    @callback
+    def async_cancel(self) -> None:
+        """Cancel the doses in progress."""
+        for task in self._tasks.values():
+            task.cancel()
+        self._tasks.clear()
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the settings and doses, for the stored state."""
+        return {
+            "settings": [self.settings[channel]._asdict() if channel in self.settings else None
+                         for channel in range(4)],
+            "last_watered": self.last_watered,
+            "dosed": self.dosed,
+            "day": self._day,
+        }
+
+    def restore(self, stored: Optional[Dict[str, Any]]) -> None:
+        """Continue from stored settings and doses."""
+        if not stored:
+            return
+        self.settings = {channel: ControllerSettings(**settings)
+                         for channel, settings in enumerate(stored.get("settings", ())) if settings}
+        self.last_watered = list(stored.get("last_watered", self.last_watered))
+        self.dosed = list(stored.get("dosed", self.dosed))
+        self._day = stored.get("day", 0)
@@ -1,7 +1,10 @@
 import asyncio
+import contextlib
+import functools
+import time
+from types import MappingProxyType
 from datetime import datetime
-from typing import Optional, List, Tuple, Callable
-from dataclasses import replace
+from typing import Optional, Tuple, Callable, Dict, Iterator, Any, NamedTuple, Mapping, List, Awaitable, Set
 
 from growcube_client import GrowcubeClient, GrowcubeReport, Channel, WateringMode
 from growcube_client import (
@@ -16,44 +19,209 @@ from growcube_client import (
     LockStateGrowcubeReport,
     CheckOutletLockedGrowcubeReport,
 )
-from growcube_client import WateringModeCommand, SyncTimeCommand, PlantEndCommand, ClosePumpCommand
-from homeassistant.core import HomeAssistant
+from growcube_client import (
+    GrowcubeCommand,
+    WateringModeCommand,
+    SyncTimeCommand,
+    PlantEndCommand,
+    ClosePumpCommand,
+    WaterCommand,
+)
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
 from homeassistant.const import (
     STATE_UNAVAILABLE
 )
 import logging
 
 from homeassistant.helpers.device_registry import DeviceInfo
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
 
-from .const import DOMAIN
+from .command_queue import CommandQueue
+from .const import (
+    DOMAIN,
+    GROWCUBE_PORT,
+    CONF_COALESCE_WINDOW,
+    DEFAULT_COALESCE_WINDOW,
+    CONF_DEBUG_LOGGING,
+    CONF_LIVENESS_TIMEOUT,
+    DEFAULT_LIVENESS_TIMEOUT,
+    CONF_MOISTURE_DEADBAND,
+    CONF_TEMPERATURE_DEADBAND,
+    CONF_HUMIDITY_DEADBAND,
+    CONF_MIN_PUBLISH_INTERVAL,
+    CONF_DEADBAND_OVERRIDE_INTERVAL,
+    COMMAND_TIMEOUT,
+    STORAGE_VERSION,
+    SNAPSHOT_SAVE_DELAY,
+    WATERING_MODE_SMART,
+    WATERING_MODE_SCHEDULED,
+    WATERING_MODE_OFF,
+)
+from .device_index import async_get_device_index
+from .history import DeviceHistory
+from .controller import ControllerSettings, WateringController
+from .long_term_stats import DeviceStatistics
+from .pump_runtime import PumpRuntime
+from .reconnect import ReconnectState, async_get_reconnect_scheduler
+from .stats import CoordinatorStats
+from .watchdog import async_get_watchdog
 
 _LOGGER = logging.getLogger(__name__)
 
+# Seconds to wait for the DeviceVersionGrowcubeReport after connecting
+DEVICE_ID_TIMEOUT = 5
+
+# Seconds after connecting for the device to report its problems again, problem
+# flags kept from before the connection was lost are cleared after this
+CONNECT_SETTLE_TIME = 10
+
+
+# Change tracking: one bit per scalar field and one bit per channel of each
+# per-channel field. Entities subscribe with the mask of the fields they show.
+FIELD_DEVICE = 1 << 0
+FIELD_CONNECTION = 1 << 1
+_FIRST_DATA_BIT = 2
+_SCALAR_FIELDS = ("temperature", "humidity", "water_warning", "device_locked")
+_CHANNEL_FIELDS = ("moisture", "pump_open", "sensor_fault", "sensor_disconnected", "outlet_blocked", "outlet_locked")
+_FIELD_BITS: Dict[str, int] = {
+    name: 1 << (_FIRST_DATA_BIT + index) for index, name in enumerate(_SCALAR_FIELDS)
+}
+_CHANNEL_FIELD_SHIFT: Dict[str, int] = {
+    name: _FIRST_DATA_BIT + len(_SCALAR_FIELDS) + 4 * index for index, name in enumerate(_CHANNEL_FIELDS)
+}
+ALL_FIELDS = (1 << (_FIRST_DATA_BIT + len(_SCALAR_FIELDS) + 4 * len(_CHANNEL_FIELDS))) - 1
+
+
+# Minimum seconds between debug logs of a chatty report type, unless debug
+# logging is enabled for the device
+REPORT_LOG_INTERVAL: Dict[type, float] = {
+    MoistureHumidityStateGrowcubeReport: 60,
+}
+
+# Reports that are published right away, even when coalescing is enabled
+_PUBLISH_IMMEDIATELY = frozenset({
+    CheckOutletBlockedGrowcubeReport,
+    WaterStateGrowcubeReport,
+    PumpOpenGrowcubeReport,
+    PumpCloseGrowcubeReport,
+})
+
+
+def field_mask(attr: str, channel: Optional[int] = None) -> int:
+    """Return the change bit for a field, or for one channel of a per-channel field."""
+    if channel is None:
+        return _FIELD_BITS[attr]
+    return 1 << (_CHANNEL_FIELD_SHIFT[attr] + channel)
+
+
+# Fields kept in the stored snapshot of the last known state. The problem flags
+# aren't, the device only reports them when set.
+_SNAPSHOT_FIELDS = ("temperature", "humidity", "moisture", "water_warning")
+_SNAPSHOT_MASK = (field_mask("temperature") | field_mask("humidity") | field_mask("water_warning")
+                  | sum(field_mask("moisture", channel) for channel in range(4)))
+
+
+# Flags the device only reports when set, they are cleared when not reported after a reconnect
+_FLAG_FIELDS = ("pump_open", "sensor_fault", "sensor_disconnected", "outlet_blocked", "outlet_locked")
+
+
+# Reports that update the stored statistics or pump runtime, even when no field changes
+_SAVED_REPORTS = frozenset({
+    MoistureHumidityStateGrowcubeReport,
+    PumpCloseGrowcubeReport,
+})
+
+
+def _set_flags(data: "GrowcubeData") -> int:
+    """Return the change bits of the problem flags, open pumps and lock state that are set."""
+    fields = 0
+    for name in _FLAG_FIELDS:
+        # Bit n of the flags is channel n, as are the change bits from the shift on
+        fields |= getattr(data, name) << _CHANNEL_FIELD_SHIFT[name]
+    if data.device_locked:
+        fields |= _FIELD_BITS["device_locked"]
+    return fields
+
+
+def snapshot_store(hass: HomeAssistant, entry_id: str) -> Store:
+    """Return the store holding the last known state of a config entry."""
+    return Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}")
+
+
+class ChannelFlags(int):
+    """Boolean per-channel flags packed into a small int, bit n holds channel n.
+
+    Indexing by channel returns a bool, so it reads like the list it replaces.
+    """
+    __slots__ = ()
 
-from dataclasses import dataclass, field
+    def __getitem__(self, channel: int) -> bool:
+        return bool(self >> channel & 1)
 
-@dataclass
-class GrowcubeData:
-    """Class to hold Growcube data."""
+    def __iter__(self) -> Iterator[bool]:
+        return (bool(self >> channel & 1) for channel in range(4))
+
+    def __len__(self) -> int:
+        return 4
+
+    def __repr__(self) -> str:
+        return f"ChannelFlags({list(self)})"
+
+    def set(self, channel: int, value: bool) -> "ChannelFlags":
+        """Return the flags with one channel changed."""
+        if value:
+            return _CHANNEL_FLAGS[self | 1 << channel]
+        return _CHANNEL_FLAGS[self & ~(1 << channel)]
+
+
+# All 16 possible values, so updates never allocate
+_CHANNEL_FLAGS = tuple(ChannelFlags(value) for value in range(16))
+NO_CHANNELS = _CHANNEL_FLAGS[0]
+
+
+class GrowcubeData(NamedTuple):
+    """Immutable snapshot of Growcube data.
+
+    Backed by a tuple, so a snapshot is a single compact object. Use evolve() to
+    create an updated snapshot, unchanged fields are shared with the previous one.
+    """
     temperature: Optional[int] = None
     humidity: Optional[int] = None
-    moisture: List[Optional[int]] = field(default_factory=lambda: [None] * 4)
-    pump_open: List[bool] = field(default_factory=lambda: [False] * 4)
-    sensor_fault: List[bool] = field(default_factory=lambda: [False] * 4)
-    sensor_disconnected: List[bool] = field(default_factory=lambda: [False] * 4)
-    outlet_blocked: List[bool] = field(default_factory=lambda: [False] * 4)
-    outlet_locked: List[bool] = field(default_factory=lambda: [False] * 4)
+    moisture: Tuple[Optional[int], ...] = (None, None, None, None)
+    pump_open: ChannelFlags = NO_CHANNELS
+    sensor_fault: ChannelFlags = NO_CHANNELS
+    sensor_disconnected: ChannelFlags = NO_CHANNELS
+    outlet_blocked: ChannelFlags = NO_CHANNELS
+    outlet_locked: ChannelFlags = NO_CHANNELS
     water_warning: bool = False
     device_locked: bool = False
     device_id: Optional[str] = None
     version: Optional[str] = None
     device_info: Optional[DeviceInfo] = None
 
+    def evolve(self, **changes: Any) -> "GrowcubeData":
+        """Return a copy with the given fields changed, cheaper than _replace()."""
+        values = list(self)
+        for name, value in changes.items():
+            values[_DATA_FIELD_INDEX[name]] = value
+        return _new_tuple(GrowcubeData, values)
+
+
+_DATA_FIELD_INDEX: Dict[str, int] = {name: index for index, name in enumerate(GrowcubeData._fields)}
+_new_tuple = tuple.__new__
+
 
 class GrowcubeDataCoordinator(DataUpdateCoordinator[GrowcubeData]):
-    def __init__(self, host: str, hass: HomeAssistant):
-        super().__init__(hass, _LOGGER, name=DOMAIN, update_interval=None)
+    def __init__(self, host: str, hass: HomeAssistant, options: Optional[Mapping[str, Any]] = None):
+        options = options or {}
+        # A logger per device, so debug logging can be turned on for a single device
+        logger = _LOGGER.getChild(host.replace(".", "_"))
+        self._debug_logging: bool = options.get(CONF_DEBUG_LOGGING, False)
+        if self._debug_logging:
+            logger.setLevel(logging.DEBUG)
+        super().__init__(hass, logger, name=DOMAIN, update_interval=None)
         self.client = GrowcubeClient(
             host=host,
             on_message_callback=self.handle_report,
@@ -63,90 +231,274 @@ class GrowcubeDataCoordinator(DataUpdateCoordinator[GrowcubeData]):
         self.host = host
         self.data = GrowcubeData()
         self.shutting_down = False
+        # Fields changed by the report being handled, and fields to notify on the next update
+        self._changed = 0
+        self._notify_fields = ALL_FIELDS
+        # Coalescing of bursts of reports into one update, disabled when the window is 0
+        self._coalesce_window: float = options.get(CONF_COALESCE_WINDOW, DEFAULT_COALESCE_WINDOW) / 1000
+        self._pending_fields = 0
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        # Publish limits of the sensor readings: the change bits they apply to, the deadband of
+        # each bit, the minimum publish and deadband override intervals in seconds and when each
+        # bit was last published
+        self._limited_fields = 0
+        self._deadbands: Dict[int, float] = {}
+        self._min_publish_interval: float = options.get(CONF_MIN_PUBLISH_INTERVAL, 0)
+        self._deadband_override_interval: float = options.get(CONF_DEADBAND_OVERRIDE_INTERVAL, 0) or float("inf")
+        self._published_at: Dict[int, float] = {}
+        for option, fields in ((CONF_TEMPERATURE_DEADBAND, (field_mask("temperature"),)),
+                               (CONF_HUMIDITY_DEADBAND, (field_mask("humidity"),)),
+                               (CONF_MOISTURE_DEADBAND, tuple(field_mask("moisture", ch) for ch in range(4)))):
+            deadband = options.get(option, 0)
+            for bit in fields:
+                self._deadbands[bit] = deadband
+                if deadband or self._min_publish_interval:
+                    self._limited_fields |= bit
+        # Seconds without reports before the connection is considered dead, 0 disables the watchdog
+        self._liveness_timeout: int = options.get(CONF_LIVENESS_TIMEOUT, DEFAULT_LIVENESS_TIMEOUT)
+        # Set once the device has reported its id, connect() waits on this
+        self._device_id_received = asyncio.Event()
+        # Timing of the last successful connect(), in seconds
+        self.connect_duration: Optional[float] = None
+        self.handshake_duration: Optional[float] = None
+        self.reconnect_state = ReconnectState()
+        # Clears the problem flags that aren't reported again after a reconnect
+        self._settle_handle: Optional[asyncio.TimerHandle] = None
+        # Set by reconnect(), so on_disconnected reconnects without a delay
+        self._reconnect_immediately = False
+        self.stats = CoordinatorStats()
+        self.history = DeviceHistory()
+        self.statistics = DeviceStatistics()
+        self.pump_runtime = PumpRuntime()
+        self.controller = WateringController(hass, self._water)
+        # Channels with a dose in progress, from opening their pump until it's closed again
+        self._dosing: Set[int] = set()
+        # Last watering mode applied to each channel, as a tuple of the mode and its parameters,
+        # None when unknown. The device doesn't report its watering modes.
+        self.watering_modes: List[Optional[Tuple]] = [None] * 4
+        self.commands = CommandQueue(hass, self.send_command, host, self.stats.command_latency)
+        # Whether the report being handled is logged, and the debug log sampling state
+        self._log_report = False
+        self._report_log_next: Dict[type, float] = {}
+        self._report_log_suppressed: Dict[type, int] = {}
+        # Stored snapshot of the last known state, written at most once per SNAPSHOT_SAVE_DELAY
+        self._store: Optional[Store] = None
+        self._snapshot: Dict[str, Any] = {}
+        self._snapshot_pending = False
+        # Fields holding a value restored from the snapshot, that the device hasn't reported since
+        self.stale_fields = 0
+        # Flags set when the connection was lost, that the device hasn't reported again since
+        self._unconfirmed_flags = 0
+        self._reconnect_scheduler = async_get_reconnect_scheduler(hass)
+        self._device_index = async_get_device_index(hass)
+        self._watchdog = async_get_watchdog(hass)
 
     def set_device_id(self, device_id: str) -> None:
         id_str = hex(int(device_id))[2:]
-        self.data.device_id = "growcube_{}".format(id_str)
-        self.data.device_info = DeviceInfo(
-            name="GrowCube " + id_str,
-            identifiers={(DOMAIN, self.data.device_id)},
-            manufacturer="Elecrow",
-            model="Growcube",
-            sw_version=self.data.version,
-        )
-        self.async_set_updated_data(self.data)
+        growcube_id = "growcube_{}".format(id_str)
+        self.async_set_updated_data(self.data.evolve(
+            device_id=growcube_id,
+            device_info=DeviceInfo(
+                name="GrowCube " + id_str,
+                identifiers={(DOMAIN, growcube_id)},
+                manufacturer="Elecrow",
+                model="Growcube",
+                sw_version=self.data.version,
+            ),
+        ))
+        self._device_index.async_update(self)
+        self._device_id_received.set()
+
+    async def async_restore_state(self, store: Store) -> None:
+        """Restore the last known state from the store, and keep it up to date from now on.
+
+        Called before connecting, the restored values are flagged stale until the
+        device reports them.
+        """
+        self._store = store
+        snapshot = await store.async_load()
+        if not snapshot:
+            return
+        self._snapshot = snapshot
+        self.statistics.restore(snapshot.get("statistics"))
+        self.pump_runtime.restore(snapshot.get("pump_seconds"))
+        self.controller.restore(snapshot.get("controller"))
+        self.watering_modes = [tuple(mode) if mode else None
+                               for mode in snapshot.get("watering_modes", self.watering_modes)]
+        changes: Dict[str, Any] = {}
+        stale = 0
+        for name in _SNAPSHOT_FIELDS:
+            value = snapshot.get(name)
+            if value is None:
+                continue
+            if name == "moisture":
+                value = tuple(value)
+                for channel, moisture in enumerate(value):
+                    if moisture is not None:
+                        stale |= field_mask(name, channel)
+            else:
+                stale |= _FIELD_BITS[name]
+            changes[name] = value
+        self.data = self.data.evolve(**changes)
+        self.stale_fields = stale
+
+    @callback
+    def _schedule_save(self) -> None:
+        """Write the snapshot within SNAPSHOT_SAVE_DELAY, unless a write is pending already."""
+        if not self._snapshot_pending and self._store is not None:
+            self._snapshot_pending = True
+            self._store.async_delay_save(self._snapshot_data, SNAPSHOT_SAVE_DELAY)
+
+    async def async_save_state(self) -> None:
+        """Write a pending snapshot of the last known state right away."""
+        if self._store is not None and self._snapshot_pending:
+            await self._store.async_save(self._snapshot_data())
+
+    def is_stale(self, attr: str, channel: Optional[int] = None) -> bool:
+        """Return whether a field holds a restored value the device hasn't reported since."""
+        return bool(self.stale_fields & field_mask(attr, channel))
+
+    @callback
+    def _snapshot_data(self) -> Dict[str, Any]:
+        """Return the snapshot to store, called by the store when writing it."""
+        self._snapshot_pending = False
+        self._update_snapshot()
+        return self._snapshot
+
+    def _update_snapshot(self) -> None:
+        """Copy the current state into the snapshot, keeping the last known moisture of unknown channels."""
+        data = self.data
+        stored = self._snapshot.get("moisture") or (None, None, None, None)
+        self._snapshot = {
+            "temperature": data.temperature if data.temperature is not None else self._snapshot.get("temperature"),
+            "humidity": data.humidity if data.humidity is not None else self._snapshot.get("humidity"),
+            "moisture": [value if value is not None else old for value, old in zip(data.moisture, stored)],
+            "water_warning": data.water_warning,
+            "statistics": self.statistics.as_dict(),
+            "pump_seconds": self.pump_runtime.seconds,
+            "controller": self.controller.as_dict(),
+            "watering_modes": self.watering_modes,
+        }
 
     async def connect(self) -> Tuple[bool, str]:
+        start = time.monotonic()
         result, error = await self.client.connect()
         if not result:
             return False, error
+        connected = time.monotonic()
+        if self.shutting_down:
+            # Unloaded while connecting
+            self.client.disconnect()
+            return False, "Device was unloaded"
 
-        self.shutting_down = False
         # Wait for the device to send back the DeviceVersionGrowcubeReport
-        retries = 50
-        while not self.data.device_id and retries > 0:
-            retries -= 1
-            await asyncio.sleep(0.1)
-
         if not self.data.device_id:
-            return False, "Timed out waiting for device ID"
-
-        _LOGGER.debug(
-            "Growcube device id: %s",
-            self.data.device_id
+            try:
+                await asyncio.wait_for(self._device_id_received.wait(), timeout=DEVICE_ID_TIMEOUT)
+            except asyncio.TimeoutError:
+                return False, "Timed out waiting for device ID"
+
+        done = time.monotonic()
+        self.connect_duration = connected - start
+        self.handshake_duration = done - connected
+        self.logger.debug(
+            "Growcube device id: %s, connected in %.3f s, device id received %.3f s later",
+            self.data.device_id,
+            self.connect_duration,
+            self.handshake_duration,
         )
 
         time_command = SyncTimeCommand(datetime.now())
-        _LOGGER.debug(
+        self.logger.debug(
             "%s: Sending SyncTimeCommand",
             self.data.device_id
         )
-        self.client.send_command(time_command)
+        self.send_command(time_command)
         return True, ""
 
-    async def reconnect(self) -> None:
+    async def async_connect_in_background(self) -> None:
+        """Connect after the entities have been set up, retrying through the reconnect scheduler."""
+        connected, error = await self.connect()
+        if connected or self.shutting_down:
+            return
+        self.logger.warning(
+            "Unable to connect to %s: %s, will keep trying",
+            self.host,
+            error
+        )
+        self.async_set_available(False)
+        self._reconnect_scheduler.schedule(self)
+
+    @callback
+    def reconnect(self) -> None:
+        """Drop the connection and reconnect right away, through the reconnect scheduler."""
+        if self.shutting_down:
+            return
         if self.client.connected:
+            # Reconnecting before on_disconnected has run would overlap two connections
+            self._reconnect_immediately = True
+            self.client.disconnect()
+        else:
+            self._reconnect_scheduler.schedule(self, immediate=True)
+
+    @callback
+    def async_liveness_timeout(self) -> None:
+        """Drop a connection the device stopped reporting on, on_disconnected then reconnects."""
+        transport = self.client.transport
+        if transport is not None:
+            # Abort instead of close, a dead device never acknowledges a graceful close
+            transport.abort()
+        else:
             self.client.disconnect()
 
-        if not self.shutting_down:
-            while True:
-                # Set flag to avoid handling in on_disconnected
-                self.shutting_down = True
-                result, error = await self.client.connect()
-                if result:
-                    _LOGGER.debug(
-                        "Reconnect to %s succeeded",
-                        self.client.host
-                    )
-                    self.shutting_down = False
-                    await asyncio.sleep(10)
-                    return
-
-                _LOGGER.debug(
-                    "Reconnect failed for %s with error '%s', retrying in 10 seconds",
-                    self.client.host,
-                    error)
-                await asyncio.sleep(10)
+    @callback
+    def async_set_available(self, available: bool) -> None:
+        """Set whether the device is connected, the entities show this as their availability."""
+        if self.last_update_success == available:
+            return
+        self.last_update_success = available
+        self._notify_fields = ALL_FIELDS
+        self.async_update_listeners()
+
+    @callback
+    def _async_expire_stale_flags(self) -> None:
+        """Clear the problem flags and open pumps the device didn't report again after connecting."""
+        self._settle_handle = None
+        stale = self._unconfirmed_flags
+        if not stale:
+            return
+        self._unconfirmed_flags = 0
+        changes: Dict[str, Any] = {}
+        for name in _FLAG_FIELDS:
+            channels = stale >> _CHANNEL_FIELD_SHIFT[name] & 0xF
+            if channels:
+                changes[name] = _CHANNEL_FLAGS[getattr(self.data, name) & ~channels]
+        if stale & _FIELD_BITS["device_locked"]:
+            changes["device_locked"] = False
+        self.logger.debug("%s: Cleared %s not reported again", self.data.device_id, ", ".join(changes))
+        self._notify_fields = stale
+        self.async_set_updated_data(self.data.evolve(**changes))
+
+    @callback
+    def async_reconnect_state_updated(self) -> None:
+        """Notify the listeners showing the reconnect state."""
+        self._notify_fields = FIELD_CONNECTION
+        self.async_update_listeners()
 
     @staticmethod
-    async def get_device_id(host: str) -> tuple[bool, str]:
+    async def get_device_id(host: str, port: int = GROWCUBE_PORT) -> tuple[bool, str]:
         """This is used in the config flow to check for a valid device"""
-        device_id = ""
-
-        async def _handle_device_id_report(report: GrowcubeReport) -> None:
-            if isinstance(report, DeviceVersionGrowcubeReport):
-                nonlocal device_id
-                device_id = report.device_id
+        device_id: asyncio.Future[str] = asyncio.get_running_loop().create_future()
 
-        async def _check_device_id_assigned() -> None:
-            nonlocal device_id
-            while not device_id:
-                await asyncio.sleep(0.1)
+        def _handle_device_id_report(report: GrowcubeReport) -> None:
+            if isinstance(report, DeviceVersionGrowcubeReport) and not device_id.done():
+                device_id.set_result(report.device_id)
 
         client = GrowcubeClient(
             host=host,
             on_message_callback=_handle_device_id_report,
         )
+        client.port = port
         try:
             result, error = await asyncio.wait_for(client.connect(), timeout=5)
         except asyncio.TimeoutError:
@@ -155,71 +507,201 @@ class GrowcubeDataCoordinator(DataUpdateCoordinator[GrowcubeData]):
             return False, error
 
         try:
-            await asyncio.wait_for(_check_device_id_assigned(), timeout=5)
+            await asyncio.wait_for(device_id, timeout=DEVICE_ID_TIMEOUT)
             client.disconnect()
         except asyncio.TimeoutError:
             client.disconnect()
             return False, "Timed out waiting for device ID"
 
-        return True, device_id
+        return True, device_id.result()
 
     async def on_connected(self, host: str) -> None:
-        _LOGGER.debug(
+        self.logger.debug(
             "Connection to %s established",
             host
         )
+        if self.shutting_down:
+            return
+        if self._liveness_timeout:
+            self._watchdog.watch(self, self._liveness_timeout)
+        # Problem flags still set are cleared if the device doesn't report them again
+        self._settle_handle = self.hass.loop.call_later(CONNECT_SETTLE_TIME, self._async_expire_stale_flags)
+        self.async_set_available(True)
 
     async def on_disconnected(self, host: str) -> None:
-        _LOGGER.debug("Connection to %s lost", host)
-        self.data.temperature = None
-        self.data.humidity = None
-        self.data.moisture = [None] * 4
-        self.data.pump_open = [False] * 4
-        self.data.sensor_fault = [False] * 4
-        self.data.sensor_disconnected = [False] * 4
-        self.data.outlet_blocked = [False] * 4
-        self.data.outlet_locked = [False] * 4
-        self.data.water_warning = False
-        self.data.device_locked = False
-        self.async_set_updated_data(self.data)
+        self.logger.debug("Connection to %s lost", host)
+        self._watchdog.unwatch(self)
+        if self._settle_handle is not None:
+            self._settle_handle.cancel()
+            self._settle_handle = None
+        # The close reports of pumps that are open can't be received anymore
+        if self.pump_runtime.close_all(time.monotonic()):
+            self._schedule_save()
+        # Keep the last values, the availability shows they aren't live. Only the changes are
+        # published after reconnecting, and flags not reported again are cleared then.
+        self._unconfirmed_flags = _set_flags(self.data)
+        self.async_set_available(False)
 
         if not self.shutting_down:
-            _LOGGER.debug(
+            self.logger.debug(
                 "Device host %s went offline, will try to reconnect",
                 host
             )
-            loop = asyncio.get_event_loop()
-            loop.call_later(10, lambda: loop.create_task(self.reconnect()))
+            self._reconnect_scheduler.schedule(self, immediate=self._reconnect_immediately)
+        self._reconnect_immediately = False
 
     def disconnect(self) -> None:
         self.shutting_down = True
+        self._reconnect_scheduler.cancel(self)
+        self._watchdog.unwatch(self)
+        self._device_index.async_remove(self)
+        if self.pump_runtime.close_all(time.monotonic()):
+            self._schedule_save()
+        if self._settle_handle is not None:
+            self._settle_handle.cancel()
+            self._settle_handle = None
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if self._debug_logging:
+            self.logger.setLevel(logging.NOTSET)
+        # The doses in progress are cancelled with the command queue, so their close commands
+        # wouldn't be sent. Close the pumps right away instead of leaving them running.
+        for channel in range(4):
+            if channel in self._dosing or self.data.pump_open[channel]:
+                self.send_command(WaterCommand(Channel(channel), False))
+        self.controller.async_cancel()
+        self.commands.async_cancel()
         self.client.disconnect()
 
-    async def handle_report(self, report: GrowcubeReport) -> None:
-        new: GrowcubeData = self.data
-
-        """Handle a report from the Growcube."""
-        # 24 - RepDeviceVersion
-        if isinstance(report, DeviceVersionGrowcubeReport):
-            _LOGGER.debug(
+    @callback
+    def handle_report(self, report: GrowcubeReport) -> None:
+        """Handle a report from the Growcube.
+
+        This is registered as a plain callback so the client invokes it directly
+        from the protocol instead of wrapping every report in a task.
+        """
+        start = time.perf_counter()
+        report_class = report.__class__
+        stats = self.stats
+        stats.reports[report_class] = stats.reports.get(report_class, 0) + 1
+        handler = self._report_handlers.get(report_class)
+        if handler is None:
+            handler = self._resolve_report_handler(report_class)
+        self._log_report = self.logger.isEnabledFor(logging.DEBUG) and self._sample_report_log(report_class)
+        self._changed = 0
+        new = handler(self, report)
+        self.commands.async_handle_report(report)
+        if new is None or new is self.data:
+            stats.state_writes_skipped += 1
+        elif self._coalesce_window and report_class not in _PUBLISH_IMMEDIATELY:
+            # Hold the update back until the burst is over, later reports build on it
+            self.data = new
+            self._pending_fields |= self._changed
+            if self._flush_handle is None:
+                self._flush_handle = self.hass.loop.call_later(self._coalesce_window, self._async_flush)
+            stats.state_writes_coalesced += 1
+        else:
+            self._notify_fields = self._changed
+            self.async_set_updated_data(new)
+            stats.state_writes += 1
+        if self._changed & _SNAPSHOT_MASK or report_class in _SAVED_REPORTS:
+            self._schedule_save()
+        stats.dispatch.record(time.perf_counter() - start)
+
+    def _sample_report_log(self, report_class: type) -> bool:
+        """Return whether a report should be logged, rate limiting the chatty report types.
+
+        All reports are logged when debug logging is enabled for this device.
+        """
+        if self._debug_logging:
+            return True
+        interval = REPORT_LOG_INTERVAL.get(report_class)
+        if interval is None:
+            return True
+        now = time.monotonic()
+        if now < self._report_log_next.get(report_class, 0):
+            self._report_log_suppressed[report_class] = self._report_log_suppressed.get(report_class, 0) + 1
+            return False
+        self._report_log_next[report_class] = now + interval
+        suppressed = self._report_log_suppressed.pop(report_class, 0)
+        if suppressed:
+            self.logger.debug(
+                "%s: %s %s reports not logged",
+                self.data.device_id,
+                suppressed,
+                report_class.__name__
+            )
+        return True
+
+    @callback
+    def _async_flush(self) -> None:
+        """Publish the updates held back by the coalescing window."""
+        self._flush_handle = None
+        if self._pending_fields:
+            self._notify_fields = 0
+            self.async_set_updated_data(self.data)
+            self.stats.state_writes += 1
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Update the listeners subscribed to the fields that changed.
+
+        Listeners registered without a context are always updated. Updates not
+        coming from handle_report (device info, connection changes) notify all.
+        """
+        changed = self._notify_fields | self._pending_fields
+        self._notify_fields = ALL_FIELDS
+        # Any update also publishes what the coalescing window held back
+        self._pending_fields = 0
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        for update_callback, context in list(self._listeners.values()):
+            if context is None or context & changed:
+                update_callback()
+
+    @classmethod
+    @functools.lru_cache(maxsize=32)
+    def _resolve_report_handler(cls, report_type: type) -> Callable:
+        """Find the handler for a report type not registered directly, through its base classes.
+
+        The results are kept in a bounded cache, the dispatch table itself never changes.
+        """
+        for base in report_type.__mro__[1:]:
+            if base in cls._report_handlers:
+                return cls._report_handlers[base]
+        return cls._handle_unhandled_report
+
+    def _handle_unhandled_report(self, report: GrowcubeReport) -> None:
+        return None
+
+    # 24 - RepDeviceVersion
+    def _handle_device_version(self, report: DeviceVersionGrowcubeReport) -> None:
+        if self._log_report:
+            self.logger.debug(
                 "Device device_id: %s, version %s",
                 report.device_id,
                 report.version
             )
-            self.data.version = report.version
-            self.set_device_id(report.device_id)
-            return
-        # 20 - RepWaterState
-        elif isinstance(report, WaterStateGrowcubeReport):
-            _LOGGER.debug(
+        self.data = self.data.evolve(version=report.version)
+        self.set_device_id(report.device_id)
+        return None
+
+    # 20 - RepWaterState
+    def _handle_water_state(self, report: WaterStateGrowcubeReport) -> GrowcubeData:
+        if self._log_report:
+            self.logger.debug(
                 "%s: Water state %s",
                 self.data.device_id,
                 report.water_warning
             )
-            new = self._set_scalar(new, "water_warning", report.water_warning)
-        # 21 - RepSTHSate
-        elif isinstance(report, MoistureHumidityStateGrowcubeReport):
-            _LOGGER.debug(
+        return self._set_scalar(self.data, "water_warning", report.water_warning)
+
+    # 21 - RepSTHSate
+    def _handle_moisture_humidity_state(self, report: MoistureHumidityStateGrowcubeReport) -> GrowcubeData:
+        if self._log_report:
+            self.logger.debug(
                 "%s: Sensor reading, channel %s, humidity %s, temperature %s, moisture %s",
                 self.data.device_id,
                 report.channel,
@@ -227,135 +709,264 @@ class GrowcubeDataCoordinator(DataUpdateCoordinator[GrowcubeData]):
                 report.temperature,
                 report.moisture,
             )
-            new = self._set_scalar(new, "temperature", report.temperature)
-            new = self._set_scalar(new, "humidity", report.humidity)
-            new = self._set_list_index(new, "moisture", report.channel.value, report.moisture)
-        # 26 - RepPumpOpen
-        elif isinstance(report, PumpOpenGrowcubeReport):
-            _LOGGER.debug(
+        now = time.time()
+        self.history.add_reading(now, report.channel.value, report.moisture, report.humidity, report.temperature)
+        self.statistics.add_reading(now, report.channel.value, report.moisture, report.humidity, report.temperature)
+        new = self._set_scalar(self.data, "temperature", report.temperature)
+        new = self._set_scalar(new, "humidity", report.humidity)
+        new = self._set_list_index(new, "moisture", report.channel.value, report.moisture)
+        self.controller.async_handle_moisture(new, report.channel.value, report.moisture, now)
+        return new
+
+    # 26 - RepPumpOpen
+    def _handle_pump_open(self, report: PumpOpenGrowcubeReport) -> GrowcubeData:
+        if self._log_report:
+            self.logger.debug(
                 "%s: Pump open, channel %s",
                 self.data.device_id,
                 report.channel
             )
-            new = self._set_list_index(new, "pump_open", report.channel.value, True)
-        # 27 - RepPumpClose
-        elif isinstance(report, PumpCloseGrowcubeReport):
-            _LOGGER.debug(
+        self.pump_runtime.open(report.channel.value, time.monotonic())
+        return self._set_list_index(self.data, "pump_open", report.channel.value, True)
+
+    # 27 - RepPumpClose
+    def _handle_pump_close(self, report: PumpCloseGrowcubeReport) -> GrowcubeData:
+        if self._log_report:
+            self.logger.debug(
                 "%s: Pump closed, channel %s",
                 self.data.device_id,
                 report.channel
             )
-            new = self._set_list_index(new, "pump_open", report.channel, False)
-        # 28 - RepCheckSenSorNotConnected
-        elif isinstance(report, CheckSensorGrowcubeReport):
-            _LOGGER.debug(
+        self.pump_runtime.close(report.channel.value, time.monotonic())
+        return self._set_list_index(self.data, "pump_open", report.channel, False)
+
+    # 28 - RepCheckSenSorNotConnected
+    def _handle_check_sensor(self, report: CheckSensorGrowcubeReport) -> GrowcubeData:
+        if self._log_report:
+            self.logger.debug(
                 "%s: Sensor abnormal, channel %s",
                 self.data.device_id,
                 report.channel
             )
-            new = self._set_list_index(new, "sensor_fault", report.channel, True)
-        # 29 - Pump channel blocked
-        elif isinstance(report, CheckOutletBlockedGrowcubeReport):
-            _LOGGER.debug(
+        return self._set_list_index(self.data, "sensor_fault", report.channel, True)
+
+    # 29 - Pump channel blocked
+    def _handle_outlet_blocked(self, report: CheckOutletBlockedGrowcubeReport) -> GrowcubeData:
+        if self._log_report:
+            self.logger.debug(
                 "%s: Outlet blocked, channel %s",
                 self.data.device_id,
                 report.channel
             )
-            new = self._set_list_index(new, "outlet_blocked", report.channel, True)
-        # 30 - RepCheckSenSorNotConnect
-        elif isinstance(report, CheckSensorNotConnectedGrowcubeReport):
-            _LOGGER.debug(
+        return self._set_list_index(self.data, "outlet_blocked", report.channel, True)
+
+    # 30 - RepCheckSenSorNotConnect
+    def _handle_sensor_not_connected(self, report: CheckSensorNotConnectedGrowcubeReport) -> GrowcubeData:
+        if self._log_report:
+            self.logger.debug(
                 "%s: Check sensor, channel %s",
                 self.data.device_id,
                 report.channel
             )
-            new = self._set_list_index(new, "sensor_disconnected", report.channel, True)
-        # 33 - RepLockstate
-        elif isinstance(report, LockStateGrowcubeReport):
-            _LOGGER.debug(
+        return self._set_list_index(self.data, "sensor_disconnected", report.channel, True)
+
+    # 33 - RepLockstate
+    def _handle_lock_state(self, report: LockStateGrowcubeReport) -> GrowcubeData:
+        if self._log_report:
+            self.logger.debug(
                 "%s: Lock state, %s",
                 self.data.device_id,
                 report.lock_state
             )
-            # Handle case where the button on the device was pressed, this should do a reconnect
-            # to read any problems still present
-            if self.data.device_locked and not report.lock_state:
-                self.hass.async_create_task(self.reconnect())
-            new = self._set_scalar(new, "device_locked", report.lock_state)
-        # 34 - ReqCheckSenSorLock
-        elif isinstance(report, CheckOutletLockedGrowcubeReport):
-            _LOGGER.debug(
+        # Handle case where the button on the device was pressed, this should do a reconnect
+        # to read any problems still present
+        if self.data.device_locked and not report.lock_state:
+            self.reconnect()
+        return self._set_scalar(self.data, "device_locked", report.lock_state)
+
+    # 34 - ReqCheckSenSorLock
+    def _handle_outlet_locked(self, report: CheckOutletLockedGrowcubeReport) -> GrowcubeData:
+        if self._log_report:
+            self.logger.debug(
                 "%s Check outlet, channel %s",
                 self.data.device_id,
                 report.channel
             )
-            new = self._set_list_index(new, "outlet_locked", report.channel, True)
-
-        if new is not self.data:
-            self.data = new
-            self.async_set_updated_data(new)
-
+        return self._set_list_index(self.data, "outlet_locked", report.channel, True)
+
+    # Exact report type -> handler. Subclasses of these, and unknown reports, are
+    # resolved through the MRO by _resolve_report_handler.
+    _report_handlers: Mapping[type, Callable] = MappingProxyType({
+        MoistureHumidityStateGrowcubeReport: _handle_moisture_humidity_state,
+        DeviceVersionGrowcubeReport: _handle_device_version,
+        WaterStateGrowcubeReport: _handle_water_state,
+        PumpOpenGrowcubeReport: _handle_pump_open,
+        PumpCloseGrowcubeReport: _handle_pump_close,
+        CheckSensorGrowcubeReport: _handle_check_sensor,
+        CheckOutletBlockedGrowcubeReport: _handle_outlet_blocked,
+        CheckSensorNotConnectedGrowcubeReport: _handle_sensor_not_connected,
+        LockStateGrowcubeReport: _handle_lock_state,
+        CheckOutletLockedGrowcubeReport: _handle_outlet_locked,
+    })
+
+    def send_command(self, command: GrowcubeCommand) -> bool:
+        """Send a command to the device, counting it in the stats."""
+        success = self.client.send_command(command)
+        self.stats.record_command(command.__class__, success)
+        return success
+
+    async def _water(self, channel: Channel, duration: int, timeout: float = COMMAND_TIMEOUT) -> float:
+        """Open the pump of a channel for a number of seconds, returns the latency of opening it."""
+        self._dosing.add(channel.value)
+        try:
+            try:
+                latency = await self.commands.async_send(WaterCommand(channel, True), timeout)
+            except HomeAssistantError:
+                # The pump may have opened even if the report didn't make it back
+                with contextlib.suppress(HomeAssistantError):
+                    await self._close_pump(channel, timeout)
+                raise
+            await asyncio.sleep(duration)
+            await self._close_pump(channel, timeout)
+        finally:
+            self._dosing.discard(channel.value)
+        return latency
+
+    async def _close_pump(self, channel: Channel, timeout: float) -> float:
+        try:
+            return await self.commands.async_send(WaterCommand(channel, False), timeout)
+        except HomeAssistantError:
+            # Try again just to be sure
+            return await self.commands.async_send(WaterCommand(channel, False), timeout)
 
     async def water_plant(self, channel: int) -> None:
-        await self.client.water_plant(Channel(channel), 5)
-
+        await self._water(Channel(channel), 5)
 
-    async def handle_water_plant(self, channel: Channel, duration: int) -> None:
-        _LOGGER.debug(
-            "%s: Service water_plant called, %s, %s",
-            self.data.device_id,
-            channel,
-            duration
-        )
-        await self.client.water_plant(channel, duration)
+    async def handle_water_plant(self, channel: Channel, duration: int, timeout: float = COMMAND_TIMEOUT) -> float:
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(
+                "%s: Service water_plant called, %s, %s",
+                self.data.device_id,
+                channel,
+                duration
+            )
+        return await self._water(channel, duration, timeout)
+
+    @callback
+    def handle_set_controlled_watering(self, channel: Channel, settings: Optional[ControllerSettings]) -> None:
+        """Set the controlled watering of a channel, None removes it."""
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(
+                "%s: Service set_controlled_watering called, %s, %s",
+                self.data.device_id,
+                channel,
+                settings
+            )
+        self.controller.async_set(channel.value, settings)
+        self._schedule_save()
 
     async def handle_set_smart_watering(self, channel: Channel,
                                         all_day: bool,
                                         min_moisture: int,
-                                        max_moisture: int) -> None:
+                                        max_moisture: int,
+                                        timeout: float = COMMAND_TIMEOUT) -> float:
 
-        _LOGGER.debug(
-            "%s: Service set_smart_watering called, %s, %s, %s, %s",
-            self.data.device_id,
-            channel,
-            all_day,
-            min_moisture,
-            max_moisture,
-        )
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(
+                "%s: Service set_smart_watering called, %s, %s, %s, %s",
+                self.data.device_id,
+                channel,
+                all_day,
+                min_moisture,
+                max_moisture,
+            )
 
         watering_mode = WateringMode.Smart if all_day else WateringMode.SmartOutside
         command = WateringModeCommand(channel, watering_mode, min_moisture, max_moisture)
-        self.client.send_command(command)
+        return await self._async_apply_mode(channel, (WATERING_MODE_SMART, all_day, min_moisture, max_moisture),
+                                            self.commands.async_send(command, timeout))
 
-    async def handle_set_manual_watering(self, channel: Channel, duration: int, interval: int) -> None:
+    async def handle_set_manual_watering(self, channel: Channel, duration: int, interval: int,
+                                         timeout: float = COMMAND_TIMEOUT) -> float:
 
-        _LOGGER.debug(
-            "%s: Service set_manual_watering called, %s, %s, %s",
-            self.data.device_id,
-            channel,
-            duration,
-            interval,
-        )
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(
+                "%s: Service set_manual_watering called, %s, %s, %s",
+                self.data.device_id,
+                channel,
+                duration,
+                interval,
+            )
 
         command = WateringModeCommand(channel, WateringMode.Scheduled, interval, duration)
-        self.client.send_command(command)
+        return await self._async_apply_mode(channel, (WATERING_MODE_SCHEDULED, duration, interval),
+                                            self.commands.async_send(command, timeout))
 
-    async def handle_delete_watering(self, channel: Channel) -> None:
+    async def handle_delete_watering(self, channel: Channel, timeout: float = COMMAND_TIMEOUT) -> float:
 
-        _LOGGER.debug(
-            "%s: Service delete_watering called, %s,",
-            self.data.device_id,
-            channel
-        )
-        command = PlantEndCommand(channel)
-        self.client.send_command(command)
-        command = ClosePumpCommand(channel)
-        self.client.send_command(command)
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(
+                "%s: Service delete_watering called, %s,",
+                self.data.device_id,
+                channel
+            )
+        # Queued together, the queue sends them paced and closes the pump first
+        latencies = await self._async_apply_mode(channel, (WATERING_MODE_OFF,), asyncio.gather(
+            self.commands.async_send(PlantEndCommand(channel), timeout),
+            self.commands.async_send(ClosePumpCommand(channel), timeout),
+        ))
+        return max(latencies)
+
+    async def handle_apply_watering_mode(self, channel: Channel, mode: Tuple, timeout: float = COMMAND_TIMEOUT,
+                                         force: bool = False) -> Optional[float]:
+        """Apply a watering mode tuple, unless it's the one applied last. Returns None when skipped."""
+        if not force and self.watering_modes[channel] == mode:
+            return None
+        if mode[0] == WATERING_MODE_SMART:
+            return await self.handle_set_smart_watering(channel, *mode[1:], timeout)
+        if mode[0] == WATERING_MODE_SCHEDULED:
+            return await self.handle_set_manual_watering(channel, *mode[1:], timeout)
+        return await self.handle_delete_watering(channel, timeout)
+
+    async def _async_apply_mode(self, channel: Channel, mode: Tuple, send: Awaitable[Any]) -> Any:
+        """Wait for the commands applying a watering mode, and remember it once the device completed them."""
+        # Unknown until then, the device may apply a command whose report is lost
+        self.watering_modes[channel] = None
+        result = await send
+        self.watering_modes[channel] = mode
+        self._schedule_save()
+        return result
+
+    def _publish_allowed(self, bit: int, old: Optional[int], value: int) -> bool:
+        """Apply the deadband and intervals of a sensor reading to a changed value.
+
+        The intervals only apply to changed values, an unchanged one is never published again.
+        """
+        now = self.hass.loop.time()
+        published_at = self._published_at.get(bit)
+        if published_at is not None:
+            elapsed = now - published_at
+            if elapsed < self._min_publish_interval or (
+                    old is not None and abs(value - old) <= self._deadbands[bit]
+                    and elapsed < self._deadband_override_interval):
+                self.stats.values_suppressed += 1
+                return False
+        self._published_at[bit] = now
+        return True
 
     def _set_scalar(self, new: GrowcubeData, attr: str, value) -> GrowcubeData:
-        if getattr(self.data, attr) == value:
+        bit = _FIELD_BITS[attr]
+        old = getattr(self.data, attr)
+        self._unconfirmed_flags &= ~bit
+        if self.stale_fields & bit:
+            # A live value replaces a restored one, publish it even if it's the same
+            self.stale_fields &= ~bit
+        elif old == value:
             return new
-        return replace(new, **{attr: value})
+        elif bit & self._limited_fields and not self._publish_allowed(bit, old, value):
+            return new
+        self._changed |= bit
+        return new.evolve(**{attr: value})
 
     def _set_list_index(self,
         new: GrowcubeData,
@@ -363,9 +974,19 @@ class GrowcubeDataCoordinator(DataUpdateCoordinator[GrowcubeData]):
         idx: int,
         value,
     ) -> GrowcubeData:
-        current_list = getattr(self.data, attr)
-        if current_list[idx] == value:
+        bit = field_mask(attr, idx)
+        old = getattr(self.data, attr)[idx]
+        self._unconfirmed_flags &= ~bit
+        if self.stale_fields & bit:
+            self.stale_fields &= ~bit
+        elif old == value:
+            return new
+        elif bit & self._limited_fields and not self._publish_allowed(bit, old, value):
             return new
-        copied = list(getattr(new, attr))  # copy from `new` (which may already be replaced)
-        copied[idx] = value
-        return replace(new, **{attr: copied})
+        self._changed |= bit
+        values = getattr(new, attr)  # read from `new` (which may already be replaced)
+        if isinstance(values, ChannelFlags):
+            values = values.set(idx, value)
+        else:
+            values = values[:idx] + (value,) + values[idx + 1:]
+        return new.evolve(**{attr: values})
@@ -0,0 +1,91 @@
+"""Index from Home Assistant devices to Growcube coordinators."""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Dict, Optional
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import device_registry as dr
+
+from .const import DOMAIN, DATA_DEVICE_INDEX
+
+if TYPE_CHECKING:
+    from .coordinator import GrowcubeDataCoordinator
+
+
+class DeviceIndex:
+    """Maps device registry ids to the coordinator handling the device.
+
+    Coordinators keep their Growcube device id up to date here, and the matching
+    device registry id is resolved once, when the device is registered or on the
+    first lookup, so service calls never scan the coordinators.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self._hass = hass
+        self._by_growcube_id: Dict[str, GrowcubeDataCoordinator] = {}
+        self._growcube_ids: Dict[GrowcubeDataCoordinator, str] = {}
+        self._by_device_id: Dict[str, GrowcubeDataCoordinator] = {}
+        self._device_ids: Dict[GrowcubeDataCoordinator, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._growcube_ids)
+
+    @callback
+    def async_update(self, coordinator: GrowcubeDataCoordinator) -> None:
+        """Add a coordinator, or update it after its device id changed."""
+        growcube_id = coordinator.data.device_id
+        if self._growcube_ids.get(coordinator) != growcube_id:
+            self.async_remove(coordinator)
+            if growcube_id is None:
+                return
+            self._growcube_ids[coordinator] = growcube_id
+            self._by_growcube_id[growcube_id] = coordinator
+
+        if coordinator not in self._device_ids and dr.DATA_REGISTRY in self._hass.data:
+            # Without the registry, the device id is resolved on the first lookup
+            device_entry = dr.async_get(self._hass).async_get_device(identifiers={(DOMAIN, growcube_id)})
+            if device_entry is not None:
+                self._cache(device_entry.id, coordinator)
+
+    @callback
+    def async_remove(self, coordinator: GrowcubeDataCoordinator) -> None:
+        """Remove a coordinator from the index."""
+        growcube_id = self._growcube_ids.pop(coordinator, None)
+        if growcube_id is not None and self._by_growcube_id.get(growcube_id) is coordinator:
+            del self._by_growcube_id[growcube_id]
+        device_id = self._device_ids.pop(coordinator, None)
+        if device_id is not None:
+            del self._by_device_id[device_id]
+
+    @callback
+    def async_get(self, device_id: str) -> Optional[GrowcubeDataCoordinator]:
+        """Return the coordinator for a device registry id, or None."""
+        coordinator = self._by_device_id.get(device_id)
+        if coordinator is not None:
+            return coordinator
+
+        device_entry = dr.async_get(self._hass).async_get(device_id)
+        if device_entry is None:
+            return None
+        for domain, identifier in device_entry.identifiers:
+            if domain == DOMAIN and identifier in self._by_growcube_id:
+                coordinator = self._by_growcube_id[identifier]
+                self._cache(device_id, coordinator)
+                return coordinator
+        return None
+
+    def _cache(self, device_id: str, coordinator: GrowcubeDataCoordinator) -> None:
+        previous = self._by_device_id.get(device_id)
+        if previous is not None and previous is not coordinator:
+            self._device_ids.pop(previous, None)
+        self._by_device_id[device_id] = coordinator
+        self._device_ids[coordinator] = device_id
+
+
+@callback
+def async_get_device_index(hass: HomeAssistant) -> DeviceIndex:
+    """Return the device index shared by all Growcube entries."""
+    index = hass.data.get(DATA_DEVICE_INDEX)
+    if index is None:
+        index = hass.data[DATA_DEVICE_INDEX] = DeviceIndex(hass)
+    return index
@@ -0,0 +1,46 @@
+"""Diagnostics support for Growcube."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_HOST
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+from .coordinator import GrowcubeDataCoordinator
+
+TO_REDACT = {CONF_HOST}
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator: GrowcubeDataCoordinator = hass.data[DOMAIN][entry.entry_id]
+    data = coordinator.data
+    reconnect_state = coordinator.reconnect_state
+    return {
+        "entry": async_redact_data(entry.as_dict(), TO_REDACT),
+        "device": {
+            "device_id": data.device_id,
+            "version": data.version,
+            "connected": coordinator.client.connected,
+            "connect_duration": coordinator.connect_duration,
+            "handshake_duration": coordinator.handshake_duration,
+            "reconnect_attempts": reconnect_state.attempts,
+            "next_reconnect": reconnect_state.next_attempt.isoformat() if reconnect_state.next_attempt else None,
+        },
+        "data": {
+            "temperature": data.temperature,
+            "humidity": data.humidity,
+            "moisture": list(data.moisture),
+            "pump_open": list(data.pump_open),
+            "sensor_fault": list(data.sensor_fault),
+            "sensor_disconnected": list(data.sensor_disconnected),
+            "outlet_blocked": list(data.outlet_blocked),
+            "outlet_locked": list(data.outlet_locked),
+            "water_warning": data.water_warning,
+            "device_locked": data.device_locked,
+        },
+        "stats": coordinator.stats.as_dict(),
+    }
@@ -0,0 +1,135 @@
+"""Probing of DHCP discovered hosts for Growcube devices."""
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+from ipaddress import IPv4Network, IPv6Network
+from typing import Container, Dict, Optional, Tuple, Union
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import (
+    DATA_DISCOVERY_PROBER,
+    GROWCUBE_PORT,
+    DISCOVERY_POSITIVE_TTL,
+    DISCOVERY_NEGATIVE_TTL,
+    DISCOVERY_PORT_TIMEOUT,
+    DISCOVERY_MAX_CONCURRENT,
+    SCAN_MAX_PARALLEL,
+    SCAN_PORT_TIMEOUT,
+)
+from .coordinator import GrowcubeDataCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+
+async def async_port_open(host: str, port: int, timeout: float) -> bool:
+    """Return whether a host accepts TCP connections on a port, closing the connection right away."""
+    try:
+        async with asyncio.timeout(timeout):
+            _, writer = await asyncio.open_connection(host, port)
+    except (OSError, asyncio.TimeoutError):
+        return False
+    writer.close()
+    with contextlib.suppress(OSError, asyncio.TimeoutError):
+        async with asyncio.timeout(timeout):
+            await writer.wait_closed()
+    return True
+
+
+async def async_scan_network(network: Union[IPv4Network, IPv6Network],
+                             skip: Container[str] = (),
+                             port: int = GROWCUBE_PORT,
+                             max_parallel: int = SCAN_MAX_PARALLEL,
+                             timeout: float = SCAN_PORT_TIMEOUT) -> Dict[str, str]:
+    """Return the address and device id of each Growcube in a network.
+
+    A fixed number of workers take turns on the addresses, so a large network
+    doesn't create a task per address. Only addresses accepting connections on
+    the Growcube port are asked for their device id.
+    """
+    hosts = (host for host in map(str, network.hosts()) if host not in skip)
+    found: Dict[str, str] = {}
+
+    async def _worker() -> None:
+        for host in hosts:
+            if not await async_port_open(host, port, timeout):
+                continue
+            result, value = await GrowcubeDataCoordinator.get_device_id(host, port)
+            if result:
+                found[host] = value
+            else:
+                _LOGGER.debug("%s didn't identify as a Growcube: %s", host, value)
+
+    await asyncio.gather(*(_worker() for _ in range(min(max_parallel, network.num_addresses))))
+    return found
+
+
+class DiscoveryProber:
+    """Finds out whether DHCP discovered hosts are Growcube devices.
+
+    The manifest matches every Espressif device, so most hosts aren't a Growcube.
+    A host must accept connections on the Growcube port before the full device id
+    handshake is tried, and the outcome is cached per MAC address, so lease
+    renewals don't probe the same devices again. Probes of the same MAC address
+    share one attempt, and a semaphore caps the number of probes running at once.
+    """
+
+    def __init__(self,
+                 hass: HomeAssistant,
+                 positive_ttl: float = DISCOVERY_POSITIVE_TTL,
+                 negative_ttl: float = DISCOVERY_NEGATIVE_TTL,
+                 max_concurrent: int = DISCOVERY_MAX_CONCURRENT,
+                 port: int = GROWCUBE_PORT) -> None:
+        self._hass = hass
+        self._positive_ttl = positive_ttl
+        self._negative_ttl = negative_ttl
+        self._port = port
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        # MAC address -> loop time the result expires and the device id, None if not a Growcube
+        self._cache: Dict[str, Tuple[float, Optional[str]]] = {}
+        self._probes: Dict[str, asyncio.Task] = {}
+
+    async def async_probe(self, mac: str, host: str) -> Optional[str]:
+        """Return the device id of the Growcube at host, None if it isn't one."""
+        cached = self._cache.get(mac)
+        if cached is not None and cached[0] > self._hass.loop.time():
+            return cached[1]
+        probe = self._probes.get(mac)
+        if probe is None:
+            probe = self._probes[mac] = self._hass.async_create_background_task(
+                self._async_probe(mac, host), f"growcube probe {host}")
+        # A cancelled flow doesn't cancel the probe shared with other flows
+        return await asyncio.shield(probe)
+
+    async def _async_probe(self, mac: str, host: str) -> Optional[str]:
+        try:
+            async with self._semaphore:
+                device_id = await self._async_identify(host)
+        finally:
+            self._probes.pop(mac, None)
+        now = self._hass.loop.time()
+        # Drop expired results while here, so hosts that left the network are forgotten
+        self._cache = {key: value for key, value in self._cache.items() if value[0] > now}
+        self._cache[mac] = (now + (self._positive_ttl if device_id else self._negative_ttl), device_id)
+        return device_id
+
+    async def _async_identify(self, host: str) -> Optional[str]:
+        if not await async_port_open(host, self._port, DISCOVERY_PORT_TIMEOUT):
+            _LOGGER.debug("%s doesn't accept connections on port %s, not a Growcube", host, self._port)
+            return None
+        result, value = await GrowcubeDataCoordinator.get_device_id(host, self._port)
+        if not result:
+            _LOGGER.debug("%s didn't identify as a Growcube: %s", host, value)
+            return None
+        return value
+
+
+@callback
+def async_get_discovery_prober(hass: HomeAssistant) -> DiscoveryProber:
+    """Return the discovery prober shared by all config flows."""
+    prober = hass.data.get(DATA_DISCOVERY_PROBER)
+    if prober is None:
+        prober = hass.data[DATA_DISCOVERY_PROBER] = DiscoveryProber(hass)
+    return prober
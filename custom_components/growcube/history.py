@@ -0,0 +1,176 @@
+"""In-memory history of the Growcube sensor readings."""
+from __future__ import annotations
+
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .const import CHANNEL_ID
+
+# Resolution in seconds and number of samples of each tier. The first tier holds
+# the raw readings, the others the mean over each period: 24 hours in 5 minute
+# steps and 7 days in 1 hour steps.
+HISTORY_TIERS: Tuple[Tuple[int, int], ...] = (
+    (0, 360),
+    (300, 288),
+    (3600, 168),
+)
+
+# Minimum seconds between the temperature and humidity readings that are kept. Every
+# moisture report repeats them, whichever of the channels it is for.
+CLIMATE_INTERVAL = 60
+
+# Values are stored as tenths in 16 bit integers
+_VALUE_SCALE = 10
+
+SERIES = tuple(f"moisture_{channel_id}" for channel_id in CHANNEL_ID) + ("temperature", "humidity")
+
+
+class RingBuffer:
+    """Fixed size buffer of timestamped values, overwriting the oldest when full.
+
+    Timestamps are whole seconds and must be added in order.
+    """
+
+    __slots__ = ("_times", "_values", "_capacity", "_start", "_count")
+
+    def __init__(self, capacity: int) -> None:
+        self._times = array("I", bytes(4 * capacity))
+        self._values = array("h", bytes(2 * capacity))
+        self._capacity = capacity
+        self._start = 0
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def full(self) -> bool:
+        """Whether the oldest value is dropped on the next append."""
+        return self._count == self._capacity
+
+    @property
+    def oldest(self) -> Optional[int]:
+        """Timestamp of the oldest value, None when empty."""
+        return self._times[self._start] if self._count else None
+
+    def append(self, timestamp: int, value: int) -> None:
+        """Add a value, dropping the oldest one when full."""
+        if self._count < self._capacity:
+            index = self._start + self._count
+            if index >= self._capacity:
+                index -= self._capacity
+            self._count += 1
+        else:
+            index = self._start
+            self._start = index + 1 if index + 1 < self._capacity else 0
+        self._times[index] = timestamp
+        self._values[index] = value
+
+    def range(self, start: int, end: int) -> List[Tuple[int, int]]:
+        """Return the values with start <= timestamp <= end, oldest first."""
+        times, capacity, first = self._times, self._capacity, self._start
+
+        def _time(position: int) -> int:
+            index = first + position
+            return times[index - capacity if index >= capacity else index]
+
+        # Binary search for the first position at or after start
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            if _time(middle) < start:
+                low = middle + 1
+            else:
+                high = middle
+        result = []
+        for position in range(low, self._count):
+            index = first + position
+            if index >= capacity:
+                index -= capacity
+            if times[index] > end:
+                break
+            result.append((times[index], self._values[index]))
+        return result
+
+
+class SeriesHistory:
+    """History of a single value, with a ring buffer per downsampling tier."""
+
+    __slots__ = ("_resolutions", "_rings", "_bucket", "_sum", "_count", "_last")
+
+    def __init__(self, tiers: Iterable[Tuple[int, int]] = HISTORY_TIERS) -> None:
+        tiers = tuple(tiers)
+        self._resolutions = [resolution for resolution, _ in tiers]
+        self._rings = [RingBuffer(capacity) for _, capacity in tiers]
+        # Period being averaged for each tier, the raw tier doesn't use these
+        self._bucket = [0] * len(tiers)
+        self._sum = [0.0] * len(tiers)
+        self._count = [0] * len(tiers)
+        self._last = 0
+
+    def add(self, timestamp: float, value: float) -> None:
+        """Add a reading."""
+        # Keep the buffers ordered if the clock steps back
+        timestamp = self._last = max(int(timestamp), self._last)
+        self._rings[0].append(timestamp, round(value * _VALUE_SCALE))
+        for tier in range(1, len(self._rings)):
+            resolution = self._resolutions[tier]
+            bucket = timestamp - timestamp % resolution
+            if bucket != self._bucket[tier]:
+                if self._count[tier]:
+                    self._rings[tier].append(self._bucket[tier], self._mean(tier))
+                self._bucket[tier] = bucket
+                self._sum[tier] = 0.0
+                self._count[tier] = 0
+            self._sum[tier] += value
+            self._count[tier] += 1
+
+    def query(self, start: int, end: int) -> Tuple[int, List[List]]:
+        """Return the resolution and the values between start and end.
+
+        The finest tier holding everything since start is used, a tier that
+        hasn't filled up yet holds every reading since the device was added.
+        """
+        tier = len(self._rings) - 1
+        for index, ring in enumerate(self._rings):
+            if not ring.full or ring.oldest <= start:
+                tier = index
+                break
+        samples = self._rings[tier].range(start, end)
+        if tier and self._count[tier] and start <= self._bucket[tier] <= end:
+            # Include the period still being averaged
+            samples.append((self._bucket[tier], self._mean(tier)))
+        return self._resolutions[tier], [[timestamp, value / _VALUE_SCALE] for timestamp, value in samples]
+
+    def _mean(self, tier: int) -> int:
+        return round(self._sum[tier] * _VALUE_SCALE / self._count[tier])
+
+
+class DeviceHistory:
+    """History of the moisture of each channel, and the temperature and humidity of a device."""
+
+    def __init__(self, tiers: Iterable[Tuple[int, int]] = HISTORY_TIERS) -> None:
+        tiers = tuple(tiers)
+        self._series: Dict[str, SeriesHistory] = {name: SeriesHistory(tiers) for name in SERIES}
+        self._moisture = [self._series[f"moisture_{channel_id}"] for channel_id in CHANNEL_ID]
+        self._temperature = self._series["temperature"]
+        self._humidity = self._series["humidity"]
+        # Timestamp of the last temperature and humidity readings kept, None before the first
+        self._climate_time: Optional[float] = None
+
+    def add_reading(self, timestamp: float, channel: int, moisture: int, humidity: int, temperature: int) -> None:
+        """Add the values of a moisture and humidity report."""
+        self._moisture[channel].add(timestamp, moisture)
+        # Evenly spaced, so the means of the tiers aren't skewed. A clock stepping back restarts it.
+        if self._climate_time is None or not 0 <= timestamp - self._climate_time < CLIMATE_INTERVAL:
+            self._climate_time = timestamp
+            self._humidity.add(timestamp, humidity)
+            self._temperature.add(timestamp, temperature)
+
+    def query(self, start: int, end: int, series: Optional[Iterable[str]] = None) -> Dict[str, Dict]:
+        """Return the values of the given series, or all of them, between start and end."""
+        result = {}
+        for name in series or SERIES:
+            resolution, samples = self._series[name].query(start, end)
+            result[name] = {"resolution": resolution, "samples": samples}
+        return result
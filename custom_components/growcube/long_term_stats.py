@@ -0,0 +1,198 @@
+"""Hourly long-term statistics of the Growcube readings, imported into the recorder."""
+from __future__ import annotations
+
+import logging
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Set, Tuple
+
+from homeassistant.const import PERCENTAGE, UnitOfTemperature
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_utc_time_change
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN, CHANNEL_ID, CHANNEL_NAME, DATA_STATISTICS_IMPORTER, STATISTICS_MAX_PENDING_HOURS
+
+if TYPE_CHECKING:
+    from .coordinator import GrowcubeDataCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+# Series name, statistic name and unit
+STATISTICS_SERIES: Tuple[Tuple[str, str, str], ...] = tuple(
+    (f"moisture_{channel_id}", f"Moisture {channel_name}", PERCENTAGE)
+    for channel_id, channel_name in zip(CHANNEL_ID, CHANNEL_NAME)
+) + (
+    ("temperature", "Temperature", UnitOfTemperature.CELSIUS),
+    ("humidity", "Humidity", PERCENTAGE),
+)
+
+# An hour of a series: start timestamp, number of readings, sum, min and max
+Bucket = List[float]
+
+
+def _hour(timestamp: float) -> int:
+    return int(timestamp) - int(timestamp) % 3600
+
+
+def _recorder_recording(hass: HomeAssistant) -> bool:
+    """Return whether the recorder is set up and takes the statistics."""
+    if "recorder" not in hass.config.components:
+        return False
+    from homeassistant.components.recorder import get_instance
+    return get_instance(hass).recording
+
+
+class DeviceStatistics:
+    """Hourly mean, min and max of the readings of a device.
+
+    Each reading updates the running bucket of its series. Hours that are over
+    wait in pending until they have been imported, and both are kept in the
+    stored state of the device, so hours not imported before a restart, or while
+    the recorder wasn't running, are imported later.
+    """
+
+    def __init__(self) -> None:
+        self._current: Dict[str, Bucket] = {}
+        self.pending: Dict[str, List[Bucket]] = {}
+
+    def add_reading(self, timestamp: float, channel: int, moisture: int, humidity: int, temperature: int) -> None:
+        """Add the values of a moisture and humidity report."""
+        hour = _hour(timestamp)
+        self._add(f"moisture_{CHANNEL_ID[channel]}", hour, moisture)
+        self._add("humidity", hour, humidity)
+        self._add("temperature", hour, temperature)
+
+    def _add(self, name: str, hour: int, value: float) -> None:
+        bucket = self._current.get(name)
+        # A reading from before the running hour, after the clock stepped back, is added to it
+        if bucket is None or bucket[0] < hour:
+            if bucket is not None:
+                self._close(name, bucket)
+            bucket = self._current[name] = [hour, 0, 0.0, value, value]
+        bucket[1] += 1
+        bucket[2] += value
+        if value < bucket[3]:
+            bucket[3] = value
+        elif value > bucket[4]:
+            bucket[4] = value
+
+    def _close(self, name: str, bucket: Bucket) -> None:
+        pending = self.pending.setdefault(name, [])
+        pending.append(bucket)
+        if len(pending) > STATISTICS_MAX_PENDING_HOURS:
+            del pending[0]
+
+    def close_hours(self, timestamp: float) -> None:
+        """Move the buckets of the hours before the one of timestamp to pending."""
+        hour = _hour(timestamp)
+        for name, bucket in list(self._current.items()):
+            if bucket[0] < hour:
+                self._close(name, bucket)
+                del self._current[name]
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the buckets, for the stored state."""
+        return {"current": self._current, "pending": self.pending}
+
+    def restore(self, stored: Optional[Dict[str, Any]]) -> None:
+        """Continue from stored buckets, a running hour that is over is moved to pending when importing."""
+        if not stored:
+            return
+        self._current = {name: list(bucket) for name, bucket in stored.get("current", {}).items()}
+        self.pending = {name: [list(bucket) for bucket in buckets]
+                        for name, buckets in stored.get("pending", {}).items()}
+
+
+class StatisticsImporter:
+    """Imports the hourly statistics of all Growcube devices as external statistics.
+
+    A single timer runs shortly after every hour while any device is registered,
+    and the hours pending for a device are imported when it's registered. The recorder only computes statistics for entities with a state class, which
+    these sensors don't have, so the database gets one row per series and hour.
+    """
+
+    def __init__(self,
+                 hass: HomeAssistant,
+                 add_statistics: Optional[Callable[[HomeAssistant, Dict, List[Dict]], None]] = None,
+                 recording: Callable[[HomeAssistant], bool] = _recorder_recording) -> None:
+        self._hass = hass
+        # The recorder is imported when first needed, it's not a dependency of the integration
+        self._add_statistics = add_statistics
+        self._recording = recording
+        self._coordinators: Set[GrowcubeDataCoordinator] = set()
+        self._unsub: Optional[CALLBACK_TYPE] = None
+
+    def __len__(self) -> int:
+        return len(self._coordinators)
+
+    @callback
+    def register(self, coordinator: GrowcubeDataCoordinator) -> None:
+        """Import the statistics of a device from now on, starting with the hours restored as pending."""
+        self._coordinators.add(coordinator)
+        if self._unsub is None:
+            self._unsub = async_track_utc_time_change(self._hass, self._async_import_all, minute=0, second=10)
+        self.async_import(coordinator)
+
+    @callback
+    def unregister(self, coordinator: GrowcubeDataCoordinator) -> None:
+        """Stop importing the statistics of a device, the timer stops with the last one."""
+        self._coordinators.discard(coordinator)
+        if not self._coordinators and self._unsub is not None:
+            self._unsub()
+            self._unsub = None
+
+    @callback
+    def _async_import_all(self, now: Any = None) -> None:
+        for coordinator in self._coordinators:
+            self.async_import(coordinator)
+
+    @callback
+    def async_import(self, coordinator: GrowcubeDataCoordinator) -> int:
+        """Import the hours of a device that are over, returns the number of rows imported."""
+        statistics = coordinator.statistics
+        statistics.close_hours(dt_util.utcnow().timestamp())
+        device_id = coordinator.data.device_id
+        if not statistics.pending or device_id is None or not self._recording(self._hass):
+            # Kept until the recorder is running
+            return 0
+        if self._add_statistics is None:
+            from homeassistant.components.recorder.statistics import async_add_external_statistics
+            self._add_statistics = async_add_external_statistics
+
+        device_name = coordinator.data.device_info["name"] if coordinator.data.device_info else device_id
+        imported = 0
+        for name, statistic_name, unit in STATISTICS_SERIES:
+            buckets = statistics.pending.get(name)
+            if not buckets:
+                continue
+            metadata = {
+                "has_mean": True,
+                "has_sum": False,
+                "name": f"{device_name} {statistic_name}",
+                "source": DOMAIN,
+                "statistic_id": f"{DOMAIN}:{device_id}_{name}",
+                "unit_of_measurement": unit,
+            }
+            rows = [
+                {
+                    "start": dt_util.utc_from_timestamp(hour),
+                    "mean": total / count,
+                    "min": minimum,
+                    "max": maximum,
+                }
+                for hour, count, total, minimum, maximum in buckets
+            ]
+            self._add_statistics(self._hass, metadata, rows)
+            # Only dropped once the recorder has queued them
+            del statistics.pending[name]
+            imported += len(rows)
+        _LOGGER.debug("%s: Imported %s hourly statistics", device_id, imported)
+        return imported
+
+
+@callback
+def async_get_statistics_importer(hass: HomeAssistant) -> StatisticsImporter:
+    """Return the statistics importer shared by all Growcube devices."""
+    importer = hass.data.get(DATA_STATISTICS_IMPORTER)
+    if importer is None:
+        importer = hass.data[DATA_STATISTICS_IMPORTER] = StatisticsImporter(hass)
+    return importer
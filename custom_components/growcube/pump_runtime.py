@@ -0,0 +1,47 @@
+"""Pump runtime accounting for the Growcube channels."""
+from __future__ import annotations
+
+from typing import List, Optional, Sequence
+
+
+class PumpRuntime:
+    """Total seconds each pump has been open, from the pump open and close reports.
+
+    Times are monotonic. A pump still open when the connection is lost is counted
+    until then, as its close report can't be received.
+    """
+
+    __slots__ = ("seconds", "_opened_at")
+
+    def __init__(self) -> None:
+        self.seconds: List[float] = [0.0] * 4
+        self._opened_at: List[Optional[float]] = [None] * 4
+
+    def open(self, channel: int, now: float) -> None:
+        """Start counting for a channel, a repeated open report keeps the first time."""
+        if self._opened_at[channel] is None:
+            self._opened_at[channel] = now
+
+    def close(self, channel: int, now: float) -> float:
+        """Add the time the pump of a channel was open to its total, and return it."""
+        opened_at = self._opened_at[channel]
+        if opened_at is None:
+            return 0.0
+        self._opened_at[channel] = None
+        duration = max(now - opened_at, 0.0)
+        self.seconds[channel] += duration
+        return duration
+
+    def close_all(self, now: float) -> bool:
+        """Close the pumps that are open, returns whether there were any."""
+        closed = False
+        for channel, opened_at in enumerate(self._opened_at):
+            if opened_at is not None:
+                self.close(channel, now)
+                closed = True
+        return closed
+
+    def restore(self, seconds: Optional[Sequence[float]]) -> None:
+        """Continue from stored totals."""
+        if seconds:
+            self.seconds = [float(value) for value in seconds]
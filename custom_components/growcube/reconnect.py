@@ -0,0 +1,154 @@
+"""Fleet wide reconnect scheduling for Growcube devices."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Dict, Optional
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    DATA_RECONNECT_SCHEDULER,
+    RECONNECT_BASE_DELAY,
+    RECONNECT_MAX_DELAY,
+    RECONNECT_MAX_CONCURRENT,
+)
+
+if TYPE_CHECKING:
+    from .coordinator import GrowcubeDataCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass
+class ReconnectState:
+    """Reconnect state of a single device."""
+    attempts: int = 0
+    next_attempt: Optional[datetime] = None
+    in_flight: bool = False
+
+
+class ReconnectScheduler:
+    """Schedules reconnects for all Growcube devices of a Home Assistant instance.
+
+    Each device backs off exponentially with jitter, so a fleet that dropped off
+    the network at the same time spreads its attempts out. A semaphore caps the
+    number of connection attempts in flight across the fleet.
+
+    This is the only place reconnects are started from. A device has at most one
+    pending timer or running attempt, both tracked so cancel() stops them.
+    """
+
+    def __init__(self,
+                 hass: HomeAssistant,
+                 base_delay: float = RECONNECT_BASE_DELAY,
+                 max_delay: float = RECONNECT_MAX_DELAY,
+                 max_concurrent: int = RECONNECT_MAX_CONCURRENT) -> None:
+        self._hass = hass
+        self._base_delay = base_delay
+        self._max_delay = max_delay
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._handles: Dict[GrowcubeDataCoordinator, asyncio.TimerHandle] = {}
+        self._tasks: Dict[GrowcubeDataCoordinator, asyncio.Task] = {}
+
+    def next_delay(self, attempts: int) -> float:
+        """Return the delay before the next attempt, half fixed and half random."""
+        delay = min(self._max_delay, self._base_delay * 2 ** attempts)
+        return random.uniform(delay / 2, delay)
+
+    @callback
+    def schedule(self, coordinator: GrowcubeDataCoordinator, immediate: bool = False) -> None:
+        """Schedule a reconnect attempt, unless one is already pending or running."""
+        state = coordinator.reconnect_state
+        if state.in_flight:
+            return
+        handle = self._handles.get(coordinator)
+        if handle is not None:
+            if not immediate:
+                return
+            handle.cancel()
+
+        delay = 0 if immediate else self.next_delay(state.attempts)
+        state.next_attempt = dt_util.utcnow() + timedelta(seconds=delay)
+        self._handles[coordinator] = self._hass.loop.call_later(delay, self._start_attempt, coordinator)
+        _LOGGER.debug(
+            "Reconnect to %s scheduled in %.1f seconds, attempt %s",
+            coordinator.host,
+            delay,
+            state.attempts + 1
+        )
+        coordinator.async_reconnect_state_updated()
+
+    def __len__(self) -> int:
+        return len(self._handles) + len(self._tasks)
+
+    @callback
+    def cancel(self, coordinator: GrowcubeDataCoordinator) -> None:
+        """Cancel any pending or running attempt and forget the device state."""
+        handle = self._handles.pop(coordinator, None)
+        if handle is not None:
+            handle.cancel()
+        task = self._tasks.pop(coordinator, None)
+        if task is not None:
+            task.cancel()
+        coordinator.reconnect_state.attempts = 0
+        coordinator.reconnect_state.next_attempt = None
+
+    @callback
+    def _start_attempt(self, coordinator: GrowcubeDataCoordinator) -> None:
+        self._handles.pop(coordinator, None)
+        coordinator.reconnect_state.in_flight = True
+        self._tasks[coordinator] = self._hass.async_create_background_task(
+            self._async_attempt(coordinator),
+            f"growcube reconnect {coordinator.host}",
+        )
+
+    async def _async_attempt(self, coordinator: GrowcubeDataCoordinator) -> None:
+        state = coordinator.reconnect_state
+        try:
+            async with self._semaphore:
+                if coordinator.shutting_down or coordinator.client.connected:
+                    return
+                result, error = await coordinator.client.connect()
+        finally:
+            state.in_flight = False
+            if self._tasks.get(coordinator) is asyncio.current_task():
+                del self._tasks[coordinator]
+
+        if result and coordinator.shutting_down:
+            # Unloaded while the connection was being set up
+            coordinator.client.disconnect()
+            return
+
+        if result:
+            _LOGGER.debug(
+                "Reconnect to %s succeeded after %s attempts",
+                coordinator.host,
+                state.attempts + 1
+            )
+            state.attempts = 0
+            state.next_attempt = None
+            coordinator.async_reconnect_state_updated()
+            return
+
+        state.attempts += 1
+        _LOGGER.debug(
+            "Reconnect failed for %s with error '%s'",
+            coordinator.host,
+            error
+        )
+        if not coordinator.shutting_down:
+            self.schedule(coordinator)
+
+
+@callback
+def async_get_reconnect_scheduler(hass: HomeAssistant) -> ReconnectScheduler:
+    """Return the reconnect scheduler shared by all Growcube devices."""
+    scheduler = hass.data.get(DATA_RECONNECT_SCHEDULER)
+    if scheduler is None:
+        scheduler = hass.data[DATA_RECONNECT_SCHEDULER] = ReconnectScheduler(hass)
+    return scheduler
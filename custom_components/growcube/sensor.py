@@ -1,15 +1,18 @@
 """Support for Growcube sensors."""
-from homeassistant.const import PERCENTAGE, UnitOfTemperature, Platform
-from homeassistant.components.sensor import SensorEntity, SensorDeviceClass
+from datetime import datetime
+from typing import Any
+
+from homeassistant.const import PERCENTAGE, UnitOfTemperature, UnitOfTime, UnitOfVolume, Platform, EntityCategory
+from homeassistant.components.sensor import SensorEntity, SensorDeviceClass, SensorStateClass
 from homeassistant.core import callback, HomeAssistant
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.device_registry import DeviceInfo
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
-from .const import DOMAIN, CHANNEL_ID, CHANNEL_NAME
+from .const import DOMAIN, CHANNEL_ID, CHANNEL_NAME, CONF_PUMP_FLOW_RATE
 import logging
 
-from .coordinator import GrowcubeDataCoordinator
+from .coordinator import GrowcubeDataCoordinator, field_mask, FIELD_CONNECTION
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -17,12 +20,25 @@ _LOGGER = logging.getLogger(__name__)
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback) -> None:
     """Set up the Growcube sensors."""
     coordinator = hass.data[DOMAIN][entry.entry_id]
-    async_add_entities([TemperatureSensor(coordinator),
-                        HumiditySensor(coordinator),
-                        MoistureSensor(coordinator, 0),
-                        MoistureSensor(coordinator, 1),
-                        MoistureSensor(coordinator, 2),
-                        MoistureSensor(coordinator, 3)])
+    entities = [TemperatureSensor(coordinator),
+                HumiditySensor(coordinator),
+                MoistureSensor(coordinator, 0),
+                MoistureSensor(coordinator, 1),
+                MoistureSensor(coordinator, 2),
+                MoistureSensor(coordinator, 3),
+                PumpRuntimeSensor(coordinator, 0),
+                PumpRuntimeSensor(coordinator, 1),
+                PumpRuntimeSensor(coordinator, 2),
+                PumpRuntimeSensor(coordinator, 3),
+                NextReconnectSensor(coordinator),
+                ReportsReceivedSensor(coordinator),
+                StateWritesSensor(coordinator),
+                CommandsSentSensor(coordinator),
+                DispatchTimeSensor(coordinator)]
+    flow_rate = entry.options.get(CONF_PUMP_FLOW_RATE, 0)
+    if flow_rate:
+        entities.extend(WaterSensor(coordinator, channel, flow_rate) for channel in range(4))
+    async_add_entities(entities)
 
 
 class TemperatureSensor(CoordinatorEntity[GrowcubeDataCoordinator], SensorEntity):
@@ -32,7 +48,7 @@ class TemperatureSensor(CoordinatorEntity[GrowcubeDataCoordinator], SensorEntity
     _attr_device_class = SensorDeviceClass.TEMPERATURE
 
     def __init__(self, coordinator: GrowcubeDataCoordinator) -> None:
-        super().__init__(coordinator)
+        super().__init__(coordinator, field_mask("temperature"))
         self._attr_unique_id = f"{coordinator.data.device_id}_temperature"
         self._attr_device_info = coordinator.data.device_info
 
@@ -40,6 +56,10 @@ class TemperatureSensor(CoordinatorEntity[GrowcubeDataCoordinator], SensorEntity
     def native_value(self) -> int | None:
         return self.coordinator.data.temperature
 
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        return {"stale": self.coordinator.is_stale("temperature")}
+
 
 class HumiditySensor(CoordinatorEntity[GrowcubeDataCoordinator], SensorEntity):
     _attr_has_entity_name = True
@@ -48,7 +68,7 @@ class HumiditySensor(CoordinatorEntity[GrowcubeDataCoordinator], SensorEntity):
     _attr_device_class = SensorDeviceClass.HUMIDITY
 
     def __init__(self, coordinator: GrowcubeDataCoordinator) -> None:
-        super().__init__(coordinator)
+        super().__init__(coordinator, field_mask("humidity"))
         self._attr_unique_id = f"{coordinator.data.device_id}_humidity"
         self._attr_device_info = coordinator.data.device_info
 
@@ -56,6 +76,10 @@ class HumiditySensor(CoordinatorEntity[GrowcubeDataCoordinator], SensorEntity):
     def native_value(self) -> int | None:
         return self.coordinator.data.humidity
 
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        return {"stale": self.coordinator.is_stale("humidity")}
+
 
 class MoistureSensor(CoordinatorEntity[GrowcubeDataCoordinator], SensorEntity):
     _attr_has_entity_name = True
@@ -64,7 +88,7 @@ class MoistureSensor(CoordinatorEntity[GrowcubeDataCoordinator], SensorEntity):
     _attr_icon = "mdi:cup-water"
 
     def __init__(self, coordinator: GrowcubeDataCoordinator, channel: int) -> None:
-        super().__init__(coordinator)
+        super().__init__(coordinator, field_mask("moisture", channel))
         self._channel = channel
         self._attr_name = f"Moisture {CHANNEL_NAME[self._channel]}"
         self._attr_unique_id = f"{coordinator.data.device_id}_moisture_{CHANNEL_ID[self._channel]}"
@@ -73,3 +97,173 @@ class MoistureSensor(CoordinatorEntity[GrowcubeDataCoordinator], SensorEntity):
     @property
     def native_value(self) -> int | None:
         return self.coordinator.data.moisture[self._channel]
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        return {"stale": self.coordinator.is_stale("moisture", self._channel)}
+
+
+class PumpRuntimeSensor(CoordinatorEntity[GrowcubeDataCoordinator], SensorEntity):
+    _attr_has_entity_name = True
+    _attr_native_unit_of_measurement = UnitOfTime.SECONDS
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_state_class = SensorStateClass.TOTAL_INCREASING
+    _attr_suggested_display_precision = 0
+    _attr_icon = "mdi:pump"
+
+    def __init__(self, coordinator: GrowcubeDataCoordinator, channel: int) -> None:
+        # Updated when the pump closes, the total includes the time it was open
+        super().__init__(coordinator, field_mask("pump_open", channel))
+        self._channel = channel
+        self._attr_name = f"Pump runtime {CHANNEL_NAME[self._channel]}"
+        self._attr_unique_id = f"{coordinator.data.device_id}_pump_runtime_{CHANNEL_ID[self._channel]}"
+        self._attr_device_info = coordinator.data.device_info
+
+    @property
+    def native_value(self) -> float:
+        return round(self.coordinator.pump_runtime.seconds[self._channel], 1)
+
+
+class WaterSensor(CoordinatorEntity[GrowcubeDataCoordinator], SensorEntity):
+    _attr_has_entity_name = True
+    _attr_native_unit_of_measurement = UnitOfVolume.LITERS
+    _attr_device_class = SensorDeviceClass.WATER
+    _attr_state_class = SensorStateClass.TOTAL_INCREASING
+    _attr_suggested_display_precision = 2
+    _attr_icon = "mdi:watering-can"
+
+    def __init__(self, coordinator: GrowcubeDataCoordinator, channel: int, flow_rate: float) -> None:
+        super().__init__(coordinator, field_mask("pump_open", channel))
+        self._channel = channel
+        # Litres per second, from the flow rate in millilitres per minute
+        self._litres_per_second = flow_rate / 60000
+        self._attr_name = f"Water {CHANNEL_NAME[self._channel]}"
+        self._attr_unique_id = f"{coordinator.data.device_id}_water_{CHANNEL_ID[self._channel]}"
+        self._attr_device_info = coordinator.data.device_info
+
+    @property
+    def native_value(self) -> float:
+        return round(self.coordinator.pump_runtime.seconds[self._channel] * self._litres_per_second, 3)
+
+
+class NextReconnectSensor(CoordinatorEntity[GrowcubeDataCoordinator], SensorEntity):
+    _attr_has_entity_name = True
+    _attr_name = "Next reconnect"
+    _attr_device_class = SensorDeviceClass.TIMESTAMP
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+    _attr_icon = "mdi:lan-pending"
+
+    def __init__(self, coordinator: GrowcubeDataCoordinator) -> None:
+        super().__init__(coordinator, FIELD_CONNECTION)
+        self._attr_unique_id = f"{coordinator.data.device_id}_next_reconnect"
+        self._attr_device_info = coordinator.data.device_info
+
+    @property
+    def available(self) -> bool:
+        # Shows when the offline device is tried next
+        return True
+
+    @property
+    def native_value(self) -> datetime | None:
+        return self.coordinator.reconnect_state.next_attempt
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        return {"attempts": self.coordinator.reconnect_state.attempts}
+
+
+class StatsSensor(SensorEntity):
+    """Base class for the sensors showing the coordinator stats.
+
+    The stats change with every report, so these sensors are polled instead of
+    being updated by the coordinator.
+    """
+    _attr_has_entity_name = True
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+    _attr_should_poll = True
+
+    def __init__(self, coordinator: GrowcubeDataCoordinator, key: str) -> None:
+        self.coordinator = coordinator
+        self._attr_unique_id = f"{coordinator.data.device_id}_{key}"
+        self._attr_device_info = coordinator.data.device_info
+
+
+class ReportsReceivedSensor(StatsSensor):
+    _attr_name = "Reports received"
+    _attr_state_class = SensorStateClass.TOTAL_INCREASING
+    _attr_icon = "mdi:message-arrow-left-outline"
+
+    def __init__(self, coordinator: GrowcubeDataCoordinator) -> None:
+        super().__init__(coordinator, "reports_received")
+
+    @property
+    def native_value(self) -> int:
+        return self.coordinator.stats.reports_total
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        return {cls.__name__: count for cls, count in self.coordinator.stats.reports.items()}
+
+
+class StateWritesSensor(StatsSensor):
+    _attr_name = "State writes"
+    _attr_state_class = SensorStateClass.TOTAL_INCREASING
+    _attr_icon = "mdi:database-arrow-up-outline"
+
+    def __init__(self, coordinator: GrowcubeDataCoordinator) -> None:
+        super().__init__(coordinator, "state_writes")
+
+    @property
+    def native_value(self) -> int:
+        return self.coordinator.stats.state_writes
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        stats = self.coordinator.stats
+        return {"skipped": stats.state_writes_skipped,
+                "coalesced": stats.state_writes_coalesced,
+                "suppressed": stats.values_suppressed}
+
+
+class CommandsSentSensor(StatsSensor):
+    _attr_name = "Commands sent"
+    _attr_state_class = SensorStateClass.TOTAL_INCREASING
+    _attr_icon = "mdi:message-arrow-right-outline"
+
+    def __init__(self, coordinator: GrowcubeDataCoordinator) -> None:
+        super().__init__(coordinator, "commands_sent")
+
+    @property
+    def native_value(self) -> int:
+        return self.coordinator.stats.commands_total
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        stats = self.coordinator.stats
+        return {"failed": stats.commands_failed,
+                **{cls.__name__: count for cls, count in stats.commands.items()}}
+
+
+class DispatchTimeSensor(StatsSensor):
+    _attr_name = "Report dispatch time"
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_native_unit_of_measurement = UnitOfTime.MILLISECONDS
+    _attr_suggested_display_precision = 3
+    _attr_icon = "mdi:timer-outline"
+
+    def __init__(self, coordinator: GrowcubeDataCoordinator) -> None:
+        super().__init__(coordinator, "dispatch_time")
+
+    @property
+    def native_value(self) -> float | None:
+        mean = self.coordinator.stats.dispatch.mean
+        return None if mean is None else mean * 1000
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        dispatch = self.coordinator.stats.dispatch
+        p99 = dispatch.percentile(99)
+        return {"p99": None if p99 is None else p99 * 1000, "max": dispatch.max * 1000}
@@ -1,37 +1,54 @@
-from typing import Mapping, Any
+import asyncio
+from typing import Mapping, Any, Awaitable, Callable
 import voluptuous as vol
 import homeassistant.helpers.config_validation as cv
 
 from growcube_client import Channel, WateringMode
 
 from homeassistant.const import ATTR_DEVICE_ID
-from homeassistant.core import HomeAssistant, ServiceCall, callback
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse, callback
 from homeassistant.exceptions import HomeAssistantError
-from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.service import async_extract_referenced_entity_ids
+from homeassistant.util import dt as dt_util
 
 from . import GrowcubeDataCoordinator
+from .device_index import async_get_device_index
 from .const import DOMAIN, CHANNEL_NAME, SERVICE_WATER_PLANT, SERVICE_SET_SMART_WATERING, \
     SERVICE_SET_SCHEDULED_WATERING, SERVICE_DELETE_WATERING, \
-    ARGS_CHANNEL, ARGS_DURATION, ARGS_MIN_MOISTURE, ARGS_MAX_MOISTURE, ARGS_ALL_DAY, ARGS_INTERVAL
+    SERVICE_WATER_PLANT_BATCH, SERVICE_SET_SMART_WATERING_BATCH, \
+    SERVICE_SET_SCHEDULED_WATERING_BATCH, SERVICE_DELETE_WATERING_BATCH, \
+    ARGS_CHANNEL, ARGS_DURATION, ARGS_MIN_MOISTURE, ARGS_MAX_MOISTURE, ARGS_ALL_DAY, ARGS_INTERVAL, \
+    ARGS_CHANNELS, ARGS_MAX_PARALLEL, DEFAULT_MAX_PARALLEL, ARGS_TIMEOUT, COMMAND_TIMEOUT, \
+    SERVICE_GET_HISTORY, ARGS_START, ARGS_END, ARGS_SERIES, \
+    SERVICE_SET_CONTROLLED_WATERING, SERVICE_DELETE_CONTROLLED_WATERING, ARGS_MIN_INTERVAL, ARGS_MAX_DAILY, \
+    ARGS_ENABLED, SERVICE_APPLY_WATERING_MODE, ARGS_MODE, ARGS_FORCE, \
+    WATERING_MODE_SMART, WATERING_MODE_SCHEDULED, WATERING_MODE_OFF
+from .controller import ControllerSettings
+from .history import SERIES
 import logging
 
 _LOGGER = logging.getLogger(__name__)
 
 @callback
 async def async_setup_services(hass: HomeAssistant) -> None:
+    if hass.services.has_service(DOMAIN, SERVICE_WATER_PLANT):
+        # Already registered by another entry
+        return
 
-    async def async_call_water_plant_service(service_call: ServiceCall) -> None:
-        await _async_handle_water_plant(hass, service_call.data)
+    async def async_call_water_plant_service(service_call: ServiceCall) -> ServiceResponse:
+        return await _async_handle_water_plant(hass, service_call.data)
 
-    async def async_call_set_smart_watering_service(service_call: ServiceCall) -> None:
-        await _async_handle_set_smart_watering(hass, service_call.data)
+    async def async_call_set_smart_watering_service(service_call: ServiceCall) -> ServiceResponse:
+        return await _async_handle_set_smart_watering(hass, service_call.data)
 
-    async def async_call_set_scheduled_watering_service(service_call: ServiceCall) -> None:
-        await _async_handle_set_scheduled_watering(hass, service_call.data)
+    async def async_call_set_scheduled_watering_service(service_call: ServiceCall) -> ServiceResponse:
+        return await _async_handle_set_scheduled_watering(hass, service_call.data)
 
-    async def async_call_delete_watering_service(service_call: ServiceCall) -> None:
-        await _async_handle_delete_watering(hass, service_call.data)
+    async def async_call_delete_watering_service(service_call: ServiceCall) -> ServiceResponse:
+        return await _async_handle_delete_watering(hass, service_call.data)
 
+    timeout_field = vol.All(vol.Coerce(float), vol.Range(min=1, max=60))
     hass.services.async_register(DOMAIN,
                                  SERVICE_WATER_PLANT,
                                  async_call_water_plant_service,
@@ -39,9 +56,11 @@ async def async_setup_services(hass: HomeAssistant) -> None:
                                      {
                                          vol.Required(ATTR_DEVICE_ID): cv.string,
                                          vol.Required(ARGS_CHANNEL, default='A'): cv.string,
+                                         vol.Optional(ARGS_TIMEOUT, default=COMMAND_TIMEOUT): timeout_field,
                                          vol.Required(ARGS_DURATION, default=5): cv.positive_int,
                                      }
-                                 ))
+                                 ),
+                                 supports_response=SupportsResponse.OPTIONAL)
     hass.services.async_register(DOMAIN,
                                  SERVICE_SET_SMART_WATERING,
                                  async_call_set_smart_watering_service,
@@ -49,11 +68,13 @@ async def async_setup_services(hass: HomeAssistant) -> None:
                                      {
                                          vol.Required(ATTR_DEVICE_ID): cv.string,
                                          vol.Required(ARGS_CHANNEL, default='A'): cv.string,
+                                         vol.Optional(ARGS_TIMEOUT, default=COMMAND_TIMEOUT): timeout_field,
                                          vol.Required(ARGS_ALL_DAY, default=True): cv.boolean,
                                          vol.Required(ARGS_MIN_MOISTURE, default=15): cv.positive_int,
                                          vol.Required(ARGS_MAX_MOISTURE, default=40): cv.positive_int,
                                      }
-                                 ))
+                                 ),
+                                 supports_response=SupportsResponse.OPTIONAL)
     hass.services.async_register(DOMAIN,
                                  SERVICE_SET_SCHEDULED_WATERING,
                                  async_call_set_scheduled_watering_service,
@@ -61,13 +82,162 @@ async def async_setup_services(hass: HomeAssistant) -> None:
                                      {
                                          vol.Required(ATTR_DEVICE_ID): cv.string,
                                          vol.Required(ARGS_CHANNEL, default='A'): cv.string,
+                                         vol.Optional(ARGS_TIMEOUT, default=COMMAND_TIMEOUT): timeout_field,
                                          vol.Required(ARGS_DURATION, default=6): cv.positive_int,
                                          vol.Required(ARGS_INTERVAL, default=3): cv.positive_int,
                                      }
-                                 ))
+                                 ),
+                                 supports_response=SupportsResponse.OPTIONAL)
     hass.services.async_register(DOMAIN,
                                  SERVICE_DELETE_WATERING,
                                  async_call_delete_watering_service,
+                                 schema=vol.Schema(
+                                     {
+                                         vol.Required(ATTR_DEVICE_ID): cv.string,
+                                         vol.Required(ARGS_CHANNEL, default='A'): cv.string,
+                                         vol.Optional(ARGS_TIMEOUT, default=COMMAND_TIMEOUT): timeout_field,
+                                     }
+                                 ),
+                                 supports_response=SupportsResponse.OPTIONAL)
+
+    async def async_call_water_plant_batch_service(service_call: ServiceCall) -> ServiceResponse:
+        duration = _validate_water_plant("batch", SERVICE_WATER_PLANT_BATCH, service_call.data[ARGS_DURATION])
+        return await _async_handle_batch(
+            hass, service_call,
+            lambda coordinator, channel: coordinator.handle_water_plant(
+                channel, duration, service_call.data[ARGS_TIMEOUT]))
+
+    async def async_call_set_smart_watering_batch_service(service_call: ServiceCall) -> ServiceResponse:
+        data = service_call.data
+        _validate_smart_watering("batch", SERVICE_SET_SMART_WATERING_BATCH,
+                                 data[ARGS_MIN_MOISTURE], data[ARGS_MAX_MOISTURE])
+        return await _async_handle_batch(
+            hass, service_call,
+            lambda coordinator, channel: coordinator.handle_set_smart_watering(
+                channel, data[ARGS_ALL_DAY], data[ARGS_MIN_MOISTURE], data[ARGS_MAX_MOISTURE], data[ARGS_TIMEOUT]))
+
+    async def async_call_set_scheduled_watering_batch_service(service_call: ServiceCall) -> ServiceResponse:
+        data = service_call.data
+        _validate_scheduled_watering("batch", SERVICE_SET_SCHEDULED_WATERING_BATCH,
+                                     data[ARGS_DURATION], data[ARGS_INTERVAL])
+        return await _async_handle_batch(
+            hass, service_call,
+            lambda coordinator, channel: coordinator.handle_set_manual_watering(
+                channel, data[ARGS_DURATION], data[ARGS_INTERVAL], data[ARGS_TIMEOUT]))
+
+    async def async_call_delete_watering_batch_service(service_call: ServiceCall) -> ServiceResponse:
+        return await _async_handle_batch(
+            hass, service_call,
+            lambda coordinator, channel: coordinator.handle_delete_watering(channel, service_call.data[ARGS_TIMEOUT]))
+
+    batch_fields = {
+        vol.Required(ARGS_CHANNELS, default=CHANNEL_NAME): vol.All(cv.ensure_list, [cv.string]),
+        vol.Optional(ARGS_MAX_PARALLEL, default=DEFAULT_MAX_PARALLEL): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=64)),
+        vol.Optional(ARGS_TIMEOUT, default=COMMAND_TIMEOUT): timeout_field,
+    }
+    hass.services.async_register(DOMAIN,
+                                 SERVICE_WATER_PLANT_BATCH,
+                                 async_call_water_plant_batch_service,
+                                 schema=cv.make_entity_service_schema(
+                                     {
+                                         **batch_fields,
+                                         vol.Required(ARGS_DURATION, default=5): cv.positive_int,
+                                     }
+                                 ),
+                                 supports_response=SupportsResponse.OPTIONAL)
+    hass.services.async_register(DOMAIN,
+                                 SERVICE_SET_SMART_WATERING_BATCH,
+                                 async_call_set_smart_watering_batch_service,
+                                 schema=cv.make_entity_service_schema(
+                                     {
+                                         **batch_fields,
+                                         vol.Required(ARGS_ALL_DAY, default=True): cv.boolean,
+                                         vol.Required(ARGS_MIN_MOISTURE, default=15): cv.positive_int,
+                                         vol.Required(ARGS_MAX_MOISTURE, default=40): cv.positive_int,
+                                     }
+                                 ),
+                                 supports_response=SupportsResponse.OPTIONAL)
+    hass.services.async_register(DOMAIN,
+                                 SERVICE_SET_SCHEDULED_WATERING_BATCH,
+                                 async_call_set_scheduled_watering_batch_service,
+                                 schema=cv.make_entity_service_schema(
+                                     {
+                                         **batch_fields,
+                                         vol.Required(ARGS_DURATION, default=6): cv.positive_int,
+                                         vol.Required(ARGS_INTERVAL, default=3): cv.positive_int,
+                                     }
+                                 ),
+                                 supports_response=SupportsResponse.OPTIONAL)
+    hass.services.async_register(DOMAIN,
+                                 SERVICE_DELETE_WATERING_BATCH,
+                                 async_call_delete_watering_batch_service,
+                                 schema=cv.make_entity_service_schema(batch_fields),
+                                 supports_response=SupportsResponse.OPTIONAL)
+
+    async def async_call_apply_watering_mode_service(service_call: ServiceCall) -> ServiceResponse:
+        return await _async_handle_apply_watering_mode(hass, service_call)
+
+    hass.services.async_register(DOMAIN,
+                                 SERVICE_APPLY_WATERING_MODE,
+                                 async_call_apply_watering_mode_service,
+                                 schema=cv.make_entity_service_schema(
+                                     {
+                                         **batch_fields,
+                                         vol.Required(ARGS_MODE): vol.In(
+                                             [WATERING_MODE_SMART, WATERING_MODE_SCHEDULED, WATERING_MODE_OFF]),
+                                         vol.Optional(ARGS_ALL_DAY, default=True): cv.boolean,
+                                         vol.Optional(ARGS_MIN_MOISTURE, default=15): cv.positive_int,
+                                         vol.Optional(ARGS_MAX_MOISTURE, default=40): cv.positive_int,
+                                         vol.Optional(ARGS_DURATION, default=6): cv.positive_int,
+                                         vol.Optional(ARGS_INTERVAL, default=3): cv.positive_int,
+                                         vol.Optional(ARGS_FORCE, default=False): cv.boolean,
+                                     }
+                                 ),
+                                 supports_response=SupportsResponse.OPTIONAL)
+
+    async def async_call_get_history_service(service_call: ServiceCall) -> ServiceResponse:
+        return _async_handle_get_history(hass, service_call.data)
+
+    hass.services.async_register(DOMAIN,
+                                 SERVICE_GET_HISTORY,
+                                 async_call_get_history_service,
+                                 schema=vol.Schema(
+                                     {
+                                         vol.Required(ATTR_DEVICE_ID): cv.string,
+                                         vol.Optional(ARGS_START): cv.datetime,
+                                         vol.Optional(ARGS_END): cv.datetime,
+                                         vol.Optional(ARGS_SERIES): vol.All(cv.ensure_list, [vol.In(SERIES)]),
+                                     }
+                                 ),
+                                 supports_response=SupportsResponse.ONLY)
+
+    async def async_call_set_controlled_watering_service(service_call: ServiceCall) -> None:
+        _async_handle_set_controlled_watering(hass, service_call.data)
+
+    async def async_call_delete_controlled_watering_service(service_call: ServiceCall) -> None:
+        _async_handle_delete_controlled_watering(hass, service_call.data)
+
+    hass.services.async_register(DOMAIN,
+                                 SERVICE_SET_CONTROLLED_WATERING,
+                                 async_call_set_controlled_watering_service,
+                                 schema=vol.Schema(
+                                     {
+                                         vol.Required(ATTR_DEVICE_ID): cv.string,
+                                         vol.Required(ARGS_CHANNEL, default='A'): cv.string,
+                                         vol.Required(ARGS_MIN_MOISTURE, default=15): cv.positive_int,
+                                         vol.Required(ARGS_MAX_MOISTURE, default=40): cv.positive_int,
+                                         vol.Required(ARGS_DURATION, default=5): cv.positive_int,
+                                         vol.Required(ARGS_MIN_INTERVAL, default=30): vol.All(
+                                             vol.Coerce(int), vol.Range(min=1, max=1440)),
+                                         vol.Required(ARGS_MAX_DAILY, default=60): vol.All(
+                                             vol.Coerce(int), vol.Range(min=1, max=3600)),
+                                         vol.Optional(ARGS_ENABLED, default=True): cv.boolean,
+                                     }
+                                 ))
+    hass.services.async_register(DOMAIN,
+                                 SERVICE_DELETE_CONTROLLED_WATERING,
+                                 async_call_delete_controlled_watering_service,
                                  schema=vol.Schema(
                                      {
                                          vol.Required(ATTR_DEVICE_ID): cv.string,
@@ -76,34 +246,169 @@ async def async_setup_services(hass: HomeAssistant) -> None:
                                  ))
 
 
-async def _async_handle_water_plant(hass: HomeAssistant, data: Mapping[str, Any]) -> None:
+async def _async_handle_water_plant(hass: HomeAssistant, data: Mapping[str, Any]) -> ServiceResponse:
 
     coordinator, device = _get_coordinator(hass, data)
 
     if coordinator is None:
         _LOGGER.warning("Unable to find coordinator for %s", data[ATTR_DEVICE_ID])
-        return
+        return None
+
+    channel = _validate_channel(device, SERVICE_WATER_PLANT, data[ARGS_CHANNEL])
+    duration = _validate_water_plant(device, SERVICE_WATER_PLANT, data[ARGS_DURATION])
+    latency = await coordinator.handle_water_plant(channel, duration, data[ARGS_TIMEOUT])
+    return _latency_response(latency)
+
+
+async def _async_handle_set_smart_watering(hass: HomeAssistant, data: Mapping[str, Any]) -> ServiceResponse:
+
+    coordinator, device = _get_coordinator(hass, data)
+
+    if coordinator is None:
+        _LOGGER.error("Unable to find coordinator for %s", device)
+        return None
+
+    channel = _validate_channel(device, SERVICE_SET_SMART_WATERING, data[ARGS_CHANNEL])
+    min_moisture = data[ARGS_MIN_MOISTURE]
+    max_moisture = data[ARGS_MAX_MOISTURE]
+    _validate_smart_watering(device, SERVICE_SET_SMART_WATERING, min_moisture, max_moisture)
+    latency = await coordinator.handle_set_smart_watering(
+        channel, data[ARGS_ALL_DAY], min_moisture, max_moisture, data[ARGS_TIMEOUT])
+    return _latency_response(latency)
 
-    channel_str = data["channel"]
-    duration_str = data["duration"]
 
-    # Validate data
+async def _async_handle_set_scheduled_watering(hass: HomeAssistant, data: Mapping[str, Any]) -> ServiceResponse:
+
+    coordinator, device = _get_coordinator(hass, data)
+
+    if coordinator is None:
+        _LOGGER.error("Unable to find coordinator for %s", device)
+        return None
+
+    channel = _validate_channel(device, SERVICE_SET_SCHEDULED_WATERING, data[ARGS_CHANNEL])
+    duration = data[ARGS_DURATION]
+    interval = data[ARGS_INTERVAL]
+    _validate_scheduled_watering(device, SERVICE_SET_SCHEDULED_WATERING, duration, interval)
+    latency = await coordinator.handle_set_manual_watering(channel, duration, interval, data[ARGS_TIMEOUT])
+    return _latency_response(latency)
+
+
+async def _async_handle_delete_watering(hass: HomeAssistant, data: Mapping[str, Any]) -> ServiceResponse:
+
+    coordinator, device = _get_coordinator(hass, data)
+
+    if coordinator is None:
+        raise HomeAssistantError(f"Unable to find coordinator for {device}")
+
+    channel = _validate_channel(device, SERVICE_DELETE_WATERING, data[ARGS_CHANNEL])
+    latency = await coordinator.handle_delete_watering(channel, data[ARGS_TIMEOUT])
+    return _latency_response(latency)
+
+
+@callback
+def _async_handle_set_controlled_watering(hass: HomeAssistant, data: Mapping[str, Any]) -> None:
+    coordinator, device = _get_coordinator(hass, data)
+
+    if coordinator is None:
+        raise HomeAssistantError(f"Unable to find coordinator for {device}")
+
+    channel = _validate_channel(device, SERVICE_SET_CONTROLLED_WATERING, data[ARGS_CHANNEL])
+    min_moisture = data[ARGS_MIN_MOISTURE]
+    max_moisture = data[ARGS_MAX_MOISTURE]
+    _validate_smart_watering(device, SERVICE_SET_CONTROLLED_WATERING, min_moisture, max_moisture)
+    duration = _validate_water_plant(device, SERVICE_SET_CONTROLLED_WATERING, data[ARGS_DURATION])
+    coordinator.handle_set_controlled_watering(channel, ControllerSettings(
+        min_moisture=min_moisture,
+        max_moisture=max_moisture,
+        duration=duration,
+        min_interval=data[ARGS_MIN_INTERVAL] * 60,
+        max_daily=data[ARGS_MAX_DAILY],
+        enabled=data[ARGS_ENABLED],
+    ))
+
+
+@callback
+def _async_handle_delete_controlled_watering(hass: HomeAssistant, data: Mapping[str, Any]) -> None:
+    coordinator, device = _get_coordinator(hass, data)
+
+    if coordinator is None:
+        raise HomeAssistantError(f"Unable to find coordinator for {device}")
+
+    channel = _validate_channel(device, SERVICE_DELETE_CONTROLLED_WATERING, data[ARGS_CHANNEL])
+    coordinator.handle_set_controlled_watering(channel, None)
+
+
+async def _async_handle_apply_watering_mode(hass: HomeAssistant, service_call: ServiceCall) -> ServiceResponse:
+    """Apply a watering mode to the targeted channels that don't have it applied already."""
+    data = service_call.data
+    mode_name = data[ARGS_MODE]
+    if mode_name == WATERING_MODE_SMART:
+        _validate_smart_watering("batch", SERVICE_APPLY_WATERING_MODE,
+                                 data[ARGS_MIN_MOISTURE], data[ARGS_MAX_MOISTURE])
+        mode = (mode_name, data[ARGS_ALL_DAY], data[ARGS_MIN_MOISTURE], data[ARGS_MAX_MOISTURE])
+    elif mode_name == WATERING_MODE_SCHEDULED:
+        _validate_scheduled_watering("batch", SERVICE_APPLY_WATERING_MODE, data[ARGS_DURATION], data[ARGS_INTERVAL])
+        mode = (mode_name, data[ARGS_DURATION], data[ARGS_INTERVAL])
+    else:
+        mode = (mode_name,)
+
+    response = await _async_handle_batch(
+        hass, service_call,
+        lambda coordinator, channel: coordinator.handle_apply_watering_mode(
+            channel, mode, data[ARGS_TIMEOUT], data[ARGS_FORCE]))
+    changed, skipped, failed = [], [], []
+    for result in response["results"]:
+        target = {ATTR_DEVICE_ID: result[ATTR_DEVICE_ID], ARGS_CHANNEL: result[ARGS_CHANNEL]}
+        if not result["success"]:
+            failed.append({**target, "error": result["error"]})
+        elif result.get("skipped"):
+            skipped.append(target)
+        else:
+            changed.append({**target, "latency": result["latency"]})
+    _LOGGER.debug("Watering mode %s: %s changed, %s skipped, %s failed",
+                  mode_name, len(changed), len(skipped), len(failed))
+    return {"changed": changed, "skipped": skipped, "failed": failed}
+
+
+def _latency_response(latency: float) -> ServiceResponse:
+    """Return the time it took the device to complete the command, in seconds."""
+    return {"latency": round(latency, 3)}
+
+
+@callback
+def _async_handle_get_history(hass: HomeAssistant, data: Mapping[str, Any]) -> ServiceResponse:
+    coordinator, device = _get_coordinator(hass, data)
+
+    if coordinator is None:
+        raise HomeAssistantError(f"Unable to find coordinator for {device}")
+
+    end = dt_util.as_timestamp(data.get(ARGS_END) or dt_util.utcnow())
+    start = dt_util.as_timestamp(data[ARGS_START]) if ARGS_START in data else end - 3600
+    if start > end:
+        raise HomeAssistantError("Invalid range, start must be before end")
+    return {"series": coordinator.history.query(int(start), int(end), data.get(ARGS_SERIES))}
+
+
+def _validate_channel(device: str, service: str, channel_str: str) -> Channel:
     if channel_str not in CHANNEL_NAME:
         _LOGGER.error(
             "%s: %s - Invalid channel specified: %s",
             device,
-            SERVICE_WATER_PLANT,
+            service,
             channel_str
         )
         raise HomeAssistantError(f"Invalid channel '{channel_str}' specified")
+    return Channel(CHANNEL_NAME.index(channel_str))
 
+
+def _validate_water_plant(device: str, service: str, duration_str: Any) -> int:
     try:
         duration = int(duration_str)
     except ValueError:
         _LOGGER.error(
             "%s: %s - Invalid duration '%s'",
             device,
-            SERVICE_WATER_PLANT,
+            service,
             duration_str
         )
         raise HomeAssistantError(f"Invalid duration '{duration_str}' specified")
@@ -112,44 +417,19 @@ async def _async_handle_water_plant(hass: HomeAssistant, data: Mapping[str, Any]
         _LOGGER.error(
             "%s: %s - Invalid duration '%s', should be 1-60",
             device,
-            SERVICE_WATER_PLANT,
+            service,
             duration
         )
         raise HomeAssistantError(f"Invalid duration '{duration}' specified, should be 1-60")
+    return duration
 
-    channel = Channel(CHANNEL_NAME.index(channel_str))
-
-    await coordinator.handle_water_plant(channel, duration)
-
-
-async def _async_handle_set_smart_watering(hass: HomeAssistant, data: Mapping[str, Any]) -> None:
-
-    coordinator, device = _get_coordinator(hass, data)
-
-    if coordinator is None:
-        _LOGGER.error("Unable to find coordinator for %s", device)
-        return
-
-    channel_str = data[ARGS_CHANNEL]
-    min_moisture = data[ARGS_MIN_MOISTURE]
-    max_moisture = data[ARGS_MAX_MOISTURE]
-    all_day = data[ARGS_ALL_DAY]
-
-    # Validate data
-    if channel_str not in CHANNEL_NAME:
-        _LOGGER.error(
-            "%s: %s - Invalid channel specified: %s",
-            device,
-            SERVICE_SET_SMART_WATERING,
-            channel_str
-        )
-        raise HomeAssistantError(f"Invalid channel '{channel_str}' specified")
 
+def _validate_smart_watering(device: str, service: str, min_moisture: int, max_moisture: int) -> None:
     if min_moisture <= 0 or min_moisture > 100:
         _LOGGER.error(
             "%s: %s - Invalid min_moisture specified: %s",
             device,
-            SERVICE_SET_SMART_WATERING,
+            service,
             min_moisture
         )
         raise HomeAssistantError(f"Invalid min_moisture '{min_moisture}' specified")
@@ -158,7 +438,7 @@ async def _async_handle_set_smart_watering(hass: HomeAssistant, data: Mapping[st
         _LOGGER.error(
             "%s: %s - Invalid max_moisture specified: %s",
             device,
-            SERVICE_SET_SMART_WATERING,
+            service,
             max_moisture
         )
         raise HomeAssistantError(f"Invalid max_moisture '{max_moisture}' specified")
@@ -167,44 +447,20 @@ async def _async_handle_set_smart_watering(hass: HomeAssistant, data: Mapping[st
         _LOGGER.error(
             "%s: %s - Invalid values specified, max_moisture %s must be bigger than min_moisture %s",
             device,
-            SERVICE_SET_SMART_WATERING,
+            service,
             max_moisture,
             min_moisture
         )
         raise HomeAssistantError(
             f"Invalid values specified, max_moisture {max_moisture} must be bigger than min_moisture {min_moisture}")
 
-    channel = Channel(CHANNEL_NAME.index(channel_str))
-    await coordinator.handle_set_smart_watering(channel, all_day, min_moisture, max_moisture)
-
-
-async def _async_handle_set_scheduled_watering(hass: HomeAssistant, data: Mapping[str, Any]) -> None:
-
-    coordinator, device = _get_coordinator(hass, data)
-
-    if coordinator is None:
-        _LOGGER.error("Unable to find coordinator for %s", device)
-        return
-
-    channel_str = data[ARGS_CHANNEL]
-    duration = data[ARGS_DURATION]
-    interval = data[ARGS_INTERVAL]
-
-    # Validate data
-    if channel_str not in CHANNEL_NAME:
-        _LOGGER.error(
-            "%s: %s - Invalid channel specified: %s",
-            device,
-            SERVICE_SET_SCHEDULED_WATERING,
-            channel_str
-        )
-        raise HomeAssistantError(f"Invalid channel '{channel_str}' specified")
 
+def _validate_scheduled_watering(device: str, service: str, duration: int, interval: int) -> None:
     if duration <= 0 or duration > 100:
         _LOGGER.error(
             "%s: %s - Invalid duration specified: %s",
             device,
-            SERVICE_SET_SCHEDULED_WATERING,
+            service,
             duration
         )
         raise HomeAssistantError(f"Invalid duration '{duration}' specified")
@@ -213,48 +469,82 @@ async def _async_handle_set_scheduled_watering(hass: HomeAssistant, data: Mappin
         _LOGGER.error(
             "%s: %s - Invalid interval specified: %s",
             device,
-            SERVICE_SET_SCHEDULED_WATERING,
+            service,
             interval
         )
         raise HomeAssistantError(f"Invalid interval '{interval}' specified")
 
-    channel = Channel(CHANNEL_NAME.index(channel_str))
-    await coordinator.handle_set_manual_watering(channel, duration, interval)
-
-
-async def _async_handle_delete_watering(hass: HomeAssistant, data: Mapping[str, Any]) -> None:
-
-    coordinator, device = _get_coordinator(hass, data)
 
-    if coordinator is None:
-        raise HomeAssistantError(f"Unable to find coordinator for {device}")
+async def _async_handle_batch(hass: HomeAssistant,
+                              service_call: ServiceCall,
+                              action: Callable[[GrowcubeDataCoordinator, Channel], Awaitable[Any]],
+                              ) -> ServiceResponse:
+    """Run an action for every targeted device and channel, a limited number at a time."""
+    channels = [_validate_channel("batch", service_call.service, channel_str)
+                for channel_str in service_call.data[ARGS_CHANNELS]]
+    targets = _async_resolve_targets(hass, service_call)
+    semaphore = asyncio.Semaphore(service_call.data[ARGS_MAX_PARALLEL])
+
+    async def _run(device_id: str, coordinator: GrowcubeDataCoordinator, channel: Channel) -> dict[str, Any]:
+        result: dict[str, Any] = {
+            ATTR_DEVICE_ID: device_id,
+            ARGS_CHANNEL: CHANNEL_NAME[channel],
+            "success": True,
+        }
+        async with semaphore:
+            try:
+                latency = await action(coordinator, channel)
+                if latency is None:
+                    result["skipped"] = True
+                else:
+                    result["latency"] = round(latency, 3)
+            except Exception as err:  # pylint: disable=broad-except
+                _LOGGER.error(
+                    "%s: %s - Failed for channel %s: %s",
+                    device_id,
+                    service_call.service,
+                    CHANNEL_NAME[channel],
+                    err
+                )
+                result["success"] = False
+                result["error"] = str(err)
+        return result
+
+    results = await asyncio.gather(*(
+        _run(device_id, coordinator, channel)
+        for device_id, coordinator in targets
+        for channel in channels
+    ))
+    return {"results": list(results)}
 
-    channel_str = data["channel"]
-
-    # Validate data
-    if channel_str not in CHANNEL_NAME:
-        _LOGGER.error(
-            "%s: %s - Invalid channel specified: %s",
-            device,
-            SERVICE_DELETE_WATERING,
-            channel_str
-        )
-        raise HomeAssistantError(f"Invalid channel '{channel_str}' specified")
 
-    channel = Channel(CHANNEL_NAME.index(channel_str))
-    await coordinator.handle_delete_watering(channel)
+@callback
+def _async_resolve_targets(hass: HomeAssistant,
+                           service_call: ServiceCall) -> list[tuple[str, GrowcubeDataCoordinator]]:
+    """Resolve the devices, areas, labels and entities of a service call to Growcube coordinators."""
+    selected = async_extract_referenced_entity_ids(hass, service_call, expand_group=False)
+    device_ids = set(selected.referenced_devices)
+    if selected.referenced:
+        entity_registry = er.async_get(hass)
+        for entity_id in selected.referenced:
+            if (entity_entry := entity_registry.async_get(entity_id)) and entity_entry.device_id:
+                device_ids.add(entity_entry.device_id)
+
+    index = async_get_device_index(hass)
+    targets = []
+    for device_id in sorted(device_ids):
+        coordinator = index.async_get(device_id)
+        if coordinator is not None:
+            targets.append((device_id, coordinator))
+
+    if not targets:
+        raise HomeAssistantError("No Growcube devices found for the given targets")
+    return targets
 
 
 def _get_coordinator(hass: HomeAssistant, data: Mapping[str, Any]) -> tuple[GrowcubeDataCoordinator | None, str]:
-    device_registry = dr.async_get(hass)
     device_id = data[ATTR_DEVICE_ID]
-    device_entry = device_registry.async_get(device_id)
-    device = list(device_entry.identifiers)[0][1]
-
-    for key in hass.data[DOMAIN]:
-        coordinator = hass.data[DOMAIN][key]
-        if coordinator.data.device_id == device:
-            return coordinator, device_id
-
-    _LOGGER.error("No coordinator found for %s", device)
-    return None, device_id
+    coordinator = async_get_device_index(hass).async_get(device_id)
+    if coordinator is None:
+        _LOGGER.error("No coordinator found for %s", device_id)
+    return coordinator, device_id
@@ -0,0 +1,118 @@
+"""Counters and latency histograms for the Growcube coordinator."""
+from __future__ import annotations
+
+from bisect import bisect_left
+from typing import Any, Dict, Optional, Tuple
+
+# Upper bounds of the latency buckets in seconds, the last bucket is unbounded
+LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+    0.25, 0.5, 1.0, 2.5, 5.0,
+)
+
+
+class LatencyHistogram:
+    """Histogram of durations with fixed, logarithmically spaced buckets."""
+
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, duration: float) -> None:
+        """Add a duration in seconds."""
+        self.counts[bisect_left(LATENCY_BUCKETS, duration)] += 1
+        self.count += 1
+        self.total += duration
+        if duration > self.max:
+            self.max = duration
+
+    @property
+    def mean(self) -> Optional[float]:
+        """Mean duration in seconds, None when empty."""
+        return self.total / self.count if self.count else None
+
+    def percentile(self, percent: float) -> Optional[float]:
+        """Upper bound of the bucket holding the given percentile, None when empty."""
+        if not self.count:
+            return None
+        rank = self.count * percent / 100
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return LATENCY_BUCKETS[index] if index < len(LATENCY_BUCKETS) else self.max
+        return self.max
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the histogram in microseconds, for diagnostics."""
+        buckets = {f"le_{bound * 1e6:g}us": count for bound, count in zip(LATENCY_BUCKETS, self.counts)}
+        buckets["inf"] = self.counts[-1]
+        return {
+            "count": self.count,
+            "mean_us": _microseconds(self.mean),
+            "p50_us": _microseconds(self.percentile(50)),
+            "p99_us": _microseconds(self.percentile(99)),
+            "max_us": _microseconds(self.max if self.count else None),
+            "buckets": buckets,
+        }
+
+
+class CoordinatorStats:
+    """Hot path counters of a single coordinator.
+
+    Report and command counts are keyed by class, and only turned into names
+    when the stats are read.
+    """
+
+    def __init__(self) -> None:
+        self.reports: Dict[type, int] = {}
+        self.dispatch = LatencyHistogram()
+        self.state_writes = 0
+        self.state_writes_skipped = 0
+        self.state_writes_coalesced = 0
+        # Sensor readings held back by a deadband or publish interval
+        self.values_suppressed = 0
+        self.commands: Dict[type, int] = {}
+        self.commands_failed = 0
+        self.command_latency = LatencyHistogram()
+
+    @property
+    def reports_total(self) -> int:
+        """Number of reports received."""
+        return self.dispatch.count
+
+    @property
+    def commands_total(self) -> int:
+        """Number of commands sent, including the failed ones."""
+        return sum(self.commands.values())
+
+    def record_command(self, command_class: type, success: bool) -> None:
+        """Count a command sent to the device."""
+        self.commands[command_class] = self.commands.get(command_class, 0) + 1
+        if not success:
+            self.commands_failed += 1
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the stats, for diagnostics."""
+        return {
+            "reports": {cls.__name__: count for cls, count in self.reports.items()},
+            "reports_total": self.reports_total,
+            "dispatch": self.dispatch.as_dict(),
+            "state_writes": self.state_writes,
+            "state_writes_skipped": self.state_writes_skipped,
+            "state_writes_coalesced": self.state_writes_coalesced,
+            "values_suppressed": self.values_suppressed,
+            "commands": {cls.__name__: count for cls, count in self.commands.items()},
+            "commands_total": self.commands_total,
+            "commands_failed": self.commands_failed,
+            "command_latency": self.command_latency.as_dict(),
+        }
+
+
+def _microseconds(seconds: Optional[float]) -> Optional[float]:
+    return None if seconds is None else round(seconds * 1e6, 1)
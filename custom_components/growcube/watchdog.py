@@ -0,0 +1,81 @@
+"""Fleet wide liveness watchdog for Growcube connections."""
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DATA_WATCHDOG, WATCHDOG_INTERVAL
+
+if TYPE_CHECKING:
+    from .coordinator import GrowcubeDataCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class LivenessWatchdog:
+    """Drops the connections of Growcube devices that stopped reporting.
+
+    A device that lost power leaves a half-open connection that the OS may not
+    notice for minutes. A single timer checks all watched devices, comparing the
+    report count of each with the previous check, so handling a report costs
+    nothing extra and there is no task per device.
+    """
+
+    def __init__(self, hass: HomeAssistant, interval: float = WATCHDOG_INTERVAL) -> None:
+        self._hass = hass
+        self._interval = interval
+        # Timeout, report count at the last check and loop time it last changed
+        self._watched: Dict[GrowcubeDataCoordinator, List[float]] = {}
+        self._handle: Optional[asyncio.TimerHandle] = None
+
+    def __len__(self) -> int:
+        return len(self._watched)
+
+    @callback
+    def watch(self, coordinator: GrowcubeDataCoordinator, timeout: float) -> None:
+        """Start watching a connected device, it must report within timeout seconds."""
+        self._watched[coordinator] = [timeout, coordinator.stats.reports_total, self._hass.loop.time()]
+        if self._handle is None:
+            self._handle = self._hass.loop.call_later(self._interval, self._check)
+
+    @callback
+    def unwatch(self, coordinator: GrowcubeDataCoordinator) -> None:
+        """Stop watching a device, the timer stops with the last one."""
+        self._watched.pop(coordinator, None)
+        if not self._watched and self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+
+    @callback
+    def _check(self) -> None:
+        now = self._hass.loop.time()
+        expired = []
+        for coordinator, watched in self._watched.items():
+            timeout, reports, since = watched
+            count = coordinator.stats.reports_total
+            if count != reports:
+                watched[1] = count
+                watched[2] = now
+            elif now - since >= timeout:
+                expired.append(coordinator)
+        for coordinator in expired:
+            timeout = self._watched.pop(coordinator)[0]
+            _LOGGER.warning(
+                "No reports from %s in %s seconds, reconnecting",
+                coordinator.host,
+                timeout
+            )
+            coordinator.async_liveness_timeout()
+        self._handle = self._hass.loop.call_later(self._interval, self._check) if self._watched else None
+
+
+@callback
+def async_get_watchdog(hass: HomeAssistant) -> LivenessWatchdog:
+    """Return the liveness watchdog shared by all Growcube devices."""
+    watchdog = hass.data.get(DATA_WATCHDOG)
+    if watchdog is None:
+        watchdog = hass.data[DATA_WATCHDOG] = LivenessWatchdog(hass)
+    return watchdog
@@ -7,6 +7,7 @@ from homeassistant.setup import async_setup_component
 from homeassistant.const import CONF_HOST
 
 from custom_components.growcube.const import DOMAIN
+from custom_components.growcube.coordinator import GrowcubeDataCoordinator
 
 
 @pytest.fixture
@@ -20,6 +21,18 @@ def mock_growcube_client():
         yield client
 
 
+@pytest.fixture
+def create_coordinator(hass: HomeAssistant):
+    """Return a factory of coordinators, each with its own disconnected mock GrowcubeClient."""
+    def _create(host: str, **options) -> GrowcubeDataCoordinator:
+        with patch("custom_components.growcube.coordinator.GrowcubeClient"):
+            coordinator = GrowcubeDataCoordinator(host, hass, options)
+        coordinator.client.connected = False
+        return coordinator
+
+    return _create
+
+
 @pytest.fixture
 async def mock_integration(hass: HomeAssistant, mock_growcube_client):
     """Set up the Growcube integration in Home Assistant."""
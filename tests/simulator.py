@@ -0,0 +1,247 @@
+"""A local TCP simulator speaking the Growcube protocol.
+
+The simulator listens on a local port and behaves like a Growcube as seen by
+GrowcubeClient: it announces its version and device id when a client connects,
+sends moisture/humidity readings, and answers watering commands with pump
+open/close reports. Fault and lock reports can be injected by the caller.
+
+Run a single cube with: python -m tests.simulator [port]
+"""
+import asyncio
+import random
+import sys
+from typing import Dict, List, Optional, Set, Tuple
+
+from growcube_client import GrowcubeCommand, GrowcubeMessage
+
+# Report codes, see GrowcubeReport.Response
+REP_WATER_STATE = 20
+REP_MOISTURE_HUMIDITY = 21
+REP_DEVICE_VERSION = 24
+REP_PUMP_OPEN = 26
+REP_PUMP_CLOSE = 27
+REP_CHECK_SENSOR = 28
+REP_OUTLET_BLOCKED = 29
+REP_SENSOR_NOT_CONNECTED = 30
+REP_LOCK_STATE = 33
+REP_OUTLET_LOCKED = 34
+
+
+class _SimulatorProtocol(asyncio.Protocol):
+    """Connection from a client to a simulated cube."""
+
+    def __init__(self, simulator: "GrowcubeSimulator") -> None:
+        self._simulator = simulator
+        self._data = bytearray()
+        self.transport: Optional[asyncio.Transport] = None
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        self.transport = transport
+        self._simulator._connection_made(self)
+
+    def data_received(self, data: bytes) -> None:
+        self._data += data
+        while True:
+            try:
+                index, message = GrowcubeMessage.from_bytes(self._data)
+            except ValueError:
+                # Garbage from the client, drop the buffer like the real device
+                self._data.clear()
+                return
+            if message is None:
+                if index > 0:
+                    del self._data[:index]
+                return
+            del self._data[:index]
+            self._simulator._command_received(message.command, message.payload)
+
+    def connection_lost(self, exc: Optional[Exception]) -> None:
+        self._simulator._connection_lost(self)
+
+
+class GrowcubeSimulator:
+    """A simulated Growcube device.
+
+    :param device_id: The numeric device id, shown in hex by the integration.
+    :param version: The firmware version to report.
+    :param host: The address to listen on.
+    :param port: The port to listen on, 0 picks a free port.
+    :param report_interval: Seconds between unsolicited moisture readings, None to only report on request.
+    :param seed: Seed for the simulated readings.
+    """
+
+    def __init__(self,
+                 device_id: int = 0x3039,
+                 version: str = "3.6",
+                 host: str = "127.0.0.1",
+                 port: int = 0,
+                 report_interval: Optional[float] = None,
+                 seed: Optional[int] = None) -> None:
+        self.device_id = device_id
+        self.version = version
+        self.host = host
+        self.port = port
+        self.report_interval = report_interval
+        self.moisture: List[int] = [40, 40, 40, 40]
+        self.humidity = 50
+        self.temperature = 21
+        self.water_warning = False
+        self.locked = False
+        self.pump_open: List[bool] = [False, False, False, False]
+        self.watering_modes: Dict[int, Tuple[int, str, str]] = {}
+        self.commands: List[Tuple[int, str]] = []
+        self.reports_sent = 0
+        # Client connections accepted and closed since the start
+        self.connections_accepted = 0
+        self.connections_closed = 0
+        self._rng = random.Random(seed)
+        self._server: Optional[asyncio.base_events.Server] = None
+        self._connections: Set[_SimulatorProtocol] = set()
+        self._report_task: Optional[asyncio.Task] = None
+
+    @property
+    def connections(self) -> int:
+        """Number of connected clients."""
+        return len(self._connections)
+
+    async def start(self) -> None:
+        """Start listening for clients."""
+        loop = asyncio.get_running_loop()
+        self._server = await loop.create_server(lambda: _SimulatorProtocol(self), self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        if self.report_interval:
+            self._report_task = loop.create_task(self._report_loop())
+
+    async def stop(self) -> None:
+        """Stop the simulator and drop all clients."""
+        if self._report_task is not None:
+            self._report_task.cancel()
+            try:
+                await self._report_task
+            except asyncio.CancelledError:
+                pass
+            self._report_task = None
+        self.drop_connections()
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    def drop_connections(self) -> None:
+        """Close all client connections, as when the cube reboots or drops off WiFi."""
+        for connection in list(self._connections):
+            connection.transport.close()
+
+    def send_report(self, command: int, payload: str) -> None:
+        """Send a raw report to all connected clients."""
+        message = GrowcubeMessage.to_bytes(command, payload)
+        for connection in self._connections:
+            connection.transport.write(message)
+            self.reports_sent += 1
+
+    def send_device_version(self) -> None:
+        """Send the firmware version and device id."""
+        self.send_report(REP_DEVICE_VERSION, f"{self.version}@{self.device_id}")
+
+    def send_moisture(self, channel: int) -> None:
+        """Send the moisture reading of a channel, along with humidity and temperature."""
+        self.send_report(REP_MOISTURE_HUMIDITY,
+                         f"{channel}@{self.moisture[channel]}@{self.humidity}@{self.temperature}")
+
+    def send_water_state(self) -> None:
+        """Send the water tank state."""
+        self.send_report(REP_WATER_STATE, "0" if self.water_warning else "1")
+
+    def open_pump(self, channel: int) -> None:
+        """Open the pump of a channel."""
+        self.pump_open[channel] = True
+        self.send_report(REP_PUMP_OPEN, str(channel))
+
+    def close_pump(self, channel: int) -> None:
+        """Close the pump of a channel."""
+        self.pump_open[channel] = False
+        self.send_report(REP_PUMP_CLOSE, str(channel))
+
+    def send_sensor_fault(self, channel: int) -> None:
+        """Report a faulty moisture sensor."""
+        self.send_report(REP_CHECK_SENSOR, str(channel))
+
+    def send_sensor_not_connected(self, channel: int) -> None:
+        """Report a disconnected moisture sensor."""
+        self.send_report(REP_SENSOR_NOT_CONNECTED, str(channel))
+
+    def send_outlet_blocked(self, channel: int) -> None:
+        """Report a blocked outlet."""
+        self.send_report(REP_OUTLET_BLOCKED, f"{channel}@1")
+
+    def send_outlet_locked(self, channel: int) -> None:
+        """Report a locked outlet."""
+        self.send_report(REP_OUTLET_LOCKED, str(channel))
+
+    def set_locked(self, locked: bool) -> None:
+        """Lock or unlock the device."""
+        self.locked = locked
+        self.send_report(REP_LOCK_STATE, f"0@{1 if locked else 0}")
+
+    def step(self) -> None:
+        """Let the readings of a random channel drift and report them."""
+        channel = self._rng.randrange(4)
+        self.moisture[channel] = max(0, min(100, self.moisture[channel] + self._rng.randint(-2, 2)))
+        self.humidity = max(0, min(100, self.humidity + self._rng.randint(-1, 1)))
+        self.send_moisture(channel)
+
+    async def _report_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.report_interval)
+            self.step()
+
+    def _connection_made(self, connection: _SimulatorProtocol) -> None:
+        self._connections.add(connection)
+        self.connections_accepted += 1
+        # The cube introduces itself and sends its current state on connect
+        message = GrowcubeMessage.to_bytes(REP_DEVICE_VERSION, f"{self.version}@{self.device_id}")
+        message += GrowcubeMessage.to_bytes(REP_WATER_STATE, "0" if self.water_warning else "1")
+        for channel in range(4):
+            message += GrowcubeMessage.to_bytes(
+                REP_MOISTURE_HUMIDITY,
+                f"{channel}@{self.moisture[channel]}@{self.humidity}@{self.temperature}")
+        connection.transport.write(message)
+        self.reports_sent += 6
+
+    def _connection_lost(self, connection: _SimulatorProtocol) -> None:
+        self._connections.discard(connection)
+        self.connections_closed += 1
+
+    def _command_received(self, command: int, payload: str) -> None:
+        self.commands.append((command, payload))
+        code = f"{command:02d}"
+        parts = payload.split("@")
+        if code == GrowcubeCommand.CMD_REQ_WATER:
+            channel = int(parts[0])
+            if parts[1] == "1":
+                self.open_pump(channel)
+            else:
+                self.close_pump(channel)
+        elif code == GrowcubeCommand.CMD_CLOSE_PUMP:
+            self.close_pump(int(parts[0]))
+        elif code == GrowcubeCommand.CMD_WATER_MODE:
+            self.watering_modes[int(parts[0])] = (int(parts[1]), parts[2], parts[3])
+        elif code == GrowcubeCommand.CMD_PLANT_END:
+            self.watering_modes.pop(int(parts[0]), None)
+
+
+async def _main(port: int) -> None:
+    simulator = GrowcubeSimulator(port=port, report_interval=5)
+    await simulator.start()
+    print(f"Simulated Growcube listening on {simulator.host}:{simulator.port}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await simulator.stop()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(_main(int(sys.argv[1]) if len(sys.argv) > 1 else 8800))
+    except KeyboardInterrupt:
+        pass
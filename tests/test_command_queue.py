@@ -0,0 +1,69 @@
+"""Tests for the Growcube command queue."""
+import asyncio
+
+import pytest
+from growcube_client import (
+    Channel,
+    WaterCommand,
+    WateringModeCommand,
+    WateringMode,
+    ClosePumpCommand,
+    PumpOpenGrowcubeReport,
+)
+from homeassistant.exceptions import HomeAssistantError
+
+from custom_components.growcube.command_queue import CommandQueue
+from custom_components.growcube.stats import LatencyHistogram
+
+
+def _queue(hass, sent, success=True, pacing=0.01):
+    def _send(command):
+        sent.append((command, hass.loop.time()))
+        return success
+
+    return CommandQueue(hass, _send, "test", LatencyHistogram(), pacing=pacing)
+
+
+async def test_commands_are_sent_by_priority_and_paced(hass):
+    """Test that closing a pump jumps ahead of queued config writes, with a gap between commands."""
+    sent = []
+    queue = _queue(hass, sent)
+
+    config = [WateringModeCommand(Channel(channel), WateringMode.Smart, 20, 40) for channel in range(3)]
+    close = ClosePumpCommand(Channel.Channel_B)
+    tasks = [asyncio.create_task(queue.async_send(command)) for command in config]
+    await asyncio.sleep(0)
+    tasks.append(asyncio.create_task(queue.async_send(close)))
+    await asyncio.gather(*tasks)
+
+    assert [command for command, _ in sent] == [config[0], close, config[1], config[2]]
+    times = [sent_at for _, sent_at in sent]
+    assert all(later - earlier >= 0.01 for earlier, later in zip(times, times[1:]))
+
+
+async def test_command_completes_on_matching_report(hass):
+    """Test that a water command waits for the pump report of its channel."""
+    sent = []
+    queue = _queue(hass, sent)
+
+    task = asyncio.create_task(queue.async_send(WaterCommand(Channel.Channel_C, True)))
+    await asyncio.sleep(0.02)
+    queue.async_handle_report(PumpOpenGrowcubeReport("1"))
+    await asyncio.sleep(0)
+    assert not task.done()
+
+    queue.async_handle_report(PumpOpenGrowcubeReport("2"))
+    latency = await task
+    assert 0.02 <= latency < 1
+
+
+async def test_command_times_out_or_fails(hass):
+    """Test that missing acknowledgements and failed sends raise."""
+    sent = []
+    queue = _queue(hass, sent)
+    with pytest.raises(HomeAssistantError, match="Timed out"):
+        await queue.async_send(WaterCommand(Channel.Channel_A, True), timeout=0.05)
+
+    queue = _queue(hass, sent, success=False)
+    with pytest.raises(HomeAssistantError, match="Failed to send"):
+        await queue.async_send(ClosePumpCommand(Channel.Channel_A))
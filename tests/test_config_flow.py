@@ -0,0 +1,41 @@
+"""Tests for the Growcube config flow."""
+import pytest
+from homeassistant.const import CONF_HOST
+from homeassistant.core import HomeAssistant
+from homeassistant.data_entry_flow import FlowResultType
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+# The config flow uses the DHCP service info of recent Home Assistant cores
+pytest.importorskip("homeassistant.helpers.service_info.dhcp")
+
+from custom_components.growcube.config_flow import GrowcubeConfigFlow  # noqa: E402
+from custom_components.growcube.const import (  # noqa: E402
+    DOMAIN,
+    CONF_WAIT_FOR_DEVICE,
+    CONF_LIVENESS_TIMEOUT,
+    CONF_PUMP_FLOW_RATE,
+)
+
+
+async def test_options_flow(hass: HomeAssistant):
+    """Test that the options form shows the current options and saves the submitted ones."""
+    entry = MockConfigEntry(domain=DOMAIN, unique_id="12345", data={CONF_HOST: "192.168.1.100"},
+                            options={CONF_LIVENESS_TIMEOUT: 30})
+    entry.add_to_hass(hass)
+
+    flow = GrowcubeConfigFlow.async_get_options_flow(entry)
+    flow.hass = hass
+    flow.handler = entry.entry_id
+
+    result = await flow.async_step_init()
+    assert result["type"] == FlowResultType.FORM
+    defaults = {str(key): key.default() for key in result["data_schema"].schema}
+    assert defaults[CONF_LIVENESS_TIMEOUT] == 30
+    assert defaults[CONF_WAIT_FOR_DEVICE] is False
+
+    user_input = result["data_schema"]({CONF_WAIT_FOR_DEVICE: True, CONF_PUMP_FLOW_RATE: 400})
+    result = await flow.async_step_init(user_input)
+    assert result["type"] == FlowResultType.CREATE_ENTRY
+    assert result["data"][CONF_WAIT_FOR_DEVICE] is True
+    assert result["data"][CONF_LIVENESS_TIMEOUT] == 30
+    assert result["data"][CONF_PUMP_FLOW_RATE] == 400
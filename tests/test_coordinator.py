@@ -1,9 +1,17 @@
 """Tests for the Growcube coordinator."""
+import asyncio
+import logging
+import time
+
 import pytest
+from datetime import timedelta
 from unittest.mock import patch, MagicMock, AsyncMock, call
 
 from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers.device_registry import DeviceInfo
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
 
 from growcube_client import (
     GrowcubeReport,
@@ -21,7 +29,22 @@ from growcube_client import (
     WateringMode,
 )
 
-from custom_components.growcube.coordinator import GrowcubeDataCoordinator
+from custom_components.growcube.const import (
+    CONF_COALESCE_WINDOW,
+    CONF_DEBUG_LOGGING,
+    CONF_MOISTURE_DEADBAND,
+    CONF_MIN_PUBLISH_INTERVAL,
+    CONF_DEADBAND_OVERRIDE_INTERVAL,
+)
+from custom_components.growcube.coordinator import (
+    GrowcubeDataCoordinator,
+    GrowcubeData,
+    ChannelFlags,
+    field_mask,
+    FIELD_DEVICE,
+    snapshot_store,
+)
+from custom_components.growcube.controller import ControllerSettings
 
 
 async def test_coordinator_initialization(hass):
@@ -50,20 +73,491 @@ async def test_lock_state_change_triggers_reconnect(hass):
     host = "192.168.1.100"
     with patch("custom_components.growcube.coordinator.GrowcubeClient"):
         coordinator = GrowcubeDataCoordinator(host, hass)
-        coordinator.reconnect = AsyncMock()
+        coordinator.reconnect = MagicMock()
 
         # Set initial state: device is locked
-        coordinator.data.device_locked = True
+        coordinator.data = coordinator.data.evolve(device_locked=True)
 
         # Simulate receiving a report where device is now unlocked
         report = MagicMock(spec=LockStateGrowcubeReport)
         report.lock_state = False
 
-        # We need to use await because handle_report is async
-        await coordinator.handle_report(report)
-
-        # If scheduled with async_create_task, we need to wait for it to be processed
-        await hass.async_block_till_done()
+        # handle_report is a plain callback, invoked directly by the client
+        coordinator.handle_report(report)
 
         # Check if reconnect was called/scheduled
         coordinator.reconnect.assert_called_once()
+
+
+async def test_handle_report_moisture_updates_data(hass):
+    """Test that a moisture report updates the data and notifies listeners."""
+    host = "192.168.1.100"
+    with patch("custom_components.growcube.coordinator.GrowcubeClient"):
+        coordinator = GrowcubeDataCoordinator(host, hass)
+        listener = MagicMock()
+        coordinator.async_add_listener(listener)
+
+        coordinator.handle_report(MoistureHumidityStateGrowcubeReport("2@31@55@22"))
+
+        assert coordinator.data.moisture == (None, None, 31, None)
+        assert coordinator.data.humidity == 55
+        assert coordinator.data.temperature == 22
+        listener.assert_called_once()
+
+        # The same reading again is a no-op
+        coordinator.handle_report(MoistureHumidityStateGrowcubeReport("2@31@55@22"))
+        listener.assert_called_once()
+
+
+async def test_handle_report_resolves_subclasses(hass):
+    """Test that report subclasses are dispatched to the handler of their base class."""
+
+    class CustomPumpOpenReport(PumpOpenGrowcubeReport):
+        pass
+
+    host = "192.168.1.100"
+    with patch("custom_components.growcube.coordinator.GrowcubeClient"):
+        coordinator = GrowcubeDataCoordinator(host, hass)
+
+        coordinator.handle_report(CustomPumpOpenReport("1"))
+        assert list(coordinator.data.pump_open) == [False, True, False, False]
+
+        # Unknown reports are ignored
+        coordinator.handle_report(GrowcubeReport(99))
+        assert list(coordinator.data.pump_open) == [False, True, False, False]
+
+        # The dispatch table isn't extended at runtime
+        assert CustomPumpOpenReport not in GrowcubeDataCoordinator._report_handlers
+        assert GrowcubeReport not in GrowcubeDataCoordinator._report_handlers
+        with pytest.raises(TypeError):
+            GrowcubeDataCoordinator._report_handlers[CustomPumpOpenReport] = None
+
+
+async def test_listeners_only_notified_for_changed_fields(hass):
+    """Test that a report only wakes listeners subscribed to the fields it changed."""
+    host = "192.168.1.100"
+    with patch("custom_components.growcube.coordinator.GrowcubeClient"):
+        coordinator = GrowcubeDataCoordinator(host, hass)
+        moisture_c = MagicMock()
+        moisture_a = MagicMock()
+        temperature = MagicMock()
+        device = MagicMock()
+        coordinator.async_add_listener(moisture_c, field_mask("moisture", 2))
+        coordinator.async_add_listener(moisture_a, field_mask("moisture", 0))
+        coordinator.async_add_listener(temperature, field_mask("temperature"))
+        coordinator.async_add_listener(device, FIELD_DEVICE)
+
+        coordinator.handle_report(MoistureHumidityStateGrowcubeReport("2@31@55@22"))
+        assert moisture_c.call_count == 1
+        assert moisture_a.call_count == 0
+        assert temperature.call_count == 1
+        assert device.call_count == 0
+
+        # Only the moisture of channel C changes
+        coordinator.handle_report(MoistureHumidityStateGrowcubeReport("2@32@55@22"))
+        assert moisture_c.call_count == 2
+        assert temperature.call_count == 1
+
+        # Device level updates notify everyone
+        coordinator.handle_report(DeviceVersionGrowcubeReport("3.6@12345"))
+        assert moisture_a.call_count == 1
+        assert device.call_count == 1
+
+
+async def test_coalescing_window_folds_bursts(hass):
+    """Test that a burst of moisture reports results in a single update."""
+    host = "192.168.1.100"
+    with patch("custom_components.growcube.coordinator.GrowcubeClient"):
+        coordinator = GrowcubeDataCoordinator(host, hass, {CONF_COALESCE_WINDOW: 50})
+        moisture_a = MagicMock()
+        moisture_d = MagicMock()
+        coordinator.async_add_listener(moisture_a, field_mask("moisture", 0))
+        coordinator.async_add_listener(moisture_d, field_mask("moisture", 3))
+
+        for channel in range(4):
+            coordinator.handle_report(MoistureHumidityStateGrowcubeReport(f"{channel}@3{channel}@55@22"))
+        assert coordinator.data.moisture == (30, 31, 32, 33)
+        assert moisture_a.call_count == 0
+
+        await asyncio.sleep(0.1)
+        assert moisture_a.call_count == 1
+        assert moisture_d.call_count == 1
+
+
+async def test_coalescing_window_publishes_pump_reports_immediately(hass):
+    """Test that pump reports are published at once, along with any held back update."""
+    host = "192.168.1.100"
+    with patch("custom_components.growcube.coordinator.GrowcubeClient"):
+        coordinator = GrowcubeDataCoordinator(host, hass, {CONF_COALESCE_WINDOW: 250})
+        moisture_a = MagicMock()
+        pump_b = MagicMock()
+        coordinator.async_add_listener(moisture_a, field_mask("moisture", 0))
+        coordinator.async_add_listener(pump_b, field_mask("pump_open", 1))
+
+        coordinator.handle_report(MoistureHumidityStateGrowcubeReport("0@30@55@22"))
+        coordinator.handle_report(PumpOpenGrowcubeReport("1"))
+        assert pump_b.call_count == 1
+        assert moisture_a.call_count == 1
+        assert coordinator._flush_handle is None
+
+
+async def test_debug_logging_samples_moisture_reports(hass, caplog):
+    """Test that moisture reports are rate limited in the debug log, other reports are not."""
+    host = "192.168.1.100"
+    with patch("custom_components.growcube.coordinator.GrowcubeClient"):
+        coordinator = GrowcubeDataCoordinator(host, hass)
+        caplog.set_level(logging.DEBUG, logger="custom_components.growcube")
+
+        for moisture in range(30, 35):
+            coordinator.handle_report(MoistureHumidityStateGrowcubeReport(f"2@{moisture}@55@22"))
+        coordinator.handle_report(PumpOpenGrowcubeReport("1"))
+        coordinator.handle_report(PumpCloseGrowcubeReport("1"))
+
+        messages = [record.getMessage() for record in caplog.records]
+        assert sum("Sensor reading" in message for message in messages) == 1
+        assert sum("Pump" in message for message in messages) == 2
+        assert coordinator._report_log_suppressed == {MoistureHumidityStateGrowcubeReport: 4}
+
+
+async def test_debug_logging_per_device(hass, caplog):
+    """Test that debug logging can be enabled for a single device."""
+    # The integration logs at INFO, caplog restores the level afterwards
+    caplog.set_level(logging.DEBUG, logger="custom_components.growcube")
+    logging.getLogger("custom_components.growcube").setLevel(logging.INFO)
+    with patch("custom_components.growcube.coordinator.GrowcubeClient"):
+        debugged = GrowcubeDataCoordinator("192.168.1.100", hass, {CONF_DEBUG_LOGGING: True})
+        other = GrowcubeDataCoordinator("192.168.1.101", hass)
+
+        for moisture in range(30, 33):
+            debugged.handle_report(MoistureHumidityStateGrowcubeReport(f"2@{moisture}@55@22"))
+            other.handle_report(MoistureHumidityStateGrowcubeReport(f"2@{moisture}@55@22"))
+
+        loggers = [record.name for record in caplog.records if "Sensor reading" in record.getMessage()]
+        assert loggers == ["custom_components.growcube.coordinator.192_168_1_100"] * 3
+
+        debugged.disconnect()
+        assert not debugged.logger.isEnabledFor(logging.DEBUG)
+
+
+def test_growcube_data_evolve_shares_unchanged_fields():
+    """Test that evolve copies on write and packs the channel flags."""
+    data = GrowcubeData(moisture=(10, 20, 30, 40))
+    new = data.evolve(pump_open=data.pump_open.set(2, True))
+
+    assert new is not data
+    assert new.moisture is data.moisture
+    assert data.pump_open[2] is False
+    assert new.pump_open[2] is True
+    assert new.pump_open == 0b0100
+    assert isinstance(new.pump_open.set(2, False), ChannelFlags)
+    assert new.pump_open.set(2, False) == 0
+    with pytest.raises(AttributeError):
+        new.temperature = 20
+
+
+async def test_connect_completes_when_device_id_arrives(hass):
+    """Test that connect returns as soon as the device version report is handled."""
+    host = "192.168.1.100"
+    with patch("custom_components.growcube.coordinator.GrowcubeClient") as mock_client:
+        coordinator = GrowcubeDataCoordinator(host, hass)
+
+        async def _connect():
+            hass.loop.call_soon(coordinator.handle_report, DeviceVersionGrowcubeReport("3.6@12345"))
+            return True, ""
+
+        mock_client.return_value.connect = AsyncMock(side_effect=_connect)
+
+        assert await coordinator.connect() == (True, "")
+        assert coordinator.data.device_id == "growcube_3039"
+        assert coordinator.handshake_duration < 0.1
+        mock_client.return_value.send_command.assert_called_once()
+
+
+async def test_connect_times_out_without_device_id(hass):
+    """Test that connect fails when the device never reports its id."""
+    host = "192.168.1.100"
+    with patch("custom_components.growcube.coordinator.GrowcubeClient") as mock_client, \
+            patch("custom_components.growcube.coordinator.DEVICE_ID_TIMEOUT", 0.01):
+        coordinator = GrowcubeDataCoordinator(host, hass)
+        mock_client.return_value.connect = AsyncMock(return_value=(True, ""))
+
+        assert await coordinator.connect() == (False, "Timed out waiting for device ID")
+
+
+async def test_state_is_restored_as_stale_and_saved_debounced(hass, hass_storage):
+    """Test that the stored state is shown until the device reports, and written at most once a minute."""
+    hass_storage["growcube.entry_1"] = {
+        "version": 1,
+        "minor_version": 1,
+        "key": "growcube.entry_1",
+        "data": {"temperature": 22, "humidity": 55, "moisture": [40, None, None, None], "water_warning": True},
+    }
+    with patch("custom_components.growcube.coordinator.GrowcubeClient"):
+        coordinator = GrowcubeDataCoordinator("192.168.1.100", hass)
+        await coordinator.async_restore_state(snapshot_store(hass, "entry_1"))
+
+        assert coordinator.data.temperature == 22
+        assert coordinator.data.moisture == (40, None, None, None)
+        assert coordinator.data.water_warning
+        assert coordinator.is_stale("temperature")
+        assert coordinator.is_stale("moisture", 0)
+        assert not coordinator.is_stale("moisture", 1)
+
+        # The same temperature from the device is still published, it's live now
+        temperature_listener = MagicMock()
+        coordinator.async_add_listener(temperature_listener, field_mask("temperature"))
+        coordinator.handle_report(MoistureHumidityStateGrowcubeReport("0@31@55@22"))
+        coordinator.handle_report(MoistureHumidityStateGrowcubeReport("0@32@55@22"))
+        temperature_listener.assert_called_once()
+        assert not coordinator.is_stale("temperature")
+        assert not coordinator.is_stale("moisture", 0)
+        assert coordinator.is_stale("water_warning")
+
+        assert hass_storage["growcube.entry_1"]["data"]["moisture"][0] == 40
+        async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=61))
+        await hass.async_block_till_done()
+        assert hass_storage["growcube.entry_1"]["data"]["moisture"] == [32, None, None, None]
+
+
+async def test_offline_keeps_values_and_reconnect_publishes_the_diff(hass):
+    """Test that a lost connection only changes the availability, and flags not reported again are cleared."""
+    with patch("custom_components.growcube.coordinator.GrowcubeClient"), \
+            patch("custom_components.growcube.coordinator.CONNECT_SETTLE_TIME", 0.01):
+        coordinator = GrowcubeDataCoordinator("192.168.1.100", hass)
+        coordinator.data = coordinator.data.evolve(
+            temperature=22,
+            humidity=55,
+            moisture=(31, 32, None, None),
+            outlet_blocked=ChannelFlags(0b0101),
+        )
+        listeners = {
+            name: MagicMock() for name in ("temperature", "moisture_0", "moisture_1", "outlet_blocked_0")
+        }
+        coordinator.async_add_listener(listeners["temperature"], field_mask("temperature"))
+        coordinator.async_add_listener(listeners["moisture_0"], field_mask("moisture", 0))
+        coordinator.async_add_listener(listeners["moisture_1"], field_mask("moisture", 1))
+        coordinator.async_add_listener(listeners["outlet_blocked_0"], field_mask("outlet_blocked", 0))
+
+        await coordinator.on_disconnected("192.168.1.100")
+        assert not coordinator.last_update_success
+        assert coordinator.data.moisture == (31, 32, None, None)
+        assert not coordinator.is_stale("moisture", 1)
+        assert all(listener.call_count == 1 for listener in listeners.values())
+
+        await coordinator.on_connected("192.168.1.100")
+        assert coordinator.last_update_success
+        assert all(listener.call_count == 2 for listener in listeners.values())
+
+        # Channel A is still blocked, channel C is not reported again
+        coordinator.handle_report(CheckOutletBlockedGrowcubeReport("0@1"))
+        coordinator.handle_report(MoistureHumidityStateGrowcubeReport("1@35@55@22"))
+        await asyncio.sleep(0.02)
+
+        assert listeners["moisture_0"].call_count == 2
+        assert listeners["moisture_1"].call_count == 3
+        assert coordinator.data.outlet_blocked == ChannelFlags(0b0001)
+        assert listeners["outlet_blocked_0"].call_count == 2
+        coordinator.disconnect()
+
+
+async def test_reconnect_reporting_the_same_values_updates_nothing(hass):
+    """Test that the values kept over a lost connection aren't published again when the device reports them."""
+    with patch("custom_components.growcube.coordinator.GrowcubeClient"), \
+            patch("custom_components.growcube.coordinator.CONNECT_SETTLE_TIME", 0.01):
+        coordinator = GrowcubeDataCoordinator("192.168.1.100", hass)
+        coordinator.handle_report(MoistureHumidityStateGrowcubeReport("0@31@55@22"))
+        coordinator.handle_report(CheckOutletBlockedGrowcubeReport("1@1"))
+        await coordinator.on_disconnected("192.168.1.100")
+        await coordinator.on_connected("192.168.1.100")
+
+        listener = MagicMock()
+        coordinator.async_add_listener(listener)
+        coordinator.handle_report(MoistureHumidityStateGrowcubeReport("0@31@55@22"))
+        coordinator.handle_report(CheckOutletBlockedGrowcubeReport("1@1"))
+        listener.assert_not_called()
+        assert not coordinator.is_stale("temperature")
+
+        # Reported again, so the flag isn't cleared once the connection has settled
+        await asyncio.sleep(0.02)
+        assert coordinator.data.outlet_blocked[1]
+        listener.assert_not_called()
+        coordinator.disconnect()
+
+
+async def test_pump_runtime_is_counted_and_saved(hass, hass_storage):
+    """Test that the time between pump open and close reports adds up per channel, and is stored."""
+    hass_storage["growcube.entry_1"] = {
+        "version": 1,
+        "minor_version": 1,
+        "key": "growcube.entry_1",
+        "data": {"moisture": [None, None, None, None], "pump_seconds": [5.0, 0.0, 0.0, 0.0]},
+    }
+    with patch("custom_components.growcube.coordinator.GrowcubeClient"), \
+            patch("custom_components.growcube.coordinator.time", wraps=time) as mock_time:
+        coordinator = GrowcubeDataCoordinator("192.168.1.100", hass)
+        await coordinator.async_restore_state(snapshot_store(hass, "entry_1"))
+
+        mock_time.monotonic.return_value = 100
+        coordinator.handle_report(PumpOpenGrowcubeReport("1"))
+        mock_time.monotonic.return_value = 112.5
+        coordinator.handle_report(PumpCloseGrowcubeReport("1"))
+        # A close without an open adds nothing
+        coordinator.handle_report(PumpCloseGrowcubeReport("2"))
+        assert coordinator.pump_runtime.seconds == [5.0, 12.5, 0.0, 0.0]
+
+        # A pump open when the connection is lost is counted until then
+        mock_time.monotonic.return_value = 200
+        coordinator.handle_report(PumpOpenGrowcubeReport("0"))
+        mock_time.monotonic.return_value = 210
+        await coordinator.on_disconnected("192.168.1.100")
+        assert coordinator.pump_runtime.seconds == [15.0, 12.5, 0.0, 0.0]
+
+        coordinator.disconnect()
+        await coordinator.async_save_state()
+        assert hass_storage["growcube.entry_1"]["data"]["pump_seconds"] == [15.0, 12.5, 0.0, 0.0]
+
+
+async def test_controlled_watering_runs_on_moisture_reports(hass, hass_storage):
+    """Test the hysteresis, interval and daily maximum of the controlled watering, and that it's stored."""
+    with patch("custom_components.growcube.coordinator.GrowcubeClient"), \
+            patch("custom_components.growcube.coordinator.time", wraps=time) as mock_time:
+        coordinator = GrowcubeDataCoordinator("192.168.1.100", hass)
+        await coordinator.async_restore_state(snapshot_store(hass, "entry_1"))
+        coordinator._water = AsyncMock()
+        coordinator.controller._water = coordinator._water
+        coordinator.handle_set_controlled_watering(Channel.Channel_A, ControllerSettings(
+            min_moisture=20, max_moisture=30, duration=10, min_interval=600, max_daily=25))
+
+        async def report(now: float, moisture: int) -> None:
+            mock_time.time.return_value = now
+            coordinator.handle_report(MoistureHumidityStateGrowcubeReport(f"0@{moisture}@55@22"))
+            await hass.async_block_till_done()
+
+        start = dt_util.start_of_local_day().timestamp() + 3600
+        await report(start, 25)
+        coordinator._water.assert_not_called()
+        await report(start + 60, 19)
+        coordinator._water.assert_awaited_once_with(Channel.Channel_A, 10)
+        # Between the levels, watering goes on after the minimum interval
+        await report(start + 300, 24)
+        assert coordinator._water.await_count == 1
+        await report(start + 700, 24)
+        assert coordinator._water.await_count == 2
+        # The rest of the daily maximum
+        await report(start + 1400, 24)
+        coordinator._water.assert_awaited_with(Channel.Channel_A, 5)
+        await report(start + 2100, 24)
+        assert coordinator._water.await_count == 3
+        # Reaching the maximum ends it until the moisture drops below the minimum again
+        await report(start + 86400, 30)
+        await report(start + 87000, 25)
+        assert coordinator._water.await_count == 3
+        await report(start + 87600, 15)
+        assert coordinator._water.await_count == 4
+
+        await coordinator.async_save_state()
+        stored = hass_storage["growcube.entry_1"]["data"]["controller"]
+        assert stored["settings"][0]["max_daily"] == 25
+        assert stored["dosed"] == [10, 0, 0, 0]
+        coordinator.disconnect()
+
+
+async def test_watering_modes_are_applied_only_when_changed(hass, hass_storage):
+    """Test that a watering mode the channel has applied already isn't sent again, also after a restart."""
+    with patch("custom_components.growcube.coordinator.GrowcubeClient"):
+        coordinator = GrowcubeDataCoordinator("192.168.1.100", hass)
+        await coordinator.async_restore_state(snapshot_store(hass, "entry_1"))
+        coordinator.commands.async_send = AsyncMock(return_value=0.1)
+
+        smart = ("smart", True, 20, 40)
+        assert await coordinator.handle_apply_watering_mode(Channel.Channel_B, smart) == 0.1
+        assert await coordinator.handle_apply_watering_mode(Channel.Channel_B, smart) is None
+        assert coordinator.commands.async_send.await_count == 1
+        assert await coordinator.handle_apply_watering_mode(Channel.Channel_B, smart, force=True) == 0.1
+        # Other services update the last applied mode too
+        await coordinator.handle_delete_watering(Channel.Channel_B)
+        assert coordinator.watering_modes[1] == ("off",)
+        assert await coordinator.handle_apply_watering_mode(Channel.Channel_B, ("off",)) is None
+
+        # A failed command leaves the mode unknown
+        coordinator.commands.async_send.side_effect = HomeAssistantError("Timeout")
+        with pytest.raises(HomeAssistantError):
+            await coordinator.handle_apply_watering_mode(Channel.Channel_C, ("scheduled", 6, 3))
+        assert coordinator.watering_modes[2] is None
+        await coordinator.async_save_state()
+        coordinator.disconnect()
+
+        restored = GrowcubeDataCoordinator("192.168.1.100", hass)
+        await restored.async_restore_state(snapshot_store(hass, "entry_1"))
+        assert restored.watering_modes == [None, ("off",), None, None]
+
+
+async def test_deadband_and_publish_intervals(hass):
+    """Test that small or frequent changes of the readings are held back, other fields aren't."""
+    options = {
+        CONF_MOISTURE_DEADBAND: 1,
+        CONF_MIN_PUBLISH_INTERVAL: 0.05,
+        CONF_DEADBAND_OVERRIDE_INTERVAL: 0.2,
+    }
+    with patch("custom_components.growcube.coordinator.GrowcubeClient"):
+        coordinator = GrowcubeDataCoordinator("192.168.1.100", hass, options)
+        listener = MagicMock()
+        coordinator.async_add_listener(listener, field_mask("moisture", 0))
+
+        coordinator.handle_report(MoistureHumidityStateGrowcubeReport("0@40@55@22"))
+        # Within the minimum interval
+        coordinator.handle_report(MoistureHumidityStateGrowcubeReport("0@45@55@22"))
+        assert coordinator.data.moisture[0] == 40
+        await asyncio.sleep(0.06)
+        # Within the deadband
+        coordinator.handle_report(MoistureHumidityStateGrowcubeReport("0@41@55@22"))
+        assert coordinator.data.moisture[0] == 40
+        coordinator.handle_report(MoistureHumidityStateGrowcubeReport("0@42@55@22"))
+        assert coordinator.data.moisture[0] == 42
+        assert listener.call_count == 2
+
+        # Within the deadband, but the shown value is older than the maximum interval
+        await asyncio.sleep(0.21)
+        coordinator.handle_report(MoistureHumidityStateGrowcubeReport("0@41@55@22"))
+        assert coordinator.data.moisture[0] == 41
+        assert coordinator.stats.values_suppressed == 2
+
+        # Flags have no limits
+        coordinator.handle_report(CheckOutletBlockedGrowcubeReport("0@1"))
+        coordinator.handle_report(PumpOpenGrowcubeReport("0"))
+        assert coordinator.data.outlet_blocked[0] and coordinator.data.pump_open[0]
+
+
+async def test_first_reading_is_published_whatever_the_loop_clock(hass):
+    """Test that the first reading of a limited sensor isn't held back by the intervals."""
+    options = {CONF_MIN_PUBLISH_INTERVAL: 600, CONF_DEADBAND_OVERRIDE_INTERVAL: 60}
+    with patch("custom_components.growcube.coordinator.GrowcubeClient"), \
+            patch.object(hass.loop, "time", return_value=5.0):
+        coordinator = GrowcubeDataCoordinator("192.168.1.100", hass, options)
+        coordinator.handle_report(MoistureHumidityStateGrowcubeReport("0@40@55@22"))
+        assert coordinator.data.moisture[0] == 40
+        assert coordinator.data.temperature == 22
+        assert coordinator.stats.values_suppressed == 0
+
+
+async def test_unload_closes_the_pump_of_a_dose_in_progress(hass):
+    """Test that a controlled watering dose cancelled while the pump is open still closes the pump."""
+    with patch("custom_components.growcube.coordinator.GrowcubeClient"):
+        coordinator = GrowcubeDataCoordinator("192.168.1.100", hass)
+        coordinator.client.send_command = MagicMock(return_value=True)
+        coordinator.handle_set_controlled_watering(Channel.Channel_B, ControllerSettings(
+            min_moisture=20, max_moisture=30, duration=60, min_interval=600, max_daily=120))
+
+        coordinator.handle_report(MoistureHumidityStateGrowcubeReport("1@15@55@22"))
+        await asyncio.sleep(0)
+        coordinator.handle_report(PumpOpenGrowcubeReport("1"))
+        await asyncio.sleep(0)
+        (task,) = coordinator.controller._tasks.values()
+        sent = [command for (command,), _ in coordinator.client.send_command.call_args_list]
+        assert [(command.channel, command.state) for command in sent] == [(Channel.Channel_B, True)]
+
+        coordinator.disconnect()
+        await asyncio.wait([task])
+        command = coordinator.client.send_command.call_args.args[0]
+        assert (command.channel, command.state) == (Channel.Channel_B, False)
+        coordinator.client.disconnect.assert_called_once()
@@ -0,0 +1,70 @@
+"""Tests for the Growcube device index."""
+from unittest.mock import MagicMock, patch
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import device_registry as dr
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.growcube.const import DOMAIN
+from custom_components.growcube.device_index import async_get_device_index
+
+
+def _coordinator(growcube_id: str) -> MagicMock:
+    coordinator = MagicMock()
+    coordinator.data.device_id = growcube_id
+    return coordinator
+
+
+def _register_device(hass: HomeAssistant, growcube_id: str) -> str:
+    entry = MockConfigEntry(domain=DOMAIN)
+    entry.add_to_hass(hass)
+    device = dr.async_get(hass).async_get_or_create(
+        config_entry_id=entry.entry_id,
+        identifiers={(DOMAIN, growcube_id)},
+    )
+    return device.id
+
+
+async def test_lookup_by_device_registry_id(hass: HomeAssistant):
+    """Test that coordinators are found by their device registry id."""
+    index = async_get_device_index(hass)
+    device_id = _register_device(hass, "growcube_1")
+    coordinator = _coordinator("growcube_1")
+    other = _coordinator("growcube_2")
+    index.async_update(coordinator)
+    index.async_update(other)
+
+    assert index.async_get(device_id) is coordinator
+    assert index.async_get("unknown_device") is None
+
+
+async def test_device_id_change_and_removal(hass: HomeAssistant):
+    """Test that the index follows device id changes and removals."""
+    index = async_get_device_index(hass)
+    old_device_id = _register_device(hass, "growcube_1")
+    new_device_id = _register_device(hass, "growcube_2")
+    coordinator = _coordinator("growcube_1")
+    index.async_update(coordinator)
+    assert index.async_get(old_device_id) is coordinator
+
+    coordinator.data.device_id = "growcube_2"
+    index.async_update(coordinator)
+    assert index.async_get(old_device_id) is None
+    assert index.async_get(new_device_id) is coordinator
+
+    index.async_remove(coordinator)
+    assert index.async_get(new_device_id) is None
+    assert len(index) == 0
+
+
+async def test_update_without_device_registry(hass: HomeAssistant):
+    """Test that adding a coordinator doesn't need the device registry to be loaded."""
+    index = async_get_device_index(hass)
+    coordinator = _coordinator("growcube_1")
+    with patch.dict(hass.data):
+        del hass.data[dr.DATA_REGISTRY]
+        index.async_update(coordinator)
+    assert len(index) == 1
+
+    device_id = _register_device(hass, "growcube_1")
+    assert index.async_get(device_id) is coordinator
@@ -0,0 +1,28 @@
+"""Tests for the Growcube diagnostics."""
+from unittest.mock import patch
+
+from homeassistant.const import CONF_HOST
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from growcube_client import MoistureHumidityStateGrowcubeReport
+
+from custom_components.growcube.const import DOMAIN
+from custom_components.growcube.coordinator import GrowcubeDataCoordinator
+from custom_components.growcube.diagnostics import async_get_config_entry_diagnostics
+
+
+async def test_config_entry_diagnostics(hass):
+    """Test that diagnostics include the stats and redact the host."""
+    entry = MockConfigEntry(domain=DOMAIN, data={CONF_HOST: "192.168.1.100"}, unique_id="growcube_3039")
+    entry.add_to_hass(hass)
+    with patch("custom_components.growcube.coordinator.GrowcubeClient"):
+        coordinator = GrowcubeDataCoordinator("192.168.1.100", hass)
+    hass.data[DOMAIN] = {entry.entry_id: coordinator}
+    coordinator.handle_report(MoistureHumidityStateGrowcubeReport("2@31@55@22"))
+
+    diagnostics = await async_get_config_entry_diagnostics(hass, entry)
+
+    assert diagnostics["entry"]["data"][CONF_HOST] == "**REDACTED**"
+    assert diagnostics["data"]["moisture"] == [None, None, 31, None]
+    assert diagnostics["stats"]["reports_total"] == 1
+    assert diagnostics["stats"]["state_writes"] == 1
@@ -0,0 +1,78 @@
+"""Tests for finding Growcube devices on the network."""
+import asyncio
+import socket
+from ipaddress import ip_network
+from unittest.mock import patch, AsyncMock
+
+from tests.simulator import GrowcubeSimulator
+from custom_components.growcube.discovery import DiscoveryProber, async_scan_network
+
+
+def _closed_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def test_probe_results_are_cached_per_mac(hass, socket_enabled):
+    """Test that a Growcube is identified once, and a closed port skips the handshake."""
+    simulator = GrowcubeSimulator(device_id=12345)
+    await simulator.start()
+    try:
+        prober = DiscoveryProber(hass, port=simulator.port)
+        assert await prober.async_probe("aa:bb:cc:dd:ee:01", simulator.host) == "12345"
+
+        with patch("custom_components.growcube.coordinator.GrowcubeDataCoordinator.get_device_id",
+                   AsyncMock()) as get_device_id:
+            assert await prober.async_probe("aa:bb:cc:dd:ee:01", simulator.host) == "12345"
+
+            closed = DiscoveryProber(hass, port=_closed_port())
+            assert await closed.async_probe("aa:bb:cc:dd:ee:02", "127.0.0.1") is None
+            get_device_id.assert_not_called()
+    finally:
+        await simulator.stop()
+
+
+async def test_probes_are_shared_and_capped(hass):
+    """Test that probes of one MAC share an attempt, and no more than max_concurrent run at once."""
+    prober = DiscoveryProber(hass, max_concurrent=2, negative_ttl=0)
+    running = 0
+    peak = 0
+    calls = []
+
+    async def _identify(host):
+        nonlocal running, peak
+        calls.append(host)
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return None
+
+    with patch.object(prober, "_async_identify", side_effect=_identify):
+        await asyncio.gather(*(prober.async_probe("aa:bb:cc:dd:ee:01", "10.0.0.1") for _ in range(3)))
+        assert calls == ["10.0.0.1"]
+
+        await asyncio.gather(*(prober.async_probe(f"aa:bb:cc:dd:ee:{index:02x}", f"10.0.0.{index}")
+                               for index in range(2, 8)))
+        assert len(calls) == 7
+        assert peak == 2
+
+        # Expired results are probed again
+        await prober.async_probe("aa:bb:cc:dd:ee:01", "10.0.0.1")
+        assert len(calls) == 8
+
+
+
+async def test_scan_finds_growcubes_in_network(hass, socket_enabled):
+    """Test that a scan identifies the devices on the Growcube port and skips the given hosts."""
+    simulator = GrowcubeSimulator(device_id=12345)
+    await simulator.start()
+    try:
+        # Only the loopback address can be connected to in the tests
+        network = ip_network("127.0.0.1/32")
+        assert await async_scan_network(network, port=simulator.port) == {"127.0.0.1": "12345"}
+        assert await async_scan_network(network, skip={"127.0.0.1"}, port=simulator.port) == {}
+        assert await async_scan_network(network, port=_closed_port()) == {}
+    finally:
+        await simulator.stop()
@@ -0,0 +1,75 @@
+"""Tests for the Growcube sensor history."""
+from custom_components.growcube.history import DeviceHistory, RingBuffer, SeriesHistory
+
+
+def test_ring_buffer_wraps_and_queries_ranges():
+    """Test that the ring buffer keeps the newest values and finds ranges."""
+    ring = RingBuffer(4)
+    assert ring.oldest is None
+    assert ring.range(0, 100) == []
+
+    for timestamp in range(10, 70, 10):
+        ring.append(timestamp, timestamp // 10)
+
+    assert len(ring) == 4
+    assert ring.oldest == 30
+    assert ring.range(0, 100) == [(30, 3), (40, 4), (50, 5), (60, 6)]
+    assert ring.range(35, 50) == [(40, 4), (50, 5)]
+    assert ring.range(61, 100) == []
+
+
+def test_series_history_downsamples_into_tiers():
+    """Test that older ranges are answered from the tier holding the period means."""
+    series = SeriesHistory(tiers=((0, 5), (60, 10)))
+    # One reading every 10 seconds for 3 minutes, the value is the minute
+    for timestamp in range(0, 180, 10):
+        series.add(1000020 + timestamp, timestamp // 60 * 10 + 0.5)
+
+    # The raw tier only reaches back 50 seconds
+    resolution, samples = series.query(1000150, 1000200)
+    assert resolution == 0
+    assert samples == [[1000150, 20.5], [1000160, 20.5], [1000170, 20.5], [1000180, 20.5], [1000190, 20.5]]
+
+    resolution, samples = series.query(1000000, 1000200)
+    assert resolution == 60
+    # Minute buckets, the last one still being averaged
+    assert [timestamp for timestamp, _ in samples] == [1000020, 1000080, 1000140]
+    assert samples[0][1] == 0.5
+
+
+def test_device_history_query_by_series():
+    """Test that a moisture report feeds its channel, temperature and humidity."""
+    history = DeviceHistory()
+    history.add_reading(1000, 2, 31, 55, 22)
+    history.add_reading(1060, 2, 30, 56, 22)
+
+    result = history.query(900, 1100, ["moisture_c", "moisture_a", "humidity"])
+    assert result["moisture_c"] == {"resolution": 0, "samples": [[1000, 31.0], [1060, 30.0]]}
+    assert result["moisture_a"]["samples"] == []
+    assert result["humidity"]["samples"] == [[1000, 55.0], [1060, 56.0]]
+
+
+
+def test_device_history_keeps_temperature_and_humidity_once_a_minute():
+    """Test that the temperature and humidity repeated by every report are kept evenly spaced."""
+    history = DeviceHistory()
+    for timestamp in range(1000, 1200, 10):
+        history.add_reading(timestamp, timestamp // 10 % 4, 30, 55, 22 + (timestamp - 1000) // 100)
+
+    result = history.query(900, 1300)
+    assert result["humidity"]["samples"] == [[1000, 55.0], [1060, 55.0], [1120, 55.0], [1180, 55.0]]
+    assert result["temperature"]["samples"] == [[1000, 22.0], [1060, 22.0], [1120, 23.0], [1180, 23.0]]
+    assert len(result["moisture_a"]["samples"]) == 5
+
+
+def test_device_history_keeps_temperature_and_humidity_of_any_channel():
+    """Test that the temperature and humidity are kept when only a later channel keeps reporting."""
+    history = DeviceHistory()
+    for channel in range(4):
+        history.add_reading(1000 + channel, channel, 30, 55, 22)
+    # The sensors of the other channels are unplugged
+    for timestamp in range(1030, 1300, 30):
+        history.add_reading(timestamp, 2, 30, 55, 22)
+
+    samples = history.query(900, 1300)["temperature"]["samples"]
+    assert [timestamp for timestamp, _ in samples] == [1000, 1060, 1120, 1180, 1240]
@@ -0,0 +1,86 @@
+"""Tests for the Growcube integration setup."""
+import asyncio
+from unittest.mock import patch, AsyncMock
+
+import pytest
+from homeassistant.const import CONF_HOST
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import ConfigEntryNotReady
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.growcube import async_setup_entry
+from custom_components.growcube.const import DOMAIN, CONF_WAIT_FOR_DEVICE
+from custom_components.growcube.reconnect import async_get_reconnect_scheduler
+
+
+@pytest.fixture
+def unreachable_client():
+    """Mock a GrowcubeClient whose connection attempts never complete."""
+    async def _connect():
+        await asyncio.sleep(3600)
+        return False, "unreachable"
+
+    with patch("custom_components.growcube.coordinator.GrowcubeClient") as mock_client:
+        client = mock_client.return_value
+        client.connect = AsyncMock(side_effect=_connect)
+        client.connected = False
+        yield client
+
+
+@pytest.fixture
+def mock_forward_entry_setups(hass: HomeAssistant):
+    """Mock forwarding the entry to the platforms."""
+    with patch.object(hass.config_entries, "async_forward_entry_setups", AsyncMock()) as mock_forward:
+        yield mock_forward
+
+
+async def test_setup_does_not_wait_for_device(hass: HomeAssistant, unreachable_client, mock_forward_entry_setups):
+    """Test that the entities are set up from the stored device id while the device is offline."""
+    entry = MockConfigEntry(domain=DOMAIN, unique_id="12345", data={CONF_HOST: "192.168.1.100"})
+    entry.add_to_hass(hass)
+
+    async with asyncio.timeout(1):
+        assert await async_setup_entry(hass, entry)
+    await asyncio.sleep(0)
+
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    assert coordinator.data.device_id == "growcube_3039"
+    assert coordinator.data.device_info is not None
+    mock_forward_entry_setups.assert_called_once()
+    unreachable_client.connect.assert_called_once()
+
+    # Unloading cancels the pending connection attempt
+    await entry._async_process_on_unload(hass)
+
+
+async def test_setup_waits_for_device_when_configured(hass: HomeAssistant, unreachable_client,
+                                                      mock_forward_entry_setups):
+    """Test that the setup is retried later when waiting for an unreachable device."""
+    unreachable_client.connect = AsyncMock(return_value=(False, "refused"))
+    entry = MockConfigEntry(domain=DOMAIN, unique_id="12345", data={CONF_HOST: "192.168.1.100"},
+                            options={CONF_WAIT_FOR_DEVICE: True})
+    entry.add_to_hass(hass)
+
+    with pytest.raises(ConfigEntryNotReady, match="refused"):
+        await async_setup_entry(hass, entry)
+    mock_forward_entry_setups.assert_not_called()
+
+
+async def test_failed_handshake_closes_the_connection(hass: HomeAssistant, mock_forward_entry_setups):
+    """Test that a device that connects but doesn't send its id is disconnected, and not reconnected."""
+    entry = MockConfigEntry(domain=DOMAIN, unique_id="12345", data={CONF_HOST: "192.168.1.100"},
+                            options={CONF_WAIT_FOR_DEVICE: True})
+    entry.add_to_hass(hass)
+
+    with patch("custom_components.growcube.coordinator.GrowcubeClient") as mock_client, \
+            patch("custom_components.growcube.coordinator.DEVICE_ID_TIMEOUT", 0.01):
+        client = mock_client.return_value
+        client.connect = AsyncMock(return_value=(True, ""))
+        with pytest.raises(ConfigEntryNotReady, match="Timed out waiting for device ID"):
+            await async_setup_entry(hass, entry)
+        client.disconnect.assert_called_once()
+
+        # The connection dropping afterwards doesn't start reconnecting
+        on_disconnected = mock_client.call_args.kwargs["on_disconnected_callback"]
+        await on_disconnected("192.168.1.100")
+        assert len(async_get_reconnect_scheduler(hass)) == 0
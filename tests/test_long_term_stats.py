@@ -0,0 +1,109 @@
+"""Tests for the Growcube long-term statistics."""
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from custom_components.growcube.coordinator import GrowcubeDataCoordinator
+from custom_components.growcube.long_term_stats import DeviceStatistics, StatisticsImporter
+
+HOUR = 1700000000 - 1700000000 % 3600
+
+
+def test_readings_are_aggregated_per_hour():
+    """Test that each series gets the mean, min and max of its hour, and hours that are over are pending."""
+    statistics = DeviceStatistics()
+    statistics.add_reading(HOUR + 10, 0, 30, 50, 20)
+    statistics.add_reading(HOUR + 20, 0, 34, 52, 21)
+    statistics.add_reading(HOUR + 30, 1, 60, 54, 22)
+    assert statistics.pending == {}
+
+    # A new hour closes the running one of the series
+    statistics.add_reading(HOUR + 3610, 0, 28, 50, 20)
+    assert statistics.pending["moisture_a"] == [[HOUR, 2, 64.0, 30, 34]]
+    assert statistics.pending["humidity"] == [[HOUR, 3, 156.0, 50, 54]]
+    assert "moisture_b" not in statistics.pending
+
+    statistics.close_hours(HOUR + 7200)
+    assert statistics.pending["moisture_b"] == [[HOUR, 1, 60.0, 60, 60]]
+    assert statistics.pending["moisture_a"][1] == [HOUR + 3600, 1, 28.0, 28, 28]
+
+
+def test_statistics_are_restored():
+    """Test that the running and pending hours continue after a restart."""
+    statistics = DeviceStatistics()
+    statistics.add_reading(HOUR + 10, 2, 40, 50, 20)
+    statistics.add_reading(HOUR + 3610, 2, 42, 50, 20)
+
+    restored = DeviceStatistics()
+    restored.restore(statistics.as_dict())
+    restored.add_reading(HOUR + 3620, 2, 44, 50, 20)
+    restored.close_hours(HOUR + 7200)
+    assert restored.pending["moisture_c"] == [[HOUR, 1, 40.0, 40, 40], [HOUR + 3600, 2, 86.0, 42, 44]]
+
+
+async def test_importer_backfills_pending_hours(hass: HomeAssistant):
+    """Test that the hours are imported once the recorder runs, and only once."""
+    add_statistics = MagicMock()
+    recording = MagicMock(return_value=False)
+    importer = StatisticsImporter(hass, add_statistics, recording)
+    with patch("custom_components.growcube.coordinator.GrowcubeClient"):
+        coordinator = GrowcubeDataCoordinator("192.168.1.100", hass)
+    coordinator.set_device_id("12345")
+    coordinator.statistics.add_reading(HOUR + 10, 0, 30, 50, 20)
+    coordinator.statistics.add_reading(HOUR + 3610, 0, 34, 50, 20)
+
+    # Kept while the recorder isn't running
+    assert importer.async_import(coordinator) == 0
+    add_statistics.assert_not_called()
+
+    recording.return_value = True
+    assert importer.async_import(coordinator) == 6
+    metadata, rows = next(
+        (call.args[1], call.args[2]) for call in add_statistics.call_args_list
+        if call.args[1]["statistic_id"] == "growcube:growcube_3039_moisture_a"
+    )
+    assert metadata["name"] == "GrowCube 3039 Moisture A"
+    assert metadata["has_mean"] and not metadata["has_sum"]
+    assert rows == [
+        {"start": dt_util.utc_from_timestamp(HOUR), "mean": 30.0, "min": 30, "max": 30},
+        {"start": dt_util.utc_from_timestamp(HOUR + 3600), "mean": 34.0, "min": 34, "max": 34},
+    ]
+
+    add_statistics.reset_mock()
+    assert importer.async_import(coordinator) == 0
+    add_statistics.assert_not_called()
+
+
+async def test_importer_keeps_the_hours_the_recorder_did_not_take(hass: HomeAssistant):
+    """Test that hours are only dropped once queued, and restored ones are imported on registering."""
+    add_statistics = MagicMock(side_effect=[None, RuntimeError("Recorder stopped")])
+    importer = StatisticsImporter(hass, add_statistics, MagicMock(return_value=True))
+    with patch("custom_components.growcube.coordinator.GrowcubeClient"):
+        coordinator = GrowcubeDataCoordinator("192.168.1.100", hass)
+    coordinator.set_device_id("12345")
+    coordinator.statistics.restore({"pending": {
+        "moisture_a": [[HOUR, 1, 30.0, 30, 30]],
+        "moisture_b": [[HOUR, 1, 40.0, 40, 40]],
+    }})
+
+    with pytest.raises(RuntimeError):
+        importer.register(coordinator)
+    assert add_statistics.call_count == 2
+    assert list(coordinator.statistics.pending) == ["moisture_b"]
+    importer.unregister(coordinator)
+
+
+async def test_importer_timer_runs_while_devices_are_registered(hass: HomeAssistant):
+    """Test that one timer serves all devices and stops with the last one."""
+    importer = StatisticsImporter(hass, MagicMock())
+    first, second = MagicMock(), MagicMock()
+    importer.register(first)
+    importer.register(second)
+    assert len(importer) == 2
+    importer.unregister(first)
+    assert importer._unsub is not None
+    importer.unregister(second)
+    assert importer._unsub is None
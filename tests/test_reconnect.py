@@ -0,0 +1,157 @@
+"""Tests for the Growcube reconnect scheduler."""
+import asyncio
+from unittest.mock import AsyncMock
+
+from homeassistant.core import HomeAssistant
+
+from tests.simulator import GrowcubeSimulator
+from custom_components.growcube.const import DATA_RECONNECT_SCHEDULER
+from custom_components.growcube.coordinator import GrowcubeDataCoordinator
+from custom_components.growcube.reconnect import ReconnectScheduler, async_get_reconnect_scheduler
+
+
+async def test_scheduler_is_shared(hass: HomeAssistant):
+    """Test that all coordinators use the same scheduler."""
+    scheduler = async_get_reconnect_scheduler(hass)
+    assert hass.data[DATA_RECONNECT_SCHEDULER] is scheduler
+    assert async_get_reconnect_scheduler(hass) is scheduler
+
+
+async def test_backoff_grows_with_jitter(hass: HomeAssistant):
+    """Test that the delay doubles per attempt, stays jittered and is capped."""
+    scheduler = ReconnectScheduler(hass, base_delay=10, max_delay=300)
+    for attempts, ceiling in [(0, 10), (1, 20), (2, 40), (10, 300)]:
+        delays = {scheduler.next_delay(attempts) for _ in range(20)}
+        assert all(ceiling / 2 <= delay <= ceiling for delay in delays)
+        assert len(delays) > 1
+
+
+async def test_failed_attempts_back_off_until_success(hass: HomeAssistant, create_coordinator):
+    """Test that failures count up and a success resets the state."""
+    scheduler = ReconnectScheduler(hass, base_delay=0.01, max_delay=0.02)
+    coordinator = create_coordinator("192.168.1.100")
+    coordinator.client.connect = AsyncMock(side_effect=[(False, "refused"), (False, "refused"), (True, "")])
+
+    scheduler.schedule(coordinator)
+    assert coordinator.reconnect_state.next_attempt is not None
+
+    # Scheduling again while pending is a no-op
+    scheduler.schedule(coordinator)
+
+    for _ in range(50):
+        await asyncio.sleep(0.01)
+        if coordinator.client.connect.call_count == 3 and not coordinator.reconnect_state.in_flight:
+            break
+
+    assert coordinator.client.connect.call_count == 3
+    assert coordinator.reconnect_state.attempts == 0
+    assert coordinator.reconnect_state.next_attempt is None
+
+
+async def test_concurrent_attempts_are_capped(hass: HomeAssistant, create_coordinator):
+    """Test that no more than max_concurrent connection attempts run at once."""
+    scheduler = ReconnectScheduler(hass, base_delay=0, max_concurrent=2)
+    in_flight = 0
+    peak = 0
+
+    async def _connect():
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return True, ""
+
+    coordinators = [create_coordinator(f"10.0.0.{index}") for index in range(10)]
+    for coordinator in coordinators:
+        coordinator.client.connect = AsyncMock(side_effect=_connect)
+        scheduler.schedule(coordinator)
+
+    await hass.async_block_till_done()
+    await asyncio.sleep(0.1)
+
+    assert all(coordinator.client.connect.call_count == 1 for coordinator in coordinators)
+    assert peak == 2
+
+
+async def test_disconnect_cancels_pending_attempt(hass: HomeAssistant, create_coordinator):
+    """Test that an unloaded coordinator does not reconnect."""
+    coordinator = create_coordinator("192.168.1.100")
+    coordinator.client.connect = AsyncMock(return_value=(True, ""))
+    scheduler = async_get_reconnect_scheduler(hass)
+
+    scheduler.schedule(coordinator)
+    coordinator.disconnect()
+    await asyncio.sleep(0)
+
+    assert coordinator.reconnect_state.next_attempt is None
+    coordinator.client.connect.assert_not_called()
+
+
+async def test_disconnect_closes_connection_made_while_unloading(hass: HomeAssistant, create_coordinator):
+    """Test that a connection completing after the unload is closed instead of kept."""
+    coordinator = create_coordinator("192.168.1.100")
+    connecting = asyncio.Event()
+
+    async def _connect():
+        connecting.set()
+        await asyncio.sleep(0.01)
+        return True, ""
+
+    coordinator.client.connect = AsyncMock(side_effect=_connect)
+    scheduler = ReconnectScheduler(hass, base_delay=0)
+    scheduler.schedule(coordinator)
+    await connecting.wait()
+
+    # The scheduler is only cancelled here, the attempt sees the unload when the connect returns
+    coordinator.shutting_down = True
+    await asyncio.sleep(0.02)
+
+    coordinator.client.disconnect.assert_called_once()
+    assert len(scheduler) == 0
+
+
+async def test_no_tasks_or_sockets_leak_over_reconnect_cycles(hass: HomeAssistant, socket_enabled):
+    """Test 1000 dropped and restored connections to a simulated device, followed by an unload."""
+    scheduler = hass.data[DATA_RECONNECT_SCHEDULER] = ReconnectScheduler(hass, base_delay=0)
+    simulator = GrowcubeSimulator(device_id=12345)
+    await simulator.start()
+    try:
+        coordinator = GrowcubeDataCoordinator(simulator.host, hass)
+        coordinator.client.port = simulator.port
+        assert await coordinator.connect() == (True, "")
+        await hass.async_block_till_done()
+        tasks = len(asyncio.all_tasks())
+
+        for cycle in range(1000):
+            if cycle % 2:
+                simulator.drop_connections()
+            else:
+                coordinator.reconnect()
+            async with asyncio.timeout(2):
+                while coordinator.client.connected:
+                    await asyncio.sleep(0)
+                while not (coordinator.client.connected and simulator.connections == 1 and len(scheduler) == 0):
+                    await asyncio.sleep(0)
+        await hass.async_block_till_done()
+
+        assert len(asyncio.all_tasks()) == tasks
+        # Every cycle opened one connection and closed the one before it
+        assert simulator.connections_accepted == 1001
+        assert simulator.connections_closed == 1000
+
+        # Unload while a reconnect is in flight
+        simulator.drop_connections()
+        async with asyncio.timeout(2):
+            while not coordinator.reconnect_state.in_flight:
+                await asyncio.sleep(0)
+        coordinator.disconnect()
+        await hass.async_block_till_done()
+        await asyncio.sleep(0.05)
+
+        assert len(scheduler) == 0
+        assert len(asyncio.all_tasks()) <= tasks
+        assert not coordinator.client.connected
+        assert simulator.connections == 0
+    finally:
+        await simulator.stop()
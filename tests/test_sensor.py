@@ -3,13 +3,15 @@ import pytest
 from unittest.mock import patch, MagicMock, call
 
 from homeassistant.const import PERCENTAGE, UnitOfTemperature, Platform
-from homeassistant.components.sensor import SensorDeviceClass
+from homeassistant.components.sensor import SensorDeviceClass, SensorStateClass
 
 from custom_components.growcube.const import DOMAIN, CHANNEL_ID, CHANNEL_NAME
 from custom_components.growcube.sensor import (
     TemperatureSensor,
     HumiditySensor,
     MoistureSensor,
+    PumpRuntimeSensor,
+    WaterSensor,
 )
 
 
@@ -93,3 +95,20 @@ async def test_moisture_sensor_update(hass, mock_growcube_client):
     # Test update with new value
     mock_coordinator.data.moisture[0] = 40
     assert moisture_sensor.native_value == 40
+
+
+async def test_pump_runtime_and_water_sensors(hass, mock_growcube_client):
+    """Test that the pump runtime is shown in seconds, and in litres from the flow rate."""
+    mock_coordinator = MagicMock()
+    mock_coordinator.data.device_id = "test_device_id"
+    mock_coordinator.pump_runtime.seconds = [0.0, 90.04, 0.0, 0.0]
+
+    runtime_sensor = PumpRuntimeSensor(mock_coordinator, 1)
+    water_sensor = WaterSensor(mock_coordinator, 1, 400)
+
+    assert runtime_sensor.unique_id == f"test_device_id_pump_runtime_{CHANNEL_ID[1]}"
+    assert runtime_sensor.state_class == SensorStateClass.TOTAL_INCREASING
+    assert runtime_sensor.native_value == 90.0
+    assert water_sensor.unique_id == f"test_device_id_water_{CHANNEL_ID[1]}"
+    assert water_sensor.device_class == SensorDeviceClass.WATER
+    assert water_sensor.native_value == 0.6
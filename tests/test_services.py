@@ -10,15 +10,34 @@ from custom_components.growcube.const import (
     SERVICE_SET_SMART_WATERING,
     SERVICE_SET_SCHEDULED_WATERING,
     SERVICE_DELETE_WATERING,
+    SERVICE_WATER_PLANT_BATCH,
+    SERVICE_SET_SMART_WATERING_BATCH,
+    SERVICE_SET_SCHEDULED_WATERING_BATCH,
+    SERVICE_DELETE_WATERING_BATCH,
     ARGS_CHANNEL,
+    ARGS_CHANNELS,
+    ARGS_MAX_PARALLEL,
     ARGS_DURATION,
     ARGS_MIN_MOISTURE,
     ARGS_MAX_MOISTURE,
     ARGS_ALL_DAY,
     ARGS_INTERVAL,
+    SERVICE_GET_HISTORY,
+    ARGS_START,
+    ARGS_END,
+    ARGS_SERIES,
+    SERVICE_SET_CONTROLLED_WATERING,
+    SERVICE_DELETE_CONTROLLED_WATERING,
+    ARGS_MIN_INTERVAL,
+    ARGS_MAX_DAILY,
+    SERVICE_APPLY_WATERING_MODE,
+    ARGS_MODE,
 )
+from custom_components.growcube.controller import ControllerSettings
 from custom_components.growcube.services import async_setup_services
 from custom_components.growcube.coordinator import GrowcubeDataCoordinator
+from custom_components.growcube.device_index import async_get_device_index
+from custom_components.growcube.history import DeviceHistory
 from growcube_client import Channel
 
 @pytest.fixture
@@ -28,13 +47,14 @@ def mock_coordinator(hass: HomeAssistant):
     coordinator.data = MagicMock()
     coordinator.data.device_id = "test_device_serial"
     
-    coordinator.handle_water_plant = AsyncMock()
-    coordinator.handle_set_smart_watering = AsyncMock()
-    coordinator.handle_set_manual_watering = AsyncMock()
-    coordinator.handle_delete_watering = AsyncMock()
+    coordinator.handle_water_plant = AsyncMock(return_value=0.1234)
+    coordinator.handle_set_smart_watering = AsyncMock(return_value=0.1234)
+    coordinator.handle_set_manual_watering = AsyncMock(return_value=0.1234)
+    coordinator.handle_delete_watering = AsyncMock(return_value=0.1234)
     
     hass.data.setdefault(DOMAIN, {})
     hass.data[DOMAIN]["test_entry_id"] = coordinator
+    async_get_device_index(hass).async_update(coordinator)
     return coordinator
 
 @pytest.fixture
@@ -70,7 +90,7 @@ async def test_water_plant_service(hass: HomeAssistant, setup_services, mock_dev
         },
         blocking=True,
     )
-    mock_coordinator.handle_water_plant.assert_called_once_with(Channel.Channel_A, 5)
+    mock_coordinator.handle_water_plant.assert_called_once_with(Channel.Channel_A, 5, 10)
 
     # Test invalid channel
     with pytest.raises(HomeAssistantError, match="Invalid channel 'E' specified"):
@@ -126,7 +146,7 @@ async def test_set_smart_watering_service(hass: HomeAssistant, setup_services, m
         },
         blocking=True,
     )
-    mock_coordinator.handle_set_smart_watering.assert_called_once_with(Channel.Channel_B, True, 20, 50)
+    mock_coordinator.handle_set_smart_watering.assert_called_once_with(Channel.Channel_B, True, 20, 50, 10)
 
     # Test invalid moisture values (min > max)
     with pytest.raises(HomeAssistantError, match="Invalid values specified, max_moisture 20 must be bigger than min_moisture 30"):
@@ -157,7 +177,7 @@ async def test_set_scheduled_watering_service(hass: HomeAssistant, setup_service
         },
         blocking=True,
     )
-    mock_coordinator.handle_set_manual_watering.assert_called_once_with(Channel.Channel_C, 10, 4)
+    mock_coordinator.handle_set_manual_watering.assert_called_once_with(Channel.Channel_C, 10, 4, 10)
 
 async def test_delete_watering_service(hass: HomeAssistant, setup_services, mock_device_registry, mock_coordinator):
     """Test the delete_watering service."""
@@ -171,7 +191,49 @@ async def test_delete_watering_service(hass: HomeAssistant, setup_services, mock
         },
         blocking=True,
     )
-    mock_coordinator.handle_delete_watering.assert_called_once_with(Channel.Channel_D)
+    mock_coordinator.handle_delete_watering.assert_called_once_with(Channel.Channel_D, 10)
+
+async def test_controlled_watering_services(hass: HomeAssistant, setup_services, mock_device_registry,
+                                            mock_coordinator):
+    """Test setting and deleting the controlled watering of a channel."""
+    await hass.services.async_call(
+        DOMAIN,
+        SERVICE_SET_CONTROLLED_WATERING,
+        {
+            ATTR_DEVICE_ID: "test_device_id",
+            ARGS_CHANNEL: "B",
+            ARGS_MIN_MOISTURE: 20,
+            ARGS_MAX_MOISTURE: 35,
+            ARGS_DURATION: 8,
+            ARGS_MIN_INTERVAL: 45,
+            ARGS_MAX_DAILY: 40,
+        },
+        blocking=True,
+    )
+    mock_coordinator.handle_set_controlled_watering.assert_called_once_with(
+        Channel.Channel_B, ControllerSettings(20, 35, 8, 2700, 40, True))
+
+    with pytest.raises(HomeAssistantError, match="max_moisture 20 must be bigger"):
+        await hass.services.async_call(
+            DOMAIN,
+            SERVICE_SET_CONTROLLED_WATERING,
+            {
+                ATTR_DEVICE_ID: "test_device_id",
+                ARGS_CHANNEL: "B",
+                ARGS_MIN_MOISTURE: 20,
+                ARGS_MAX_MOISTURE: 20,
+            },
+            blocking=True,
+        )
+
+    await hass.services.async_call(
+        DOMAIN,
+        SERVICE_DELETE_CONTROLLED_WATERING,
+        {ATTR_DEVICE_ID: "test_device_id", ARGS_CHANNEL: "B"},
+        blocking=True,
+    )
+    mock_coordinator.handle_set_controlled_watering.assert_called_with(Channel.Channel_B, None)
+
 
 async def test_coordinator_not_found(hass: HomeAssistant, setup_services, mock_device_registry):
     """Test when coordinator is not found."""
@@ -203,3 +265,122 @@ async def test_coordinator_not_found(hass: HomeAssistant, setup_services, mock_d
             },
             blocking=True,
         )
+
+async def test_water_plant_batch_service(hass: HomeAssistant, setup_services, mock_device_registry, mock_coordinator):
+    """Test the batch water_plant service fans out and reports per target."""
+    mock_coordinator.handle_water_plant.side_effect = [0.25, HomeAssistantError("Pump busy")]
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        SERVICE_WATER_PLANT_BATCH,
+        {
+            ATTR_DEVICE_ID: ["test_device_id"],
+            ARGS_CHANNELS: ["A", "C"],
+            ARGS_DURATION: 10,
+            ARGS_MAX_PARALLEL: 1,
+        },
+        blocking=True,
+        return_response=True,
+    )
+
+    assert mock_coordinator.handle_water_plant.call_count == 2
+    mock_coordinator.handle_water_plant.assert_any_call(Channel.Channel_A, 10, 10)
+    mock_coordinator.handle_water_plant.assert_any_call(Channel.Channel_C, 10, 10)
+    assert response == {
+        "results": [
+            {ATTR_DEVICE_ID: "test_device_id", ARGS_CHANNEL: "A", "success": True, "latency": 0.25},
+            {ATTR_DEVICE_ID: "test_device_id", ARGS_CHANNEL: "C", "success": False, "error": "Pump busy"},
+        ]
+    }
+
+
+async def test_batch_services_validate_before_dispatch(hass: HomeAssistant, setup_services, mock_device_registry,
+                                                       mock_coordinator):
+    """Test that invalid batch parameters fail before any command is sent."""
+    with pytest.raises(HomeAssistantError, match="Invalid channel 'E' specified"):
+        await hass.services.async_call(
+            DOMAIN,
+            SERVICE_DELETE_WATERING_BATCH,
+            {ATTR_DEVICE_ID: ["test_device_id"], ARGS_CHANNELS: ["A", "E"]},
+            blocking=True,
+        )
+
+    with pytest.raises(HomeAssistantError, match="must be bigger than min_moisture"):
+        await hass.services.async_call(
+            DOMAIN,
+            SERVICE_SET_SMART_WATERING_BATCH,
+            {
+                ATTR_DEVICE_ID: ["test_device_id"],
+                ARGS_CHANNELS: ["A"],
+                ARGS_MIN_MOISTURE: 40,
+                ARGS_MAX_MOISTURE: 30,
+                ARGS_ALL_DAY: True,
+            },
+            blocking=True,
+        )
+
+    mock_coordinator.handle_delete_watering.assert_not_called()
+    mock_coordinator.handle_set_smart_watering.assert_not_called()
+
+    # Scheduled watering on all channels by default
+    await hass.services.async_call(
+        DOMAIN,
+        SERVICE_SET_SCHEDULED_WATERING_BATCH,
+        {ATTR_DEVICE_ID: "test_device_id", ARGS_DURATION: 10, ARGS_INTERVAL: 4},
+        blocking=True,
+    )
+    assert mock_coordinator.handle_set_manual_watering.call_count == 4
+
+
+async def test_get_history_service(hass: HomeAssistant, setup_services, mock_device_registry, mock_coordinator):
+    """Test that the history service returns the readings in the time range."""
+    mock_coordinator.history = DeviceHistory()
+    mock_coordinator.history.add_reading(1700000000, 0, 31, 55, 22)
+    mock_coordinator.history.add_reading(1700000600, 0, 29, 54, 21)
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        SERVICE_GET_HISTORY,
+        {
+            ATTR_DEVICE_ID: "test_device_id",
+            ARGS_START: "2023-11-14T22:00:00+00:00",
+            ARGS_END: "2023-11-14T22:30:00+00:00",
+            ARGS_SERIES: ["moisture_a", "temperature"],
+        },
+        blocking=True,
+        return_response=True,
+    )
+    assert response == {
+        "series": {
+            "moisture_a": {"resolution": 0, "samples": [[1700000000, 31.0], [1700000600, 29.0]]},
+            "temperature": {"resolution": 0, "samples": [[1700000000, 22.0], [1700000600, 21.0]]},
+        }
+    }
+
+
+async def test_apply_watering_mode_service(hass: HomeAssistant, setup_services, mock_device_registry,
+                                           mock_coordinator):
+    """Test that the watering mode is applied per channel, and the response tells changed from skipped."""
+    mock_coordinator.handle_apply_watering_mode = AsyncMock(side_effect=[0.2, None, HomeAssistantError("Timeout")])
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        SERVICE_APPLY_WATERING_MODE,
+        {
+            ATTR_DEVICE_ID: ["test_device_id"],
+            ARGS_CHANNELS: ["A", "B", "C"],
+            ARGS_MODE: "smart",
+            ARGS_MIN_MOISTURE: 25,
+            ARGS_MAX_MOISTURE: 45,
+            ARGS_MAX_PARALLEL: 1,
+        },
+        blocking=True,
+        return_response=True,
+    )
+
+    mock_coordinator.handle_apply_watering_mode.assert_any_call(Channel.Channel_A, ("smart", True, 25, 45), 10, False)
+    assert response == {
+        "changed": [{ATTR_DEVICE_ID: "test_device_id", ARGS_CHANNEL: "A", "latency": 0.2}],
+        "skipped": [{ATTR_DEVICE_ID: "test_device_id", ARGS_CHANNEL: "B"}],
+        "failed": [{ATTR_DEVICE_ID: "test_device_id", ARGS_CHANNEL: "C", "error": "Timeout"}],
+    }
@@ -0,0 +1,88 @@
+"""Tests for the Growcube coordinator against a simulated device over TCP."""
+import asyncio
+
+from growcube_client import Channel, WaterCommand
+
+from tests.simulator import GrowcubeSimulator
+from custom_components.growcube.coordinator import GrowcubeDataCoordinator
+
+
+async def _wait_for(condition, timeout: float = 2) -> None:
+    async with asyncio.timeout(timeout):
+        while not condition():
+            await asyncio.sleep(0.01)
+
+
+async def _connect(hass, simulator: GrowcubeSimulator) -> GrowcubeDataCoordinator:
+    coordinator = GrowcubeDataCoordinator(simulator.host, hass)
+    coordinator.client.port = simulator.port
+    assert await coordinator.connect() == (True, "")
+    return coordinator
+
+
+async def test_coordinator_receives_reports_over_tcp(hass, socket_enabled):
+    """Test that the real client delivers the simulated reports to the coordinator."""
+    simulator = GrowcubeSimulator(device_id=12345)
+    await simulator.start()
+    coordinator = await _connect(hass, simulator)
+    try:
+        assert coordinator.data.device_id == "growcube_3039"
+        assert coordinator.data.version == "3.6"
+        await _wait_for(lambda: coordinator.data.moisture == (40, 40, 40, 40))
+
+        # The SyncTimeCommand sent after the handshake reaches the device
+        await _wait_for(lambda: simulator.commands)
+        assert simulator.commands[0][0] == 44
+
+        simulator.moisture[1] = 25
+        simulator.send_moisture(1)
+        simulator.send_outlet_blocked(2)
+        simulator.set_locked(True)
+        await _wait_for(lambda: coordinator.data.device_locked)
+        assert coordinator.data.moisture[1] == 25
+        assert coordinator.data.outlet_blocked[2] is True
+    finally:
+        coordinator.disconnect()
+        await simulator.stop()
+
+
+async def test_coordinator_commands_and_disconnect_over_tcp(hass, socket_enabled):
+    """Test commands round trip through the simulator, and a dropped connection is noticed."""
+    simulator = GrowcubeSimulator()
+    await simulator.start()
+    coordinator = await _connect(hass, simulator)
+    try:
+        coordinator.client.send_command(WaterCommand(Channel.Channel_B, True))
+        await _wait_for(lambda: coordinator.data.pump_open[1])
+        coordinator.client.send_command(WaterCommand(Channel.Channel_B, False))
+        await _wait_for(lambda: not coordinator.data.pump_open[1])
+
+        simulator.drop_connections()
+        await _wait_for(lambda: not coordinator.last_update_success)
+        # The last values are kept
+        assert coordinator.data.moisture == (40, 40, 40, 40)
+        assert coordinator.reconnect_state.next_attempt is not None
+    finally:
+        coordinator.disconnect()
+        await simulator.stop()
+
+
+async def test_coordinator_command_round_trip_over_tcp(hass, socket_enabled):
+    """Test that watering completes on the pump reports of the device, and deleting is paced."""
+    simulator = GrowcubeSimulator()
+    await simulator.start()
+    coordinator = await _connect(hass, simulator)
+    try:
+        latency = await coordinator.handle_water_plant(Channel.Channel_C, 0)
+        assert 0 < latency < 1
+        assert coordinator.data.pump_open[2] is False
+        assert coordinator.stats.command_latency.count == 2
+
+        simulator.watering_modes[3] = (3, "20", "40")
+        await coordinator.handle_delete_watering(Channel.Channel_D)
+        assert 3 not in simulator.watering_modes
+        # The pump is closed before the plant data is deleted
+        assert [command for command, _ in simulator.commands[-2:]] == [46, 45]
+    finally:
+        coordinator.disconnect()
+        await simulator.stop()
@@ -0,0 +1,55 @@
+"""Tests for the Growcube coordinator stats."""
+from unittest.mock import patch
+
+from growcube_client import (
+    Channel,
+    MoistureHumidityStateGrowcubeReport,
+    PumpOpenGrowcubeReport,
+    WaterCommand,
+)
+
+from custom_components.growcube.const import CONF_COALESCE_WINDOW
+from custom_components.growcube.coordinator import GrowcubeDataCoordinator
+from custom_components.growcube.stats import LatencyHistogram
+
+
+def test_latency_histogram():
+    """Test that durations land in the right buckets."""
+    histogram = LatencyHistogram()
+    assert histogram.mean is None
+    assert histogram.percentile(99) is None
+
+    for _ in range(98):
+        histogram.record(0.000004)
+    histogram.record(0.0003)
+    histogram.record(20)
+
+    assert histogram.count == 100
+    assert histogram.percentile(50) == 0.00001
+    assert histogram.percentile(99) == 0.0005
+    assert histogram.percentile(100) == 20
+    assert histogram.max == 20
+    assert histogram.as_dict()["buckets"]["inf"] == 1
+
+
+async def test_coordinator_counts_reports_writes_and_commands(hass):
+    """Test that the coordinator counts what goes through the hot path."""
+    host = "192.168.1.100"
+    with patch("custom_components.growcube.coordinator.GrowcubeClient") as mock_client:
+        coordinator = GrowcubeDataCoordinator(host, hass, {CONF_COALESCE_WINDOW: 50})
+        mock_client.return_value.send_command.side_effect = [True, False]
+
+        coordinator.handle_report(MoistureHumidityStateGrowcubeReport("0@30@55@22"))
+        coordinator.handle_report(MoistureHumidityStateGrowcubeReport("0@30@55@22"))
+        coordinator.handle_report(PumpOpenGrowcubeReport("1"))
+        coordinator.send_command(WaterCommand(Channel.Channel_A, True))
+        coordinator.send_command(WaterCommand(Channel.Channel_A, False))
+
+        stats = coordinator.stats.as_dict()
+        assert stats["reports"] == {"MoistureHumidityStateGrowcubeReport": 2, "PumpOpenGrowcubeReport": 1}
+        assert stats["dispatch"]["count"] == 3
+        assert stats["state_writes"] == 1
+        assert stats["state_writes_coalesced"] == 1
+        assert stats["state_writes_skipped"] == 1
+        assert stats["commands"] == {"WaterCommand": 2}
+        assert stats["commands_failed"] == 1
@@ -0,0 +1,53 @@
+"""Tests for the Growcube liveness watchdog."""
+import asyncio
+from unittest.mock import MagicMock
+
+from homeassistant.core import HomeAssistant
+
+from growcube_client import MoistureHumidityStateGrowcubeReport
+
+from custom_components.growcube.const import CONF_LIVENESS_TIMEOUT
+from custom_components.growcube.watchdog import LivenessWatchdog, async_get_watchdog
+
+
+async def test_silent_devices_are_disconnected(hass: HomeAssistant, create_coordinator):
+    """Test that only the device without reports within its timeout is dropped, and the timer then stops."""
+    watchdog = LivenessWatchdog(hass, interval=0.01)
+    reporting = create_coordinator("192.168.1.100")
+    silent = create_coordinator("192.168.1.101")
+    for coordinator in (reporting, silent):
+        coordinator.async_liveness_timeout = MagicMock()
+        watchdog.watch(coordinator, 0.05)
+
+    for _ in range(10):
+        reporting.handle_report(MoistureHumidityStateGrowcubeReport("0@31@55@22"))
+        await asyncio.sleep(0.01)
+
+    silent.async_liveness_timeout.assert_called_once()
+    reporting.async_liveness_timeout.assert_not_called()
+    assert len(watchdog) == 1
+
+    watchdog.unwatch(reporting)
+    assert watchdog._handle is None
+
+
+async def test_connection_is_watched_while_connected(hass: HomeAssistant, create_coordinator):
+    """Test that a connection is watched from on_connected until it's lost, and aborted on timeout."""
+    coordinator = create_coordinator("192.168.1.100")
+    watchdog = async_get_watchdog(hass)
+
+    await coordinator.on_connected("192.168.1.100")
+    assert len(watchdog) == 1
+
+    coordinator.async_liveness_timeout()
+    coordinator.client.transport.abort.assert_called_once()
+
+    await coordinator.on_disconnected("192.168.1.100")
+    assert len(watchdog) == 0
+
+    # A timeout of 0 disables the watchdog
+    disabled = create_coordinator("192.168.1.101", **{CONF_LIVENESS_TIMEOUT: 0})
+    await disabled.on_connected("192.168.1.101")
+    assert len(watchdog) == 0
+    coordinator.disconnect()
+    disabled.disconnect()